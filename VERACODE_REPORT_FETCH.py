@@ -1,35 +1,64 @@
 #!/usr/bin/env python3
 # VERACODE_REPORT_FETCH.py
 # Production build:
-# - Robust pagination, resilient retries (5xx/429/network)
-# - 180-day windowing
-# - Verification (pages seen vs reported, totals collected vs expected) + audit JSON
-# - Stamping (source_report_id, window_start, window_end)
-# - Outputs: JSONL + JSON; CSV (single file, streamed); XLSX (single workbook with multi-sheets)
+# - Native (pooled requests + HMAC) or HTTPie transport; resilient retries (5xx/429/network) under a shared
+#   rate governor (--max-rps, adaptive concurrency, Retry-After pauses)
+# - 180-day windowing (--plan fixed/adaptive/probe); concurrent report generation with adaptive polling
+# - Robust pagination: fixed or auto-tuned --size, parallel pages, pages parsed as they stream in
+# - Verification (pages seen vs reported, totals collected vs expected) with page repair + audit JSON
+# - Stamping (source_report_id, window_start, window_end); dedup by --id-field; incremental --sync
+# - Resume (--resume), report cache (--cache-dir), batch jobs (--jobs), queue workers (--queue/--worker)
+# - Outputs: JSONL (optionally gzip/zstd) + JSON; CSV (streamed); XLSX (multi-sheet); Parquet (--parquet)
 #   Skip via flags: --no-csv / --no-xlsx
+# - Run report with API/stage metrics, optional Prometheus textfile; importable API (iter_findings, sinks)
 # - Professional console icons
 
 import argparse
+import asyncio
+import codecs
+import contextlib
+import copy
 import csv
+import gzip
+import hashlib
+import inspect
+import io
+import itertools
 import json
+import multiprocessing
 import os
 import re
 import random
+import shutil
+import socket
+import statistics
 import subprocess
 import sys
+import threading
 import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 import warnings
-from datetime import datetime, timedelta, timezone
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, NoReturn
 from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
 
 # ----------------------------- Constants -----------------------------
 
-BASE_URL = "https://api.veracode.com"
-POST_URL = f"{BASE_URL}/appsec/v1/analytics/report"
-GET_URL_T = f"{BASE_URL}/appsec/v1/analytics/report/{{rid}}?page={{page}}&size={{size}}"
-GET_URL_META_T = f"{BASE_URL}/appsec/v1/analytics/report/{{rid}}"
+BASE_URL = os.getenv("VERACODE_API_BASE_URL", "https://api.veracode.com").rstrip("/")
+REPORT_PATH = "/appsec/v1/analytics/report"
+POST_URL = f"{BASE_URL}{REPORT_PATH}"
+GET_URL_T = f"{BASE_URL}{REPORT_PATH}/{{rid}}?page={{page}}&size={{size}}"
+GET_URL_META_T = f"{BASE_URL}{REPORT_PATH}/{{rid}}"
+
+# Transport: "native" (in-process requests.Session + HMAC signing) or "httpie" (subprocess fallback)
+TRANSPORT = "native"
+HTTP_TIMEOUT = (10.0, 120.0)  # (connect, read) seconds for the native transport
+MAX_ATTEMPTS = 7
+TRANSIENT_STATUSES = {500, 502, 503, 504}
 
 ICONS = {
     "window": "🗂️",
@@ -46,27 +75,612 @@ warnings.simplefilter("ignore", UserWarning)  # quiets noisy libs if present
 
 # ----------------------------- Utilities -----------------------------
 
-def die(msg: str, code: int = 2) -> None:
-    print(f"ERROR: {msg}", file=sys.stderr)
-    sys.exit(code)
+class ReportFetchError(Exception):
+    """Base of every error raised by this module; `code` is the CLI exit status."""
+
+    def __init__(self, msg: str, code: int = 2, **info: Any):
+        super().__init__(msg)
+        self.code = code
+        self.__dict__.update(info)
+
+
+class ConfigError(ReportFetchError):
+    """Bad options, environment, filters or resume state, or a missing optional dependency."""
+
+
+class ApiError(ReportFetchError):
+    """The Reporting API could not be used: HTTP error after retries, network failure, unparseable response."""
+
+    status: int | None = None  # HTTP status, when the server answered
+
+
+class AuthError(ApiError):
+    """HMAC signing failed or the API answered 401/403."""
+
+
+class ReportTimeout(ApiError):
+    """A report did not reach COMPLETED within the poll timeout."""
+
+
+class VerificationError(ReportFetchError):
+    """--strict verification found a page/total mismatch, unresolved gaps or duplicates."""
+
+
+def die(msg: str, code: int = 2, exc: type[ReportFetchError] = ReportFetchError, **info: Any) -> NoReturn:
+    """Abort with a typed ReportFetchError; the CLI prints it as ERROR: <msg> and exits with `code`."""
+    raise exc(msg, code, **info)
 
 
 def check_env() -> None:
     if not os.getenv("VERACODE_API_KEY_ID") or not os.getenv("VERACODE_API_KEY_SECRET"):
-        die("Set VERACODE_API_KEY_ID and VERACODE_API_KEY_SECRET for the HTTPie HMAC plugin.")
+        die("Set VERACODE_API_KEY_ID and VERACODE_API_KEY_SECRET for HMAC signing.", exc=ConfigError)
     if os.getenv("VERACODE_API_ID") or os.getenv("VERACODE_API_KEY"):
-        print("WARN: Legacy VERACODE_API_ID/VERACODE_API_KEY are set; HTTPie uses *_KEY_ID/*_KEY_SECRET.",
+        print("WARN: Legacy VERACODE_API_ID/VERACODE_API_KEY are set; HMAC signing uses *_KEY_ID/*_KEY_SECRET.",
               file=sys.stderr)
 
 
-def call_httpie(method: str, url: str, body: dict[str, Any] | None = None) -> dict[str, Any]:
+def set_base_url(base_url: str) -> None:
+    """Point all API URLs at base_url (e.g., a local stub server for benchmarking)."""
+    global BASE_URL, POST_URL, GET_URL_T, GET_URL_META_T
+    BASE_URL = base_url.rstrip("/")
+    POST_URL = f"{BASE_URL}{REPORT_PATH}"
+    GET_URL_T = f"{BASE_URL}{REPORT_PATH}/{{rid}}?page={{page}}&size={{size}}"
+    GET_URL_META_T = f"{BASE_URL}{REPORT_PATH}/{{rid}}"
+
+
+def backoff_delay(attempt: int, cap: float = 60.0, jitter: float = 0.75) -> float:
+    """Jittered exponential backoff (base 1.2), capped."""
+    return min(cap, (1.2 ** attempt) + random.uniform(0, jitter))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After as seconds (delta-seconds or HTTP-date); None if absent/unparseable."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateGovernor:
+    """
+    Process-wide gate in front of every API call (POST, status polls, page GETs), whatever the transport.
+      - token bucket: at most `rate` requests/second (None = unlimited), small bursts allowed
+      - AIMD concurrency: the in-flight limit grows by ~1 per limit's worth of healthy responses and halves
+        on 429/5xx/network errors (at most once per second), between 1 and max_concurrency
+      - shared pause: a Retry-After (or 429 backoff) holds every caller until it expires
+      - report slots: at most max_reports reports being generated or paged at once across every run_windows
+        in the process (concurrent --jobs), 0 = no cap beyond each run's --max-inflight
+    """
+
+    DECREASE_COOLDOWN_S = 1.0
+
+    def __init__(self, rate: float | None = None, max_concurrency: int = 16, initial_concurrency: int = 4):
+        self._cond = threading.Condition()
+        self.configure(rate, max_concurrency, initial_concurrency)
+
+    def configure(self, rate: float | None, max_concurrency: int, initial_concurrency: int = 4,
+                  max_reports: int = 0) -> None:
+        with self._cond:
+            self.max_reports = max(0, max_reports)
+            self._reports = 0
+            self.rate = rate if rate and rate > 0 else None
+            self.burst = max(1.0, self.rate or 1.0)
+            self.max_concurrency = max(1, max_concurrency)
+            self.limit = float(max(1, min(initial_concurrency, self.max_concurrency)))
+            self._tokens = self.burst
+            self._last_refill = time.monotonic()
+            self._inflight = 0
+            self._pause_until = 0.0
+            self._last_decrease = 0.0
+            self.stats = {"requests": 0, "throttled": 0, "errors": 0, "paused_s": 0.0,
+                          "min_limit": self.limit, "max_limit": self.limit}
+            self._cond.notify_all()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now < self._pause_until:
+                    self._cond.wait(self._pause_until - now)
+                    continue
+                if self._inflight >= int(self.limit):
+                    self._cond.wait()
+                    continue
+                if self.rate:
+                    self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+                    self._last_refill = now
+                    if self._tokens < 1.0:
+                        self._cond.wait((1.0 - self._tokens) / self.rate)
+                        continue
+                    self._tokens -= 1.0
+                self._inflight += 1
+                self.stats["requests"] += 1
+                return
+
+    def release(self, outcome: str) -> None:
+        """outcome: 'ok' (additive increase), 'throttled' or 'error' (multiplicative decrease)."""
+        with self._cond:
+            self._inflight -= 1
+            if outcome == "ok":
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            else:
+                self.stats["throttled" if outcome == "throttled" else "errors"] += 1
+                now = time.monotonic()
+                if now - self._last_decrease >= self.DECREASE_COOLDOWN_S:
+                    self.limit = max(1.0, self.limit / 2)
+                    self._last_decrease = now
+            self.stats["min_limit"] = min(self.stats["min_limit"], self.limit)
+            self.stats["max_limit"] = max(self.stats["max_limit"], self.limit)
+            self._cond.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for `seconds` (e.g., Retry-After)."""
+        with self._cond:
+            until = time.monotonic() + seconds
+            if until > self._pause_until:
+                self.stats["paused_s"] += until - max(self._pause_until, time.monotonic())
+                self._pause_until = until
+            self._cond.notify_all()
+
+    def take_report_slot(self) -> bool:
+        """Claim a report slot without blocking (run_windows keeps polling its other reports meanwhile)."""
+        with self._cond:
+            if self.max_reports and self._reports >= self.max_reports:
+                return False
+            self._reports += 1
+            return True
+
+    def give_report_slot(self) -> None:
+        with self._cond:
+            self._reports = max(0, self._reports - 1)
+
+    @staticmethod
+    def outcome_for(status: int) -> str:
+        if status == 429:
+            return "throttled"
+        return "error" if status in TRANSIENT_STATUSES else "ok"
+
+    def summary(self) -> str:
+        st = self.stats
+        return (f"{st['requests']} request(s), {st['throttled']} throttled, {st['errors']} transient error(s), "
+                f"{st['paused_s']:.1f}s paused, concurrency {st['min_limit']:.1f}..{st['max_limit']:.1f} "
+                f"(now {self.limit:.1f})")
+
+
+GOVERNOR = RateGovernor()
+
+# Per-thread details of the most recent call_api (attempts, bytes received, whether a timeout/5xx was retried)
+_CALL_INFO = threading.local()
+
+
+def last_call_info() -> dict[str, Any]:
+    return {"attempts": getattr(_CALL_INFO, "attempts", 0), "bytes": getattr(_CALL_INFO, "bytes", 0),
+            "degraded": getattr(_CALL_INFO, "degraded", False)}
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux /proc), else the process peak from getrusage."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def call_kind(method: str, url: str) -> str:
+    """API call type for metrics: post (report request), status (report meta) or page (paged GET)."""
+    if method.upper() == "POST":
+        return "post"
+    return "page" if "?" in url else "status"
+
+
+class Metrics:
+    """
+    Run instrumentation, one per export (active_metrics), filled in as the run goes:
+      - per API call type (post/status/page): one latency sample per HTTP attempt, response bytes, failed attempts
+      - retries by reason (429, 5xx, network, parse) and time spent decoding API JSON
+      - report generation waits, items paged vs total_elements announced (for progress/ETA)
+      - wall time and peak RSS per stage (fetch, dedup, sync, outputs) plus per-writer time inside outputs
+    Rendered as the JSON run report (report()) and optionally a Prometheus textfile (prometheus()).
+    """
+
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    RSS_SAMPLE_S = 0.2
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.latency: dict[str, array] = {}
+        self.bytes: Counter = Counter()
+        self.failed: Counter = Counter()
+        self.retries: Counter = Counter()
+        self.decode_s = 0.0
+        self.polls: dict[str, dict[str, Any]] = {}
+        self.items = 0
+        self.first_item_at: float | None = None
+        self.totals: dict[str, int] = {}
+        self.windows = 0
+        self.stages: dict[str, dict[str, Any]] = {}
+
+    def observe_call(self, kind: str, seconds: float, nbytes: int = 0, ok: bool = True) -> None:
+        with self._lock:
+            self.latency.setdefault(kind, array("d")).append(seconds)
+            self.bytes[kind] += nbytes
+            if not ok:
+                self.failed[kind] += 1
+
+    def retry(self, reason: str) -> None:
+        with self._lock:
+            self.retries[reason] += 1
+
+    def decoded(self, seconds: float) -> None:
+        with self._lock:
+            self.decode_s += seconds
+
+    def poll(self, rid: str, stats: dict[str, Any]) -> None:
+        with self._lock:
+            self.polls[rid] = dict(stats)
+
+    def add_items(self, rid: str, n: int, total_elements: int | None = None) -> None:
+        with self._lock:
+            if self.first_item_at is None:
+                self.first_item_at = time.monotonic()
+            self.items += n
+            if isinstance(total_elements, int):
+                self.totals[rid] = total_elements
+
+    def progress(self) -> dict[str, Any]:
+        """Items so far, expected total (known total_elements, extrapolated to windows not paged yet), rate, ETA."""
+        with self._lock:
+            items, totals, windows, first = self.items, list(self.totals.values()), self.windows, self.first_item_at
+        expected = None
+        if totals:
+            expected = sum(totals) + (sum(totals) / len(totals)) * max(0, windows - len(totals))
+        elapsed = time.monotonic() - first if first else 0.0
+        rate = items / elapsed if elapsed > 0 else 0.0
+        eta = (expected - items) / rate if expected is not None and rate > 0 and expected >= items else None
+        return {"items": items, "expected": expected, "reports_sized": len(totals), "windows": windows,
+                "items_per_s": rate, "eta_s": eta}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Time a stage and sample its peak RSS in the background."""
+        done = threading.Event()
+        peak = [rss_bytes()]
+
+        def sample() -> None:
+            while not done.wait(self.RSS_SAMPLE_S):
+                peak[0] = max(peak[0], rss_bytes())
+
+        sampler = threading.Thread(target=sample, name=f"rss-{name}", daemon=True)
+        sampler.start()
+        t0 = time.monotonic()
+        try:
+            yield self.stages.setdefault(name, {})
+        finally:
+            done.set()
+            sampler.join()
+            entry = self.stages[name]
+            entry["seconds"] = round(entry.get("seconds", 0.0) + time.monotonic() - t0, 3)
+            entry["peak_rss_mb"] = round(max(peak[0], rss_bytes()) / (1 << 20), 1)
+
+    def add_components(self, stage: str, seconds: dict[str, float]) -> None:
+        """Accumulate per-component time (e.g. decode/flatten/csv/xlsx inside the outputs stage)."""
+        with self._lock:
+            comp = self.stages.setdefault(stage, {}).setdefault("components_s", {})
+            for k, v in seconds.items():
+                comp[k] = round(comp.get(k, 0.0) + v, 3)
+
+    @staticmethod
+    def _quantile(sorted_vals: list[float], q: float) -> float:
+        return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+    def report(self, **extra: Any) -> dict[str, Any]:
+        with self._lock:
+            calls = {}
+            for kind, samples in sorted(self.latency.items()):
+                vals = sorted(samples)
+                calls[kind] = {
+                    "attempts": len(vals), "failed_attempts": self.failed[kind], "bytes": self.bytes[kind],
+                    "latency_s": {"sum": round(sum(vals), 3), "p50": round(self._quantile(vals, 0.50), 4),
+                                  "p95": round(self._quantile(vals, 0.95), 4),
+                                  "p99": round(self._quantile(vals, 0.99), 4), "max": round(vals[-1], 4)},
+                    "histogram": {str(b): sum(1 for v in vals if v <= b) for b in self.BUCKETS},
+                }
+            fetch_s = self.stages.get("fetch", {}).get("seconds")
+            doc = {
+                "wall_s": round(time.monotonic() - self.started, 3),
+                "items_paged": self.items,
+                "items_per_s": round(self.items / fetch_s, 1) if fetch_s else None,
+                "api": {"calls": calls, "retries": dict(self.retries), "json_decode_s": round(self.decode_s, 3),
+                        "governor": dict(GOVERNOR.stats)},
+                "report_generation": {
+                    "reports": len(self.polls),
+                    "wait_s_total": round(sum(p.get("wait_s", 0.0) for p in self.polls.values()), 3),
+                    "wait_s_max": max((p.get("wait_s", 0.0) for p in self.polls.values()), default=0.0),
+                    "status_calls": sum(p.get("polls", 0) for p in self.polls.values()),
+                    "per_report": self.polls,
+                },
+                "stages": self.stages,
+            }
+        doc.update(extra)
+        return doc
+
+    def prometheus(self, report: dict[str, Any], prefix: str = "veracode_report_fetch") -> str:
+        """Prometheus text exposition (for node_exporter's textfile collector) of a report() document."""
+        lines = [f"# HELP {prefix}_api_request_duration_seconds API request latency per HTTP attempt",
+                 f"# TYPE {prefix}_api_request_duration_seconds histogram"]
+        for kind, c in report["api"]["calls"].items():
+            for b, n in c["histogram"].items():
+                lines.append(f'{prefix}_api_request_duration_seconds_bucket{{call="{kind}",le="{b}"}} {n}')
+            lines.append(f'{prefix}_api_request_duration_seconds_bucket{{call="{kind}",le="+Inf"}} {c["attempts"]}')
+            lines.append(f'{prefix}_api_request_duration_seconds_sum{{call="{kind}"}} {c["latency_s"]["sum"]}')
+            lines.append(f'{prefix}_api_request_duration_seconds_count{{call="{kind}"}} {c["attempts"]}')
+        lines += [f"# TYPE {prefix}_api_response_bytes_total counter"]
+        lines += [f'{prefix}_api_response_bytes_total{{call="{k}"}} {c["bytes"]}'
+                  for k, c in report["api"]["calls"].items()]
+        lines += [f"# TYPE {prefix}_api_failed_attempts_total counter"]
+        lines += [f'{prefix}_api_failed_attempts_total{{call="{k}"}} {c["failed_attempts"]}'
+                  for k, c in report["api"]["calls"].items()]
+        lines += [f"# TYPE {prefix}_api_retries_total counter"]
+        lines += [f'{prefix}_api_retries_total{{reason="{r}"}} {n}'
+                  for r, n in sorted(report["api"]["retries"].items())]
+        gen = report["report_generation"]
+        lines += [f"# TYPE {prefix}_report_generation_wait_seconds summary",
+                  f"{prefix}_report_generation_wait_seconds_sum {gen['wait_s_total']}",
+                  f"{prefix}_report_generation_wait_seconds_count {gen['reports']}",
+                  f"# TYPE {prefix}_stage_duration_seconds gauge"]
+        lines += [f'{prefix}_stage_duration_seconds{{stage="{k}"}} {v.get("seconds", 0)}'
+                  for k, v in report["stages"].items()]
+        lines += [f"# TYPE {prefix}_stage_peak_rss_bytes gauge"]
+        lines += [f'{prefix}_stage_peak_rss_bytes{{stage="{k}"}} {int(v.get("peak_rss_mb", 0) * (1 << 20))}'
+                  for k, v in report["stages"].items()]
+        lines += [f"# TYPE {prefix}_records gauge", f"{prefix}_records {report.get('records', report['items_paged'])}",
+                  f"# TYPE {prefix}_items_per_second gauge", f"{prefix}_items_per_second {report['items_per_s'] or 0}",
+                  f"# TYPE {prefix}_run_duration_seconds gauge", f"{prefix}_run_duration_seconds {report['wall_s']}",
+                  f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+                  f"{prefix}_last_run_timestamp_seconds {int(time.time())}"]
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+_JOB = threading.local()  # Metrics of the export running on this thread (one per --jobs job); see active_metrics
+
+
+def active_metrics() -> Metrics:
+    """The Metrics of the export this thread works for, else the process-wide METRICS."""
+    return getattr(_JOB, "metrics", None) or METRICS
+
+
+def inherit_metrics(metrics: Metrics) -> None:
+    """ThreadPoolExecutor initializer: pool threads record into the Metrics of the export that started the pool."""
+    _JOB.metrics = metrics
+
+
+class ProgressLine:
+    """
+    Background progress reporter on stderr: items paged, expected total, items/sec and ETA (from total_elements).
+    Redraws one line in place on a terminal; otherwise prints a line every `interval` seconds.
+    """
+
+    def __init__(self, metrics: Metrics, tty: bool, interval: float = 1.0):
+        self.metrics = metrics
+        self.tty = tty
+        self.interval = interval if tty else max(interval, 10.0)
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="progress", daemon=True)
+
+    def render(self) -> str:
+        p = self.metrics.progress()
+        if p["expected"]:
+            pct = min(100.0, 100.0 * p["items"] / p["expected"]) if p["expected"] else 0.0
+            head = f"{p['items']:,} / ~{int(p['expected']):,} items ({pct:.0f}%)"
+        else:
+            head = f"{p['items']:,} items"
+        eta = "?" if p["eta_s"] is None else str(timedelta(seconds=int(p["eta_s"])))
+        return (f"progress: {head}  {p['items_per_s']:,.0f} items/s  ETA {eta}  "
+                f"[{p['reports_sized']}/{p['windows']} reports sized]")
+
+    def _run(self) -> None:
+        while not self._done.wait(self.interval):
+            if self.tty:
+                sys.stderr.write("\r\x1b[K" + self.render())
+            else:
+                sys.stderr.write(self.render() + "\n")
+            sys.stderr.flush()
+
+    def start(self) -> "ProgressLine":
+        self._thread.start()
+        return self
+
+    def __enter__(self) -> "ProgressLine":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def stop(self) -> None:
+        self._done.set()
+        self._thread.join()
+        if self.tty:
+            sys.stderr.write("\r\x1b[K")
+            sys.stderr.flush()
+
+
+def call_api(method: str, url: str, body: dict[str, Any] | None = None, missing_ok: bool = False) -> Any:
+    """
+    Dispatch an API call to the selected transport (see TRANSPORT / --transport).
+    With missing_ok=True, 404/410 returns None instead of failing (e.g., probing an expired report id).
+    """
+    if TRANSPORT == "httpie":
+        return call_httpie(method, url, body, missing_ok=missing_ok)
+    return call_native(method, url, body, missing_ok=missing_ok)
+
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _get_session():
+    """Lazily build one keep-alive requests.Session with Veracode HMAC auth (shared connection pool)."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = _build_session()
+    return _SESSION
+
+
+def _build_session():
+    try:
+        import requests  # type: ignore
+        from requests.adapters import HTTPAdapter  # type: ignore
+        from veracode_api_signing.plugin_requests import RequestsAuthPluginVeracodeHMAC  # type: ignore
+    except Exception as e:
+        die(f"native transport needs requests + veracode-api-signing: {e}. "
+            f"Install them (pip install -r requirements.txt) or use --transport httpie.", exc=ConfigError)
+    session = requests.Session()
+    session.auth = RequestsAuthPluginVeracodeHMAC()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept": "application/json", "User-Agent": "veracode-report-fetch"})
+    return session
+
+
+def retry_status(status: int, retry_after: str | None, attempt: int) -> bool:
+    """
+    Retry policy for an HTTP status: 429 pauses every worker for Retry-After (else a backoff), a transient 5xx
+    backs off this caller. True when the request should be sent again (never past MAX_ATTEMPTS).
+    """
+    if attempt >= MAX_ATTEMPTS:
+        return False
+    if status == 429:
+        active_metrics().retry("429")
+        ra = parse_retry_after(retry_after)
+        wait = ra if ra is not None else backoff_delay(attempt, jitter=0.5)
+        print(f"  429 rate limited; all workers pausing {wait:.1f}s …", file=sys.stderr)
+        GOVERNOR.pause(wait)
+        return True
+    if status in TRANSIENT_STATUSES:
+        active_metrics().retry("5xx")
+        _CALL_INFO.degraded = True
+        sleep = backoff_delay(attempt)
+        print(f"  transient error (HTTP {status}, attempt {attempt}/{MAX_ATTEMPTS}); "
+              f"retrying in {sleep:.1f}s …", file=sys.stderr)
+        time.sleep(sleep)
+        return True
+    return False
+
+
+def call_native(method: str, url: str, body: dict[str, Any] | None = None, missing_ok: bool = False,
+                stream: bool = False) -> Any:
+    """
+    In-process request over the pooled, HMAC-signed session, with the same retry policy as call_httpie.
+    Status codes and Retry-After come from the response object rather than parsed stderr.
+    stream=True returns a 2xx response with its body unread and its GOVERNOR slot still held: the caller reads the
+    body, then releases the slot and records the call. Error statuses are retried or raised as usual.
+    """
+    import requests  # type: ignore
+    from veracode_api_signing.exceptions import VeracodeAPISigningException  # type: ignore
+
+    session = _get_session()
+    kind = call_kind(method, url)
+    _CALL_INFO.degraded = False
+    _CALL_INFO.bytes = 0
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        _CALL_INFO.attempts = attempt
+        GOVERNOR.acquire()
+        outcome = "error"
+        held = False
+        t0 = time.monotonic()
+        try:
+            resp = session.request(method, url, json=body, timeout=HTTP_TIMEOUT, stream=stream)
+            outcome = GOVERNOR.outcome_for(resp.status_code)
+            if stream and 200 <= resp.status_code < 300:
+                held = True  # released by the caller once the body is read
+                return resp
+            active_metrics().observe_call(kind, time.monotonic() - t0, len(resp.content), ok=resp.status_code < 400)
+        except VeracodeAPISigningException as e:
+            die(f"HMAC signing failed: {e}. Verify VERACODE_API_KEY_ID/VERACODE_API_KEY_SECRET.", exc=AuthError)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            active_metrics().observe_call(kind, time.monotonic() - t0, ok=False)
+            _CALL_INFO.degraded = True
+            if attempt < MAX_ATTEMPTS:
+                active_metrics().retry("network")
+                sleep = backoff_delay(attempt)
+                print(f"  transient error ({type(e).__name__}, attempt {attempt}/{MAX_ATTEMPTS}); "
+                      f"retrying in {sleep:.1f}s …", file=sys.stderr)
+                time.sleep(sleep)
+                continue
+            die(f"{method} {url} failed after {attempt} attempt(s): {e}", exc=ApiError)
+        finally:
+            if not held:
+                GOVERNOR.release(outcome)
+
+        status = resp.status_code
+        _CALL_INFO.bytes = len(resp.content)
+        if 200 <= status < 300:
+            if not resp.content.strip():
+                return {}
+            t0 = time.monotonic()
+            try:
+                doc = resp.json()
+            except ValueError as e:
+                active_metrics().decoded(time.monotonic() - t0)
+                if attempt < MAX_ATTEMPTS:
+                    active_metrics().retry("parse")
+                    sleep = backoff_delay(attempt, cap=30, jitter=0.5)
+                    print(f"  JSON parse error; retrying in {sleep:.1f}s …", file=sys.stderr)
+                    time.sleep(sleep)
+                    continue
+                die(f"JSON parse error from {method} {url}: {e}\nRaw (first 4KB):\n{resp.text[:4096]}", exc=ApiError,
+                    status=status)
+            active_metrics().decoded(time.monotonic() - t0)
+            return doc
+
+        if retry_status(status, resp.headers.get("Retry-After"), attempt):
+            continue
+
+        if missing_ok and status in (404, 410):
+            return None
+
+        if status == 401:
+            die("HTTP 401 Unauthorized. Verify VERACODE_API_KEY_ID/VERACODE_API_KEY_SECRET and tenant access.\n"
+                + resp.text[:2000], exc=AuthError, status=status)
+        if status == 403:
+            die(f"HTTP 403 Forbidden. The API credentials lack the Reporting API permission for {url}.\n"
+                + resp.text[:2000], exc=AuthError, status=status)
+
+        die(f"HTTP {status} from {method} {url} after {attempt} attempt(s):\n{resp.text[:4096]}", exc=ApiError,
+            status=status)
+    die(f"{method} {url} failed after {MAX_ATTEMPTS} attempts", exc=ApiError)
+
+
+def call_httpie(method: str, url: str, body: dict[str, Any] | None = None, missing_ok: bool = False) -> Any:
     """
     Run HTTPie with HMAC auth, with resilient retries on transient failures.
     Retries on: 5xx, 429, and common connection errors; max 7 attempts; jittered exponential backoff.
     """
-    max_attempts = 7
+    max_attempts = MAX_ATTEMPTS
     base = 1.2  # backoff base
+    kind = call_kind(method, url)
+    _CALL_INFO.degraded = False
+    _CALL_INFO.bytes = 0
     for attempt in range(1, max_attempts + 1):
+        _CALL_INFO.attempts = attempt
+        GOVERNOR.acquire()
+        outcome = "error"
+        t0 = time.monotonic()
         try:
             cmd = ["http", "--body", "-A", "veracode_hmac", method, url]
             proc = subprocess.run(
@@ -76,57 +690,247 @@ def call_httpie(method: str, url: str, body: dict[str, Any] | None = None) -> di
                 capture_output=True,
                 check=False,
             )
+            stderr = proc.stderr or ""
+            if proc.returncode == 0:
+                outcome = "ok"
+            elif " 429 " in stderr:
+                outcome = "throttled"
+            elif not any(code in stderr for code in [" 500 ", " 502 ", " 503 ", " 504 "]):
+                outcome = "ok" if re.search(r" [34]\d\d ", stderr) else "error"
         except FileNotFoundError:
-            die("http(ie) is not installed. Install with `pip install httpie`.")
+            die("http(ie) is not installed. Install with `pip install httpie`.", exc=ConfigError)
+        finally:
+            GOVERNOR.release(outcome)
+        active_metrics().observe_call(kind, time.monotonic() - t0, len(proc.stdout or ""), ok=proc.returncode == 0)
 
         # Success path
         if proc.returncode == 0:
+            _CALL_INFO.bytes = len(proc.stdout)
             out = proc.stdout.strip()
             if not out:
                 return {}
+            t0 = time.monotonic()
             try:
-                return json.loads(out)
+                doc = json.loads(out)
             except json.JSONDecodeError as e:
+                active_metrics().decoded(time.monotonic() - t0)
                 if attempt < max_attempts:
+                    active_metrics().retry("parse")
                     sleep = min(30, (base ** attempt) + random.uniform(0, 0.5))
                     print(f"  JSON parse error; retrying in {sleep:.1f}s …", file=sys.stderr)
                     time.sleep(sleep)
                     continue
-                die(f"JSON parse error from {method} {url}: {e}\nRaw (first 4KB):\n{out[:4096]}")
+                die(f"JSON parse error from {method} {url}: {e}\nRaw (first 4KB):\n{out[:4096]}", exc=ApiError)
+            active_metrics().decoded(time.monotonic() - t0)
+            return doc
 
         # Non-zero return: inspect stderr for status
-        stderr = proc.stderr or ""
         transient = any(code in stderr for code in [" 500 ", " 502 ", " 503 ", " 504 "]) or \
                     "Read timed out" in stderr or "Connection reset" in stderr or "EOF occurred" in stderr
 
         # 429 with Retry-After
         if " 429 " in stderr:
+            active_metrics().retry("429")
             m = re.search(r"Retry-After:\s*(\d+)", stderr, flags=re.IGNORECASE)
             ra = int(m.group(1)) if m else None
             wait = ra if ra is not None else min(60, (base ** attempt) + random.uniform(0, 0.5))
-            print(f"  429 rate limited; retrying in {wait:.1f}s …", file=sys.stderr)
-            time.sleep(wait)
+            print(f"  429 rate limited; all workers pausing {wait:.1f}s …", file=sys.stderr)
+            GOVERNOR.pause(wait)
             continue
 
         if transient and attempt < max_attempts:
+            active_metrics().retry("5xx" if re.search(r" 5\d\d ", stderr) else "network")
+            _CALL_INFO.degraded = True
             sleep = min(60, (base ** attempt) + random.uniform(0, 0.75))
             print(f"  transient error (attempt {attempt}/{max_attempts}); retrying in {sleep:.1f}s …", file=sys.stderr)
             time.sleep(sleep)
             continue
 
+        if missing_ok and (" 404 " in stderr or " 410 " in stderr):
+            return None
+
         # Unauthorized should fail fast with a clear message
         if "Unauthorized" in stderr or " 401 " in stderr:
-            die("HTTPie 401 Unauthorized. Verify VERACODE_API_KEY_ID/VERACODE_API_KEY_SECRET and tenant access.\n" + stderr)
+            die("HTTPie 401 Unauthorized. Verify VERACODE_API_KEY_ID/VERACODE_API_KEY_SECRET and tenant access.\n" + stderr,
+                exc=AuthError, status=401)
+        if "Forbidden" in stderr or " 403 " in stderr:
+            die(f"HTTPie 403 Forbidden. The API credentials lack the Reporting API permission for {url}.\n" + stderr,
+                exc=AuthError, status=403)
 
         # Final hard fail
-        die(f"HTTPie error after {attempt} attempt(s):\n{stderr}", code=proc.returncode)
+        die(f"HTTPie error after {attempt} attempt(s):\n{stderr}", code=proc.returncode, exc=ApiError)
+
+
+STREAM_CHUNK = 64 << 10  # bytes read per step of a streamed page response
+
+
+class PageStreamBroken(Exception):
+    """A streamed page body broke off (dropped connection, HTTPie failing mid-body) before it was complete."""
+
+
+def _native_page_chunks(url: str):
+    """
+    Body of one streamed GET over the pooled session, chunk by chunk. Error statuses are retried (or raised) by
+    call_native before any body is read. The GOVERNOR slot stays held until the body is read to its end (or the
+    stream breaks), so page downloads count against the concurrency limit; the call is recorded then.
+    """
+    import requests  # type: ignore
+
+    resp = call_native("GET", url, stream=True)
+    t0 = time.monotonic() - resp.elapsed.total_seconds()
+    n = 0
+    ok = False
+    try:
+        with resp:
+            try:
+                for chunk in resp.iter_content(STREAM_CHUNK):
+                    n += len(chunk)
+                    yield chunk
+            except requests.RequestException as e:
+                raise PageStreamBroken(f"{type(e).__name__}: {e}") from e
+        ok = True
+    finally:
+        GOVERNOR.release("ok" if ok else "error")
+        active_metrics().observe_call(call_kind("GET", url), time.monotonic() - t0, n, ok=ok)
+        _CALL_INFO.bytes = n
+
+
+def _read_http_head(stream) -> tuple[int | None, dict[str, str]]:
+    """Status and headers (lower-case names) at the start of HTTPie --print=hb output; None when there are none."""
+    m = re.match(rb"HTTP/[\d.]+ (\d{3})", stream.readline())
+    if not m:
+        return None, {}
+    headers: dict[str, str] = {}
+    while line := stream.readline().strip():
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return int(m.group(1)), headers
+
+
+def _httpie_page_chunks(url: str):
+    """
+    Body of one GET through HTTPie, read from its stdout chunk by chunk instead of captured whole. HTTPie prints
+    the status line and headers first (--print=hb), so a 429 or 5xx goes through retry_status, and any other
+    error status fails the call, before a byte of body is parsed. A 2xx keeps its GOVERNOR slot until the body
+    is read to its end.
+    """
+    kind = call_kind("GET", url)
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        _CALL_INFO.attempts = attempt
+        GOVERNOR.acquire()
+        outcome = "error"
+        status = None
+        t0 = time.monotonic()
+        try:
+            try:
+                proc = subprocess.Popen(["http", "--print=hb", "-A", "veracode_hmac", "GET", url],
+                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            except FileNotFoundError:
+                die("http(ie) is not installed. Install with `pip install httpie`.", exc=ConfigError)
+            status, headers = _read_http_head(proc.stdout)
+            if status is not None:
+                outcome = GOVERNOR.outcome_for(status)
+        finally:
+            if status is None or not 200 <= status < 300:  # a 2xx holds its slot while the body streams
+                GOVERNOR.release(outcome)
+        if status is not None and 200 <= status < 300:
+            break
+        body = proc.stdout.read().decode("utf-8", "replace")  # type: ignore[union-attr]
+        stderr = proc.stderr.read().decode("utf-8", "replace")  # type: ignore[union-attr]
+        proc.wait()
+        active_metrics().observe_call(kind, time.monotonic() - t0, len(body), ok=False)
+        if status is None:  # no response at all (connection refused, reset, timed out)
+            if attempt < MAX_ATTEMPTS:
+                active_metrics().retry("network")
+                _CALL_INFO.degraded = True
+                sleep = backoff_delay(attempt)
+                print(f"  transient error (attempt {attempt}/{MAX_ATTEMPTS}); retrying in {sleep:.1f}s …",
+                      file=sys.stderr)
+                time.sleep(sleep)
+                continue
+            die(f"HTTPie error after {attempt} attempt(s):\n{stderr}", code=proc.returncode or 1, exc=ApiError)
+        if retry_status(status, headers.get("retry-after"), attempt):
+            continue
+        if status == 401:
+            die("HTTPie 401 Unauthorized. Verify VERACODE_API_KEY_ID/VERACODE_API_KEY_SECRET and tenant access.\n"
+                + body[:2000], exc=AuthError, status=status)
+        if status == 403:
+            die(f"HTTPie 403 Forbidden. The API credentials lack the Reporting API permission for {url}.\n"
+                + body[:2000], exc=AuthError, status=status)
+        die(f"HTTP {status} from GET {url} after {attempt} attempt(s):\n{body[:4096]}", exc=ApiError, status=status)
+    n = 0
+    ok = False
+    try:
+        while chunk := proc.stdout.read1(STREAM_CHUNK):  # type: ignore[union-attr]
+            n += len(chunk)
+            yield chunk
+        if proc.wait() != 0:
+            stderr = proc.stderr.read().decode("utf-8", "replace")  # type: ignore[union-attr]
+            raise PageStreamBroken(stderr.strip()[-500:] or f"http exited with {proc.returncode}")
+        ok = True
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        GOVERNOR.release("ok" if ok else "error")
+        active_metrics().observe_call(kind, time.monotonic() - t0, n, ok=ok)
+        _CALL_INFO.bytes = n
+
+
+def stream_page(url: str):
+    """
+    GET one report page, yielding its items as they are parsed off the wire (PageStreamParser), so about one item
+    is in memory per page in flight; returns (page without its items, item count) for the pagination logic.
+    Error statuses are retried before the body is read, as for any call (429 pauses, 5xx backs off). When the
+    body itself breaks (dropped connection, cut-off or malformed JSON) the page is fetched again through call_api
+    and the items already yielded are skipped.
+    """
+    _CALL_INFO.attempts = 1
+    _CALL_INFO.degraded = False
+    _CALL_INFO.bytes = 0
+    chunks = _httpie_page_chunks(url) if TRANSPORT == "httpie" else _native_page_chunks(url)
+    parser = PageStreamParser(chunks)
+    try:
+        page = yield from parser.parse()
+        return page, parser.items
+    except (ValueError, PageStreamBroken) as e:
+        active_metrics().retry("stream")
+        print(f"  streamed page failed after {parser.items} item(s) ({e}); refetching …", file=sys.stderr)
+    finally:
+        chunks.close()
+        active_metrics().decoded(parser.decode_s)
+    page = call_api("GET", url)
+    items = extract_items(page)
+    yield from items[parser.items:]
+    return page, len(items)
+
+
+def parse_page_size(value: str) -> int | str:
+    """argparse type for --size: a positive integer or 'auto'."""
+    if value.strip().lower() == "auto":
+        return "auto"
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an integer or 'auto', got {value!r}")
+    if n <= 0:
+        raise argparse.ArgumentTypeError("page size must be > 0")
+    return n
+
+
+def parse_day(value: str, what: str) -> date:
+    """A YYYY-MM-DD date option; ConfigError (not a bare ValueError) when malformed."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        die(f"{what} must be a YYYY-MM-DD date, got {value!r}", exc=ConfigError)
 
 
 def windows_180(from_d: str, to_d: str) -> list[tuple[str, str]]:
-    start = datetime.strptime(from_d, "%Y-%m-%d").date()
-    end = datetime.strptime(to_d, "%Y-%m-%d").date()
+    start = parse_day(from_d, "--from")
+    end = parse_day(to_d, "--to")
     if end < start:
-        die("--to must be >= --from")
+        die("--to must be >= --from", exc=ConfigError)
     out: list[tuple[str, str]] = []
     cur = start
     step = timedelta(days=180)
@@ -139,6 +943,49 @@ def windows_180(from_d: str, to_d: str) -> list[tuple[str, str]]:
     return out
 
 
+WINDOW_TARGET_MIN = 10_000  # auto --window-target never plans windows smaller than this many findings
+
+
+def plan_windows(from_d: str, to_d: str, density: dict[str, float], target: float,
+                 max_days: int = 180) -> list[tuple[str, str]]:
+    """
+    Adaptive windows: walk the range day by day, closing a window before it would exceed `target` estimated
+    findings or `max_days` days, so heavy periods get short windows and sparse ones stay long.
+    density maps ISO day -> estimated findings that day; days without an estimate use the mean of known days.
+    One day is the smallest window (a single day above target stays whole).
+    """
+    start = parse_day(from_d, "--from")
+    end = parse_day(to_d, "--to")
+    if end < start:
+        die("--to must be >= --from", exc=ConfigError)
+    fallback = statistics.mean(density.values()) if density else 0.0
+    out: list[tuple[str, str]] = []
+    w_start, acc, cur = start, 0.0, start
+    while cur <= end:
+        n = density.get(cur.isoformat(), fallback)
+        days = (cur - w_start).days
+        if days >= max_days or (days > 0 and acc + n > target):
+            out.append((w_start.isoformat(), (cur - timedelta(days=1)).isoformat()))
+            w_start, acc = cur, 0.0
+        acc += n
+        cur += timedelta(days=1)
+    out.append((w_start.isoformat(), end.isoformat()))
+    return out
+
+
+def estimate_window(w_start: str, w_end: str, density: dict[str, float]) -> float | None:
+    """Estimated findings in a window, or None when no day of it has an estimate."""
+    d, end = date.fromisoformat(w_start), date.fromisoformat(w_end)
+    vals = []
+    while d <= end:
+        if d.isoformat() in density:
+            vals.append(density[d.isoformat()])
+        d += timedelta(days=1)
+    if not vals:
+        return None
+    return sum(vals) * ((end - date.fromisoformat(w_start)).days + 1) / len(vals)
+
+
 # ----------------------------- Payload helpers -----------------------------
 
 def extract_report_id(post_json: dict[str, Any]) -> str:
@@ -147,7 +994,7 @@ def extract_report_id(post_json: dict[str, Any]) -> str:
         rid = post_json["_embedded"].get("id")
     rid = str(rid) if rid else ""
     if not rid:
-        die(f"POST returned no report id:\n{json.dumps(post_json, indent=2)[:2000]}")
+        die(f"POST returned no report id:\n{json.dumps(post_json, indent=2)[:2000]}", exc=ApiError)
     return rid
 
 
@@ -183,6 +1030,147 @@ def extract_items(page_json: dict[str, Any]) -> list[dict[str, Any]]:
     return []
 
 
+# where extract_items looks for the findings array, as key paths (streamed by PageStreamParser)
+ITEM_PATHS = (("content",), ("_embedded", "items"), ("_embedded", "findings"), ("findings",))
+_ITEM_PARENTS = {p[:n] for p in ITEM_PATHS for n in range(1, len(p))}
+_JSON_WS = re.compile(r"[ \t\n\r]*")
+_JSON_NUMBER_TAIL = re.compile(r"[0-9eE.+-]*")
+
+
+class PageStreamParser:
+    """
+    Incremental parser for one page response arriving as byte chunks. parse() is a generator: the elements of
+    the first array found at an ITEM_PATHS position are yielded one by one as soon as each is complete; every
+    other value (page metadata, _links, ...) is decoded whole into the page returned at the end, where the items
+    array is left empty. Memory held is about one item plus one chunk of text, not the page. A bare top-level
+    array is streamed as the items. The body is read to its end; malformed, cut-off or trailing text raises
+    ValueError.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self.items = 0
+        self.decode_s = 0.0
+        self.items_path: tuple[str, ...] | None = None
+
+    def _more(self) -> bool:
+        """Append the next chunk to the unread text; False at the end of the body."""
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+        self._buf = self._buf[self._pos:] + self._utf8.decode(chunk or b"", final=chunk is None)
+        self._pos = 0
+        return not self._eof
+
+    def _peek(self) -> str:
+        """The next non-whitespace character, not consumed ('' at the end of the body)."""
+        while True:
+            self._pos = _JSON_WS.match(self._buf, self._pos).end()  # type: ignore[union-attr]
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._more():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        c = self._peek()
+        if not c or c not in chars:
+            raise ValueError(f"page JSON: expected one of {chars!r}, found {c or 'end of body'!r}")
+        self._pos += 1
+        return c
+
+    def _value(self) -> Any:
+        """Decode one complete JSON value, reading more chunks until it is whole."""
+        self._peek()
+        while True:
+            t0 = time.perf_counter()
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                self.decode_s += time.perf_counter() - t0
+                if self._more():
+                    continue
+                raise
+            self.decode_s += time.perf_counter() - t0
+            if isinstance(obj, (int, float)) and _JSON_NUMBER_TAIL.fullmatch(self._buf, end) and self._more():
+                continue  # a number cut at the end of a chunk ("12." + "5e3") goes on in the next one
+            self._pos = end
+            return obj
+
+    def _array(self):
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            obj = self._value()
+            self.items += 1
+            yield obj
+            if self._expect(",]") == "]":
+                return
+
+    def _object(self, path: tuple[str, ...]):
+        out: dict[str, Any] = {}
+        if self._peek() == "}":
+            self._pos += 1
+            return out
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise ValueError(f"page JSON: object key expected, found {key!r}")
+            self._expect(":")
+            sub = path + (key,)
+            c = self._peek()
+            if c == "[" and self.items_path is None and sub in ITEM_PATHS:
+                self.items_path = sub
+                yield from self._array()
+                out[key] = []
+            elif c == "{" and sub in _ITEM_PARENTS:
+                self._pos += 1
+                out[key] = yield from self._object(sub)
+            else:
+                out[key] = self._value()
+            if self._expect(",}") == "}":
+                return out
+
+    def parse(self):
+        """Yield the page's items; the generator's return value is the page without them."""
+        c = self._peek()
+        if not c:  # empty body, as call_api returns it
+            return {}
+        if c == "[":
+            self.items_path = ()
+            yield from self._array()
+            page: dict[str, Any] = {}
+        else:
+            self._expect("{")
+            page = yield from self._object(())
+        self._end()
+        return page
+
+    def _end(self) -> None:
+        """Read the body to its end (so the chunk source finishes and records the call); only whitespace may follow."""
+        c = self._peek()
+        if c:
+            raise ValueError(f"page JSON: unexpected {c!r} after the page")
+
+
+def lookup_field(obj: dict[str, Any], path: str) -> Any:
+    """Value at a dotted path (e.g. 'finding_details.cwe.id'), or None."""
+    cur: Any = obj
+    for part in path.split("."):
+        if not isinstance(cur, dict):
+            return None
+        cur = cur.get(part)
+    return cur
+
+
 def hal_next(page_json: dict[str, Any]) -> str | None:
     links = page_json.get("_links")
     if isinstance(links, dict):
@@ -242,12 +1230,17 @@ def normalize_page_meta(payload: dict[str, Any]) -> dict[str, int | None]:
     """Return {number,total_pages,size,total_elements} if discoverable."""
     meta = _find_page_meta(payload)
     te: int | None = None
+    emb = payload.get("_embedded") or {}
     for candidate in (
         payload.get("totalElements"), payload.get("total_elements"),
         (payload.get("page") or {}).get("totalElements"),
+        (payload.get("page") or {}).get("total_elements"),
         (payload.get("page_metadata") or {}).get("totalElements"),
-        (payload.get("_embedded") or {}).get("totalElements"),
-        (payload.get("_embedded", {}).get("page") or {}).get("totalElements"),
+        (payload.get("page_metadata") or {}).get("total_elements"),
+        emb.get("totalElements"), emb.get("total_elements"),
+        (emb.get("page") or {}).get("totalElements"),
+        (emb.get("page") or {}).get("total_elements"),
+        (emb.get("page_metadata") or {}).get("total_elements"),
     ):
         if isinstance(candidate, (int, str)):
             try:
@@ -272,400 +1265,3397 @@ def post_report(report_type: str, start_d: str, end_d: str, extra: dict[str, Any
         # NOTE: do NOT set "status" here → API returns open+closed+mitigated by default
     }
     body.update(extra or {})
-    resp = call_httpie("POST", POST_URL, body)
+    resp = call_api("POST", POST_URL, body)
     return extract_report_id(resp)
 
 
+def fetch_status(rid: str, missing_ok: bool = False) -> tuple[str, bool] | None:
+    """One status GET: (STATUS upper-cased or 'UNKNOWN', completed?); None if missing_ok and the id is gone."""
+    meta = call_api("GET", GET_URL_META_T.format(rid=rid), missing_ok=missing_ok)
+    if meta is None:
+        return None
+    return (current_status(meta) or "UNKNOWN").upper(), is_completed(meta)
+
+
+def print_status(st: str, icons: bool, label: str = "") -> None:
+    st_icon = ICONS["status"].get(st, ICONS["status"]["UNKNOWN"]) if icons else ""
+    print(f"  {st_icon} status: {st}{label}".rstrip())
+
+
 def poll_ready(rid: str, max_wait_s: int, interval_s: float, icons: bool) -> None:
     deadline = time.time() + max_wait_s
     last = ""
     while time.time() < deadline:
-        meta = call_httpie("GET", GET_URL_META_T.format(rid=rid))
-        st = (current_status(meta) or "UNKNOWN").upper()
+        st, completed = fetch_status(rid)  # type: ignore[misc]
         if st != last:
-            st_icon = ICONS["status"].get(st, ICONS["status"]["UNKNOWN"]) if icons else ""
-            print(f"  {st_icon} status: {st}".rstrip())
+            print_status(st, icons)
             last = st
-        if is_completed(meta):
+        if completed:
             return
         time.sleep(interval_s)
-    die(f"Report {rid} not ready within {max_wait_s}s")
+    die(f"Report {rid} not ready within {max_wait_s}s", exc=ReportTimeout)
+
+
+def _next_page(page: dict[str, Any], n_items: int, rid: str, size: int, page_no: int) -> tuple[str | None, int]:
+    """Pick the URL/index of the page after page_no (HAL next → page meta → length heuristic), or (None, page_no)."""
+    # 1) HAL next (force &size if omitted)
+    nxt = hal_next_with_size(page, size) or hal_next(page)
+    if nxt:
+        return nxt, page_no + 1
+
+    # 2) Page meta next
+    meta_next = _find_page_meta(page)
+    if meta_next and "number" in meta_next and "total_pages" in meta_next:
+        num = meta_next["number"]
+        tot = meta_next["total_pages"]
+        if isinstance(num, int) and isinstance(tot, int):
+            if (num + 1) < tot:
+                return GET_URL_T.format(rid=rid, page=(num + 1), size=size), num + 1
+            return None, page_no  # meta says this was the last page; skip the length heuristic
+
+    # 3) Length-based fallback
+    if n_items == size:
+        return GET_URL_T.format(rid=rid, page=page_no + 1, size=size), page_no + 1
+
+    # Done
+    return None, page_no
+
+
+def ordered_map(fn, args: list[Any], workers: int):
+    """Run fn over args on a bounded thread pool; yield (arg, result) in input order as results arrive."""
+    if workers <= 1:
+        for a in args:
+            yield a, fn(a)
+        return
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page", initializer=inherit_metrics,
+                            initargs=(active_metrics(),)) as pool:
+        window: deque[tuple[Any, Future]] = deque()
+        it = iter(args)
+        for a in it:
+            window.append((a, pool.submit(fn, a)))
+            if len(window) >= workers * 2:
+                break
+        while window:
+            a, fut = window.popleft()
+            res = fut.result()
+            nxt = next(it, None)
+            if nxt is not None:
+                window.append((nxt, pool.submit(fn, nxt)))
+            yield a, res
 
 
-def stream_report_items(rid: str, size: int):
+def stream_report_items(rid: str, size: int | str, page_workers: int = 1, start_page: int = 0,
+                        start_offset: int = 0):
     """
     Exhaustive pagination:
-      1) Start at page=0
-      2) Follow HAL _links.next (forcing your size if missing)
-      3) Else use page metadata (camel/snake)
-      4) Else fallback: if items == size, try next page index; stop on short/empty
-    Yields a marker dict {'__PAGE_META__': {...}} before each page's items.
+      1) Start at page=start_page (0 unless resuming)
+      2) If page_workers > 1 and the first page reports total_pages, fetch the rest concurrently (yielded in order)
+      3) Follow HAL _links.next (forcing your size if missing)
+      4) Else use page metadata (camel/snake)
+      5) Else fallback: if items == size, try next page index; stop on short/empty
+    With size="auto", pages are requested by item offset with a tuned size (see stream_report_items_auto).
+    Yields a marker dict {'__PAGE_META__': {...}} before each page's items. Pages fetched one at a time are parsed
+    as they arrive (stream_page); their marker's count and meta are filled in once the page is complete, i.e.
+    before the next marker.
     """
-    page_no = 0
+    if size == "auto":
+        yield from stream_report_items_auto(rid, page_workers, start_page, start_offset)
+        return
+    assert isinstance(size, int)
+    page_no = start_page
     next_url = GET_URL_T.format(rid=rid, page=page_no, size=size)
 
     while next_url:
-        page = call_httpie("GET", next_url)
-        items = extract_items(page)
+        marker: dict[str, Any] = {"page_no": page_no, "count": 0, "meta": {}}
+        yield {"__PAGE_META__": marker}
+        page, n_items = yield from stream_page(next_url)
         meta = normalize_page_meta(page)
+        marker.update(count=n_items, meta=meta)
 
-        yield {"__PAGE_META__": {"page_no": page_no, "count": len(items), "meta": meta}}
-        for it in items:
-            yield it
+        total_pages = meta.get("total_pages")
+        if page_no == start_page and page_workers > 1 and isinstance(total_pages, int) and total_pages > page_no + 1:
+            fetch = lambda n: call_api("GET", GET_URL_T.format(rid=rid, page=n, size=size))  # noqa: E731
+            for page_no, page in ordered_map(fetch, list(range(page_no + 1, total_pages)), page_workers):
+                items = extract_items(page)
+                n_items = len(items)
+                yield {"__PAGE_META__": {"page_no": page_no, "count": n_items, "meta": normalize_page_meta(page)}}
+                yield from items
 
-        # 1) HAL next (force &size if omitted)
-        nxt = hal_next_with_size(page, size) or hal_next(page)
-        if nxt:
-            next_url = nxt
-            page_no += 1
-            continue
+        next_url, page_no = _next_page(page, n_items, rid, size, page_no)
 
-        # 2) Page meta next
-        meta_next = _find_page_meta(page)
-        if meta_next and "number" in meta_next and "total_pages" in meta_next:
-            num = meta_next["number"]
-            tot = meta_next["total_pages"]
-            if isinstance(num, int) and isinstance(tot, int) and (num + 1) < tot:
-                next_url = GET_URL_T.format(rid=rid, page=(num + 1), size=size)
-                page_no = num + 1
-                continue
 
-        # 3) Length-based fallback
-        if len(items) == size:
-            page_no += 1
-            next_url = GET_URL_T.format(rid=rid, page=page_no, size=size)
-            continue
+class PageSizeTuner:
+    """
+    Per-report page-size hill climb for --size auto.
+    Sizes come from a doubling ladder so any item offset reached with full pages stays page-aligned.
+    Climbs while items/sec improves by >10%, stops at the best size, and steps down (capping the ladder)
+    when a page needed a timeout/5xx retry or would exceed MAX_PAGE_BYTES.
+    A server that serves fewer items per page than asked sets `cap`: no size above it is requested again.
+    """
 
-        # Done
-        next_url = None
+    LADDER = (125, 250, 500, 1000)
+    MAX_PAGE_BYTES = 16 * 1024 * 1024
 
+    def __init__(self, start: int = 250):
+        self.idx = self.LADDER.index(start) if start in self.LADDER else 1
+        self.max_idx = len(self.LADDER) - 1
+        self.cap: int | None = None
+        self.rates: dict[int, float] = {}
+        self.settled = False
+        self.trace: list[dict[str, Any]] = []
 
-# ----------------------------- Outputs: JSON/JSONL + CSV (single) + XLSX (single workbook) -----------------------------
+    @property
+    def size(self) -> int:
+        return min(self.LADDER[self.idx], self.cap) if self.cap else self.LADDER[self.idx]
 
-def write_jsonl(all_items: list[dict[str, Any]], jsonl_path: Path) -> int:
-    n = 0
-    with jsonl_path.open("w", encoding="utf-8") as jf:
-        for obj in all_items:
-            if "__PAGE_META__" in obj:
-                continue
-            jf.write(json.dumps(obj, ensure_ascii=False) + "\n")
-            n += 1
-    return n
+    def size_for(self, offset: int) -> int:
+        """
+        Current size, or the largest smaller ladder size (or the cap) that keeps `offset` page-aligned, so
+        page=offset/size starts exactly at offset; failing those, the largest divisor of offset below the size.
+        """
+        limit = self.size
+        sizes = {s for s in self.LADDER[:self.idx + 1] if s <= limit} | ({self.cap} if self.cap else set())
+        for s in sorted(sizes, reverse=True):
+            if offset % s == 0:
+                return s
+        return next(d for d in range(limit, 0, -1) if offset % d == 0)
 
+    def capped(self, served: int) -> None:
+        """The server served `served` items per page for a larger size: never ask for more again."""
+        self.cap = min(self.cap or served, served)
+        self.settled = True
 
-def build_headers_from_jsonl(jsonl_path: Path) -> list[str]:
-    """Make a union of flattened keys without loading all records in RAM."""
-    def flatten_keys(d: dict[str, Any], prefix: str = "") -> set[str]:
-        out: set[str] = set()
-        for k, v in d.items():
-            key = f"{prefix}.{k}" if prefix else k
-            if isinstance(v, dict):
-                out |= flatten_keys(v, key)
-            else:
-                out.add(key)
-        return out
+    def observe(self, size: int, items: int, seconds: float, nbytes: int, degraded: bool) -> None:
+        rate = items / max(seconds, 1e-3)
+        self.trace.append({"size": size, "items": items, "seconds": round(seconds, 3),
+                           "bytes_per_item": round(nbytes / items) if items else None, "degraded": degraded})
+        if size not in self.LADDER:
+            return  # a capped or re-aligning size: not a ladder step
+        i = self.LADDER.index(size)
+        if degraded:
+            self.max_idx = max(0, i - 1)
+            self.idx = min(self.idx, self.max_idx)
+            self.settled = True
+            return
+        if items < size:
+            return  # a short (last) page says nothing about throughput
+        prev = self.rates.get(size)
+        self.rates[size] = rate if prev is None else 0.5 * prev + 0.5 * rate
+        if self.settled or i != self.idx:
+            return
+        smaller = self.rates.get(self.LADDER[i - 1]) if i > 0 else None
+        if smaller is not None and self.rates[size] < smaller * 1.1:
+            self.idx = i - 1
+            self.settled = True
+        elif i < self.max_idx and (nbytes / items) * self.LADDER[i + 1] <= self.MAX_PAGE_BYTES:
+            self.idx = i + 1
+        else:
+            self.settled = True
 
-    headers: set[str] = set()
-    with jsonl_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            obj = json.loads(line)
-            headers |= flatten_keys(obj)
-    return sorted(headers)
 
+_AUTO_SIZE_HINT = 250  # last settled --size auto choice; seeds the next report's tuner
 
-def flatten_for_row(d: dict[str, Any], headers: list[str]) -> dict[str, Any]:
-    """Flatten d according to headers. Lists are JSON-encoded strings."""
-    def flatten(d0: dict[str, Any], prefix: str = "", out: dict[str, Any] | None = None) -> dict[str, Any]:
-        if out is None:
-            out = {}
-        for k, v in d0.items():
-            key = f"{prefix}.{k}" if prefix else k
-            if isinstance(v, dict):
-                flatten(v, key, out)
-            elif isinstance(v, list):
-                out[key] = json.dumps(v, ensure_ascii=False)
-            else:
-                out[key] = v
-        return out
-    flat = flatten(d)
-    return {h: flat.get(h, None) for h in headers}
 
+def _has_more(page: dict[str, Any], items: list[Any], size: int) -> bool:
+    """Whether another page follows (HAL next → page meta → length heuristic), as in _next_page."""
+    if hal_next(page):
+        return True
+    meta = _find_page_meta(page)
+    num, tot = meta.get("number"), meta.get("total_pages")
+    if isinstance(num, int) and isinstance(tot, int):
+        return num + 1 < tot
+    return len(items) == size
 
-def write_csv_single_from_jsonl(jsonl_path: Path, out_dir: Path, base_name: str, headers: list[str]) -> Path:
-    """Stream JSONL -> one CSV file (unbounded; limited by disk)."""
-    csv_path = out_dir / f"{base_name}.csv"
-    with csv_path.open("w", encoding="utf-8", newline="") as fw:
-        writer = csv.DictWriter(fw, fieldnames=headers, extrasaction="ignore")
-        writer.writeheader()
-        with jsonl_path.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                obj = json.loads(line)
-                writer.writerow(flatten_for_row(obj, headers))
-    return csv_path
 
+def served_page_size(page: dict[str, Any], items: list[Any], size: int) -> int:
+    """
+    Items per page the server used for a request of `size` (it may cap ?size=): the page meta size, else the
+    item count of a short page that is not the last one, else size.
+    """
+    served = _find_page_meta(page).get("size")
+    if isinstance(served, int) and served > 0:
+        return min(served, size)
+    if len(items) < size and _has_more(page, items, size):
+        return max(1, len(items))
+    return size
 
-def write_xlsx_one_workbook_from_jsonl(
-    jsonl_path: Path, out_dir: Path, base_name: str, headers: list[str],
-    max_rows_per_sheet: int = 1_048_000,  # Excel limit minus buffer for header
-    chunk_size: int = 100_000
-) -> Path:
+
+def stream_report_items_auto(rid: str, page_workers: int = 1, start_page: int = 0, start_offset: int = 0):
+    """
+    --size auto pagination: request page=offset/size&size=size with sizes from a PageSizeTuner, measuring
+    latency and bytes/item per page. HAL next / page meta / short pages still decide when to stop.
+    Items are placed by the page size the server actually served: a page served smaller than asked starts at
+    page*served, so only its items from `offset` on are kept and the tuner is capped to that size.
+    Once the size settles and total_elements is known, remaining pages go through the page_workers pool.
+    Page markers carry "size" (items the page held from "offset" on) and "offset"; page_no counts pages
+    fetched (not the server page index).
+    """
+    global _AUTO_SIZE_HINT
+    tuner = PageSizeTuner(_AUTO_SIZE_HINT)
+    offset, page_no = start_offset, start_page
+    total_elements: int | None = None
+
+    def place(page: dict[str, Any], items: list[Any], size: int, n: int) -> tuple[list[Any], int, int]:
+        """(items from offset on, their page's capacity from offset, page start) of server page n asked at size."""
+        served = served_page_size(page, items, size)
+        if served < size:
+            tuner.capped(served)
+        start = n * served
+        if not start <= offset < start + max(len(items), 1):
+            return [], 0, start
+        return items[offset - start:], served - (offset - start), start
+
+    def marker(page: dict[str, Any], items: list[Any], size: int) -> dict[str, Any]:
+        return {"__PAGE_META__": {"page_no": page_no, "count": len(items), "meta": normalize_page_meta(page),
+                                  "size": size, "offset": offset}}
+
+    while True:
+        size = tuner.size_for(offset)
+        t0 = time.monotonic()
+        page = call_api("GET", GET_URL_T.format(rid=rid, page=offset // size, size=size))
+        info = last_call_info()
+        items = extract_items(page)
+        tuner.observe(size, len(items), time.monotonic() - t0, info["bytes"], info["degraded"])
+        te = normalize_page_meta(page).get("total_elements")
+        total_elements = te if isinstance(te, int) else total_elements
+        kept, held, start = place(page, items, size, offset // size)
+        if start != offset and not kept and items:
+            continue  # capped page wholly before offset: ask again at the capped size
+        yield marker(page, kept, held)
+        yield from kept
+        offset += len(kept)
+        page_no += 1
+        if not _has_more(page, items, size):
+            break
+
+        size = tuner.size_for(offset)
+        if tuner.settled and page_workers > 1 and total_elements and size == tuner.size and offset < total_elements:
+            first, last = offset // size, (total_elements - 1) // size
+            fetch = lambda n: call_api("GET", GET_URL_T.format(rid=rid, page=n, size=size))  # noqa: E731
+            for n, page in ordered_map(fetch, list(range(first, last + 1)), page_workers):
+                items = extract_items(page)
+                served = served_page_size(page, items, size)
+                if n * size != offset or served != size:
+                    if served < size:
+                        tuner.capped(served)
+                    break  # capped, or after a short page: go on one page at a time from offset
+                yield marker(page, items, size)
+                yield from items
+                offset += len(items)
+                page_no += 1
+            else:
+                if not _has_more(page, items, size):
+                    break
+
+    _AUTO_SIZE_HINT = tuner.size
+    sizes = [t["size"] for t in tuner.trace]
+    print(f"    auto size: {' → '.join(str(x) for x in dict.fromkeys(sizes))}; settled on {tuner.size} "
+          f"({rid})")
+
+
+# ----------------------------- Scheduler: concurrent windows -----------------------------
+
+class PollHistory:
+    """
+    Persisted report-generation times (poll_history.json), keyed by report type and window length in days.
+    Used to guess when a new report of the same shape will reach COMPLETED.
+    """
+
+    KEEP = 20
+
+    def __init__(self, path: Path | None):
+        self.path = path
+        self._lock = threading.Lock()  # one instance is shared by concurrent --jobs
+        self.data: dict[str, list[float]] = {}
+        if path and path.exists():
+            try:
+                self.data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self.data = {}
+
+    @staticmethod
+    def key(report_type: str, w_start: str, w_end: str) -> str:
+        days = (date.fromisoformat(w_end) - date.fromisoformat(w_start)).days + 1
+        return f"{report_type}|{days}d"
+
+    def expected(self, key: str) -> float | None:
+        """Median of recent completion times for key, or None without history."""
+        hist = self.data.get(key)
+        return statistics.median(hist) if hist else None
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self.data[key] = (self.data.get(key, []) + [round(seconds, 2)])[-self.KEEP:]
+            if self.path:
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(self.data, indent=2), encoding="utf-8")
+                os.replace(tmp, self.path)
+
+
+class VolumeHistory:
+    """
+    Persisted findings per window (window_volumes.json) from total_elements of earlier runs and probes,
+    keyed by report type and filters. density() spreads each window's total evenly over its days; newer
+    observations override older ones, so windows split in one run give finer estimates to the next.
+    """
+
+    KEEP = 500
+
+    def __init__(self, path: Path | None):
+        self.path = path
+        self._lock = threading.Lock()  # one instance is shared by concurrent --jobs
+        self.data: dict[str, list[dict[str, Any]]] = {}
+        if path and path.exists():
+            try:
+                self.data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self.data = {}
+
+    @staticmethod
+    def key(report_type: str, filters: dict[str, Any] | None) -> str:
+        return f"{report_type}|{json.dumps(filters or {}, sort_keys=True, separators=(',', ':'))}"
+
+    def density(self, key: str) -> dict[str, float]:
+        out: dict[str, float] = {}
+        for rec in sorted(self.data.get(key, []), key=lambda r: r["at"]):
+            d, end = date.fromisoformat(rec["start"]), date.fromisoformat(rec["end"])
+            per_day = rec["total"] / ((end - d).days + 1)
+            while d <= end:
+                out[d.isoformat()] = per_day
+                d += timedelta(days=1)
+        return out
+
+    def record(self, key: str, w_start: str, w_end: str, total: int) -> None:
+        with self._lock:
+            recs = [r for r in self.data.get(key, []) if (r["start"], r["end"]) != (w_start, w_end)]
+            recs.append({"start": w_start, "end": w_end, "total": total,
+                         "at": datetime.now(timezone.utc).isoformat(timespec="seconds")})
+            self.data[key] = recs[-self.KEEP:]
+            if self.path:
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(self.data, indent=2), encoding="utf-8")
+                os.replace(tmp, self.path)
+
+
+POLL_MIN_INTERVAL = 0.5
+
+
+def next_poll_delay(strategy: str, elapsed: float, expected: float | None, interval: float, cap: float) -> float:
+    """
+    Seconds until the next status GET of a report that has been generating for `elapsed` seconds.
+      fixed    : always `interval`
+      adaptive : sleep until ~90% of the historical completion time, then back off proportionally
+                 (a quarter of the elapsed time), never below POLL_MIN_INTERVAL or above `cap`
+    """
+    if strategy == "fixed":
+        return interval
+    if expected is not None and elapsed < 0.9 * expected:
+        return max(POLL_MIN_INTERVAL, min(cap, 0.9 * expected - elapsed))
+    return max(POLL_MIN_INTERVAL, min(cap, 0.25 * elapsed))
+
+
+def run_windows(
+    windows: list[tuple[str, str]], report_type: str, extra: dict[str, Any], page_fn,
+    max_inflight: int, workers: int, sleep_s: float, max_wait_s: int, interval_s: float, icons: bool,
+    known_rids: dict[int, str] | None = None, on_report=None, on_ready=None,
+    poll_strategy: str = "fixed", poll_cap_s: float = 30.0, history: PollHistory | None = None,
+    cached: dict[int, str] | None = None
+):
+    """
+    Concurrent multi-window pipeline:
+      1) POST reports up to max_inflight (submitted + polling + paging + buffered windows)
+         - windows in known_rids reuse that report id (re-POSTed if the server no longer has it)
+         - on_report(idx, rid) is called for every newly POSTed report
+      2) Poll each pending report when it is due (see next_poll_delay; history informs adaptive polling)
+         - on_ready(idx, {"wait_s", "polls"}) is called when it reaches COMPLETED
+      3) Run page_fn(idx, rid) on a bounded worker pool as soon as the report is COMPLETED
+         - windows in cached go straight to page_fn with that report id (pages served from the ReportCache)
+    Yields (w_start, w_end, rid, page_fn result) strictly in window order.
+    """
+    known_rids = known_rids or {}
+    cached = cached or {}
+    history = history or PollHistory(None)
+
+    def submit(idx: int) -> str:
+        w_start, w_end = windows[idx]
+        rid = post_report(report_type, w_start, w_end, extra)
+        print(f"  {ICONS['report'] if icons else ''} report id: {rid}  (window {w_start} → {w_end})".strip())
+        if on_report:
+            on_report(idx, rid)
+        return rid
+
+    def start_polling(idx: int, rid: str, fresh: bool) -> dict[str, Any]:
+        now = time.time()
+        return {"rid": rid, "started": now, "deadline": now + max_wait_s, "last": "", "polls": 0,
+                "next_at": now + max(0.0, sleep_s), "fresh": fresh,
+                "key": PollHistory.key(report_type, *windows[idx])}
+
+    pending = deque(enumerate(windows))
+    polling: dict[int, dict[str, Any]] = {}  # idx -> poll state
+    paging: dict[int, tuple[str, Future]] = {}  # idx -> (rid, future of page_fn result)
+    done: dict[int, tuple[str, str, str, Any]] = {}
+    next_emit = 0
+    max_inflight = max(1, max_inflight)
+
+    held: set[int] = set()  # windows holding one of GOVERNOR's report slots (shared with concurrent --jobs)
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="pager", initializer=inherit_metrics,
+                              initargs=(active_metrics(),))
+    try:
+        while next_emit < len(windows):
+            starved = False
+            while pending and len(polling) + len(paging) + len(done) < max_inflight:
+                if not GOVERNOR.take_report_slot():
+                    starved = True  # other jobs hold every report slot; retry shortly
+                    break
+                idx, (w_start, w_end) = pending.popleft()
+                held.add(idx)
+                if idx in cached:
+                    print(f"  {ICONS['report'] if icons else ''} cached pages of report id: {cached[idx]}  "
+                          f"(window {w_start} → {w_end})".strip())
+                    paging[idx] = (cached[idx], pool.submit(page_fn, idx, cached[idx]))
+                elif idx in known_rids:
+                    rid = known_rids[idx]
+                    print(f"  {ICONS['report'] if icons else ''} reusing report id: {rid}  "
+                          f"(window {w_start} → {w_end})".strip())
+                    polling[idx] = start_polling(idx, rid, fresh=False)
+                else:
+                    polling[idx] = start_polling(idx, submit(idx), fresh=True)
+
+            for idx in sorted(polling):
+                ps = polling[idx]
+                now = time.time()
+                if now < ps["next_at"]:
+                    continue
+                status = fetch_status(ps["rid"], missing_ok=True)
+                ps["polls"] += 1
+                if status is None:
+                    print(f"  report {ps['rid']} no longer exists on the server; re-submitting", file=sys.stderr)
+                    polling[idx] = start_polling(idx, submit(idx), fresh=True)
+                    continue
+                st, completed = status
+                if st != ps["last"]:
+                    print_status(st, icons, label=f"  ({ps['rid']})")
+                    ps["last"] = st
+                elapsed = time.time() - ps["started"]
+                if completed:
+                    del polling[idx]
+                    stats = {"wait_s": round(elapsed, 2), "polls": ps["polls"]}
+                    print(f"    ready after {stats['wait_s']}s, {stats['polls']} status call(s)  ({ps['rid']})")
+                    if ps["fresh"]:
+                        history.record(ps["key"], elapsed)
+                    if on_ready:
+                        on_ready(idx, stats)
+                    paging[idx] = (ps["rid"], pool.submit(page_fn, idx, ps["rid"]))
+                elif time.time() > ps["deadline"]:
+                    die(f"Report {ps['rid']} not ready within {max_wait_s}s", exc=ReportTimeout)
+                else:
+                    delay = next_poll_delay(poll_strategy, elapsed, history.expected(ps["key"]), interval_s,
+                                            poll_cap_s)
+                    ps["next_at"] = time.time() + min(delay, max(0.0, ps["deadline"] - time.time()))
+
+            for idx in [i for i, (_, f) in paging.items() if f.done()]:
+                rid, fut = paging.pop(idx)
+                done[idx] = (*windows[idx], rid, fut.result())
+                held.discard(idx)
+                GOVERNOR.give_report_slot()
+
+            while next_emit in done:
+                yield done.pop(next_emit)
+                next_emit += 1
+
+            if next_emit >= len(windows):
+                break
+            timeout = max(0.0, min(ps["next_at"] for ps in polling.values()) - time.time()) if polling else None
+            if starved:
+                timeout = min(timeout, POLL_MIN_INTERVAL) if timeout is not None else POLL_MIN_INTERVAL
+            if paging:
+                wait([f for _, f in paging.values()], timeout=timeout, return_when=FIRST_COMPLETED)
+            elif timeout:
+                time.sleep(timeout)
+    finally:
+        for idx in held:
+            GOVERNOR.give_report_slot()
+        # not `with pool`: its shutdown(wait=True) would hold a failing window's error (or a consumer that stopped)
+        # until every other window finished paging; queued page_fn calls are dropped instead
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def probe_window_totals(windows: list[tuple[str, str]], report_type: str, extra: dict[str, Any],
+                        **run_kwargs: Any) -> list[tuple[str, str, str, int | None]]:
+    """
+    --plan probe: generate the reports of `windows` concurrently (run_windows) and read only total_elements
+    from a one-item first page. Returns (w_start, w_end, report id, total_elements) per window; the report
+    ids stay valid for paging windows the plan keeps unchanged.
+    """
+    def probe(idx: int, rid: str) -> int | None:
+        page = call_api("GET", GET_URL_T.format(rid=rid, page=0, size=1))
+        return normalize_page_meta(page).get("total_elements")
+
+    return list(run_windows(windows, report_type, extra, probe, **run_kwargs))
+
+
+class RunManifest:
+    """
+    Checkpoint for resumable exports (run_manifest.json in the output directory).
+    Records run parameters, the JSONL byte offset of the last fully written window and, per window,
+    its report id, status (pending → submitted → paged → written) and completed page metadata.
+    Saved atomically after every change; safe to update from worker threads.
+    """
+
+    FILENAME = "run_manifest.json"
+
+    def __init__(self, path: Path, data: dict[str, Any]):
+        self.path = path
+        self.data = data
+        self._lock = threading.RLock()
+
+    @classmethod
+    def create(cls, out_dir: Path, base: str, params: dict[str, Any], windows: list[tuple[str, str]]) -> "RunManifest":
+        data = {
+            "base": base,
+            "params": params,
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "completed": False,
+            "jsonl_bytes": 0,
+            "windows": [
+                {"start": s, "end": e, "report_id": None, "status": "pending", "pages": [], "count": 0, "schema": {}}
+                for s, e in windows
+            ],
+        }
+        m = cls(out_dir / cls.FILENAME, data)
+        m.save()
+        return m
+
+    @classmethod
+    def load(cls, out_dir: Path) -> "RunManifest":
+        path = out_dir / cls.FILENAME
+        try:
+            return cls(path, json.loads(path.read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            die(f"--resume: no {cls.FILENAME} in {out_dir}", exc=ConfigError)
+        except ValueError as e:
+            die(f"--resume: unreadable {path}: {e}", exc=ConfigError)
+        raise AssertionError("unreachable")
+
+    def save(self) -> None:
+        with self._lock:
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.data, indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def window(self, idx: int) -> dict[str, Any]:
+        return self.data["windows"][idx]
+
+    def set_report(self, idx: int, rid: str) -> None:
+        """A (new) report id for the window: any pages fetched under an older id are discarded."""
+        with self._lock:
+            self.window(idx).update(report_id=rid, status="submitted", pages=[], count=0, schema={})
+            self.save()
+
+    def page_done(self, idx: int, page_meta: dict[str, Any]) -> None:
+        with self._lock:
+            self.window(idx)["pages"].append(page_meta)
+            self.save()
+
+    def window_paged(self, idx: int, count: int, schema: dict[str, str]) -> None:
+        with self._lock:
+            self.window(idx).update(status="paged", count=count, schema=schema)
+            self.save()
+
+    def window_written(self, idx: int, jsonl_bytes: int, ids_count: int = 0, written: int | None = None,
+                       duplicates: int | None = None) -> None:
+        with self._lock:
+            self.window(idx).update(status="written", written=written, duplicates=duplicates)
+            self.data["jsonl_bytes"] = jsonl_bytes
+            self.data["ids_count"] = ids_count
+            self.save()
+
+    def update_window(self, idx: int, **values: Any) -> None:
+        with self._lock:
+            self.window(idx).update(values)
+            self.save()
+
+    def update_run(self, **values: Any) -> None:
+        with self._lock:
+            self.data.update(values)
+            self.save()
+
+    def mark_completed(self) -> None:
+        with self._lock:
+            self.data["completed"] = True
+            self.save()
+
+    def first_missing_page(self, idx: int) -> int:
+        done = {p["page_no"] for p in self.window(idx)["pages"]}
+        n = 0
+        while n in done:
+            n += 1
+        return n
+
+
+def page_file(window_dir: Path, page_no: int) -> Path:
+    return window_dir / f"page_{page_no:06d}.jsonl"
+
+
+def page_ids_file(window_dir: Path, page_no: int) -> Path:
+    return window_dir / f"page_{page_no:06d}.ids"
+
+
+def stamp_record(obj: dict[str, Any], rid: str, w_start: str, w_end: str) -> dict[str, Any]:
+    obj = dict(obj)
+    obj["source_report_id"] = rid
+    obj["window_start"] = w_start
+    obj["window_end"] = w_end
+    return obj
+
+
+def spool_window(
+    rid: str, w_start: str, w_end: str, size: int | str, page_workers: int, window_dir: Path, stamp: bool,
+    start_page: int = 0, prior_pages: list[dict[str, Any]] | None = None, on_page=None,
+    id_field: str | None = None, source=None, tee: "CacheTee | None" = None
+) -> dict[str, Any]:
+    """
+    Page one report straight to per-page JSONL files under window_dir (stamped unless stamp=False).
+    Each page file is renamed into place once complete and reported via on_page(page_meta), so a crash
+    loses at most the pages in flight; start_page/prior_pages resume after pages already on disk.
+    With id_field, a page_NNNNNN.ids sidecar holds one id digest per line (see id_digest).
+    source replaces the API pagination (ReportCache.replay); tee receives every page as fetched (CacheTee).
+    Only page markers, the item count and the flattened column schema are kept in memory.
+    """
+    window_dir.mkdir(parents=True, exist_ok=True)
+    pages: list[dict[str, Any]] = [p for p in (prior_pages or []) if p["page_no"] < start_page]
+    schema: dict[str, str] = {}
+    count = 0
+    for p in pages:  # pages kept from an interrupted run
+        with page_file(window_dir, p["page_no"]).open("rb") as pf:
+            for line in pf:
+                if line.strip():
+                    collect_schema(CODEC.loads(line), schema)
+                    count += 1
+
+    pf = None
+    current: dict[str, Any] | None = None
+    ids = array("q")
+
+    def finish_page() -> None:
+        if pf is None or current is None:
+            return
+        pf.close()
+        if id_field:
+            with page_ids_file(window_dir, current["page_no"]).open("wb") as idf:
+                ids.tofile(idf)
+            del ids[:]
+        os.replace(pf.name, page_file(window_dir, current["page_no"]))
+        pages.append(current)
+        active_metrics().add_items(rid, current["count"], (current.get("meta") or {}).get("total_elements"))
+        if on_page:
+            on_page(current)
+
+    start_offset = sum(p["count"] for p in pages)
+    if source is None:
+        source = stream_report_items(rid, size, page_workers, start_page=start_page, start_offset=start_offset)
+    for obj in source:
+        if "__PAGE_META__" in obj:
+            finish_page()
+            current = obj["__PAGE_META__"]
+            pf = page_file(window_dir, current["page_no"]).with_suffix(".part").open("w", encoding="utf-8")
+            if tee:
+                tee.start_page(current)
+            continue
+        if tee:
+            tee.item(obj)
+        if stamp:
+            obj = stamp_record(obj, rid, w_start, w_end)
+        pf.write(CODEC.dumps(obj) + "\n")  # type: ignore[union-attr]
+        if id_field:
+            ids.append(id_digest(lookup_field(obj, id_field)))
+        collect_schema(obj, schema)
+        count += 1
+    finish_page()
+    if tee:
+        tee.commit(count)
+    return {"pages": pages, "count": count, "schema": schema, "window_dir": window_dir}
+
+
+def write_page_file(
+    window_dir: Path, page_no: int, items: list[dict[str, Any]], rid: str, w_start: str, w_end: str, stamp: bool,
+    id_field: str | None, schema: dict[str, str]
+) -> int:
+    """Write one whole page the way spool_window does (page file, .ids sidecar, schema), replacing any older copy."""
+    ids = array("q")
+    part = page_file(window_dir, page_no).with_suffix(".part")
+    with part.open("w", encoding="utf-8") as pf:
+        for obj in items:
+            if stamp:
+                obj = stamp_record(obj, rid, w_start, w_end)
+            pf.write(CODEC.dumps(obj) + "\n")
+            if id_field:
+                ids.append(id_digest(lookup_field(obj, id_field)))
+            collect_schema(obj, schema)
+    if id_field:
+        with page_ids_file(window_dir, page_no).open("wb") as idf:
+            ids.tofile(idf)
+    os.replace(part, page_file(window_dir, page_no))
+    return len(items)
+
+
+def page_order(page_meta: dict[str, Any]) -> tuple[int, int]:
+    """
+    JSONL order of a window's pages: by item offset (--size auto), by server page index once --verify refetched
+    pages ("order"), else in fetch order.
+    """
+    return page_meta.get("order", page_meta.get("offset", 0)), page_meta["page_no"]
+
+
+def append_window_pages(
+    window_dir: Path, pages: list[dict[str, Any]], out, dedup: "DedupIndex | None" = None, ids_out=None,
+    drop_duplicates: bool = False
+) -> tuple[int, int]:
+    """
+    Append a window's page files to the JSONL (opened in binary append mode) in page order, then remove them.
+    With dedup, each line's id digest is checked against every id seen so far in the run (and written to ids_out);
+    drop_duplicates skips repeats. Returns (records written, duplicates seen).
+    """
+    written = dups = 0
+    for p in sorted(pages, key=page_order):
+        path = page_file(window_dir, p["page_no"])
+        if dedup is None:
+            with path.open("rb") as pf:
+                shutil.copyfileobj(pf, out)
+            written += p["count"]
+            continue
+        ids = array("q")
+        ids_path = page_ids_file(window_dir, p["page_no"])
+        ids.frombytes(ids_path.read_bytes())
+        with path.open("rb") as pf:
+            for line, digest in zip(pf, ids):
+                if digest and not dedup.add(digest):
+                    dups += 1
+                    if drop_duplicates:
+                        continue
+                out.write(line)
+                ids_out.write(digest.to_bytes(8, "little", signed=True))
+                dedup.advance()
+                written += 1
+    shutil.rmtree(window_dir, ignore_errors=True)
+    return written, dups
+
+
+# ----------------------------- Report/page cache -----------------------------
+
+class ReportCache:
+    """
+    On-disk cache of report windows (--cache-dir), one directory per key (API host, key id, report type,
+    window, normalized filters):
+      - entry.json: the COMPLETED report id (reusable while younger than ttl_s) and, once every page of that
+        report was stored, the page list that lets a rerun replay the window without any API call
+      - page_NNNNNN.jsonl.gz: one page as its marker line followed by the raw (unstamped) items
+    Entries are evicted least recently used first once the cache grows beyond max_bytes.
+    """
+
+    ENTRY = "entry.json"
+
+    def __init__(self, root: Path, ttl_s: float, max_bytes: int):
+        self.root = root
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._busy: set[str] = set()  # entries being written or replayed are never evicted
+        root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(report_type: str, w_start: str, w_end: str, filters: dict[str, Any] | None) -> str:
+        ident = [BASE_URL, os.getenv("VERACODE_API_KEY_ID", ""), report_type, w_start, w_end, filters or {}]
+        return hashlib.sha256(json.dumps(ident, sort_keys=True, separators=(",", ":")).encode()).hexdigest()[:32]
+
+    def _load(self, key: str) -> dict[str, Any] | None:
+        try:
+            return json.loads((self.root / key / self.ENTRY).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, key: str, entry: dict[str, Any]) -> None:
+        d = self.root / key
+        d.mkdir(parents=True, exist_ok=True)
+        tmp = d / (self.ENTRY + ".tmp")
+        tmp.write_text(json.dumps(entry, indent=2), encoding="utf-8")
+        os.replace(tmp, d / self.ENTRY)
+
+    def report_id(self, key: str) -> str | None:
+        """The cached COMPLETED report id for key, unless older than the TTL."""
+        entry = self._load(key)
+        if entry and entry.get("report_id") and time.time() - entry.get("report_at", 0) < self.ttl_s:
+            return entry["report_id"]
+        return None
+
+    def complete(self, key: str) -> dict[str, Any] | None:
+        """The entry if all of its pages are stored (replayable), else None."""
+        entry = self._load(key)
+        return entry if entry and entry.get("pages") is not None else None
+
+    def put_report(self, key: str, rid: str) -> None:
+        """Record a COMPLETED report id; pages stored for a different report id are dropped."""
+        with self._lock:
+            entry = self._load(key) or {}
+            if entry.get("report_id") == rid:
+                return
+            for f in (self.root / key).glob("page_*"):
+                f.unlink(missing_ok=True)
+            self._save(key, {"report_id": rid, "report_at": time.time(), "pages": None})
+
+    def drop_pages(self, key: str) -> None:
+        """Keep the report id but forget the pages (e.g. --verify had to repair them)."""
+        with self._lock:
+            entry = self._load(key)
+            if entry:
+                entry["pages"] = None
+                self._save(key, entry)
+            for f in (self.root / key).glob("page_*"):
+                f.unlink(missing_ok=True)
+
+    def writer(self, key: str, rid: str) -> "CacheTee":
+        with self._lock:
+            self._busy.add(key)
+        return CacheTee(self, key, rid)
+
+    def put_pages(self, key: str, rid: str, pages: list[int], count: int) -> None:
+        with self._lock:
+            self._busy.discard(key)
+            entry = self._load(key)
+            if not entry or entry.get("report_id") != rid:
+                return  # superseded by a newer report for the same window
+            now = time.time()
+            entry.update(pages=pages, count=count, stored_at=now, used_at=now)
+            self._save(key, entry)
+            self.evict()
+
+    def replay(self, key: str):
+        """
+        A complete entry's pages, yielded exactly as stream_report_items does (page marker, then items), or None
+        when the entry was evicted or lost a page since complete() reported it (the caller fetches the window).
+        From here until the replay ends the entry is not evicted.
+        """
+        with self._lock:
+            entry = self._load(key)
+            if not entry or entry.get("pages") is None or \
+                    not all((self.root / key / f"page_{n:06d}.jsonl.gz").exists() for n in entry["pages"]):
+                return None
+            self._busy.add(key)
+            entry["used_at"] = time.time()
+            self._save(key, entry)
+        return self._replay(key, entry["pages"])
+
+    def _replay(self, key: str, pages: list[int]):
+        try:
+            for n in pages:
+                path = self.root / key / f"page_{n:06d}.jsonl.gz"
+                with gzip.open(path, "rb") as f:
+                    if page_marker_file(path).exists():
+                        yield {"__PAGE_META__": CODEC.loads(page_marker_file(path).read_bytes())}
+                    else:  # entries cached before the marker moved to its own file
+                        yield {"__PAGE_META__": CODEC.loads(f.readline())}
+                    for line in f:
+                        yield CODEC.loads(line)
+        finally:
+            with self._lock:
+                self._busy.discard(key)
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the cache fits max_bytes; returns the number removed."""
+        with self._lock:
+            entries = []
+            for d in self.root.iterdir():
+                if not d.is_dir():
+                    continue
+                size = sum(f.stat().st_size for f in d.iterdir() if f.is_file())
+                entry = self._load(d.name) or {}
+                entries.append((entry.get("used_at") or entry.get("report_at") or 0, d, size))
+            total = sum(size for _, _, size in entries)
+            removed = 0
+            for _, d, size in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                if d.name in self._busy:
+                    continue
+                shutil.rmtree(d, ignore_errors=True)
+                total -= size
+                removed += 1
+            return removed
+
+
+def page_marker_file(page_path: Path) -> Path:
+    """Cached page's marker (page_no, count, meta), next to its page_NNNNNN.jsonl.gz."""
+    return page_path.with_name(page_path.name.split(".", 1)[0] + ".meta.json")
+
+
+class CacheTee:
+    """Copies a window's pages into a ReportCache entry while spool_window writes them; commit() makes it replayable."""
+
+    def __init__(self, cache: ReportCache, key: str, rid: str):
+        self.cache, self.key, self.rid = cache, key, rid
+        self.dir = cache.root / key
+        self.pages: list[int] = []
+        self._f = None
+        self._path: Path | None = None
+        self._marker: dict[str, Any] = {}
+
+    def start_page(self, marker: dict[str, Any]) -> None:
+        self.end_page()
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._marker = marker  # streamed pages fill in count/meta later; written by end_page
+        self._path = self.dir / f"page_{marker['page_no']:06d}.jsonl.gz"
+        self._f = gzip.open(self._path.with_suffix(".part"), "wt", encoding="utf-8", compresslevel=1)
+        self.pages.append(marker["page_no"])
+
+    def item(self, obj: dict[str, Any]) -> None:
+        self._f.write(CODEC.dumps(obj) + "\n")  # type: ignore[union-attr]
+
+    def end_page(self) -> None:
+        if self._f is None or self._path is None:
+            return
+        self._f.close()
+        page_marker_file(self._path).write_text(CODEC.dumps(self._marker), encoding="utf-8")
+        os.replace(self._path.with_suffix(".part"), self._path)
+        self._f = None
+
+    def commit(self, count: int) -> None:
+        self.end_page()
+        self.cache.put_pages(self.key, self.rid, self.pages, count)
+
+
+# ----------------------------- Compressed files (gzip / zstd) -----------------------------
+
+COMPRESS_SUFFIX = {"gzip": ".gz", "zstd": ".zst"}
+COMPRESS_LEVEL: int | None = None  # None = codec default (gzip 6, zstd 3)
+COMPRESS_THREADS = max(1, min(4, os.cpu_count() or 1))
+COMPRESS_CHUNK = 4 << 20  # uncompressed bytes per independently compressed gzip member / zstd frame
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _zstd():
+    try:
+        import zstandard  # type: ignore
+    except Exception as e:
+        die(f"zstd compression requested but zstandard is not available: {e}. Install zstandard or use gzip.",
+            exc=ConfigError)
+    return zstandard
+
+
+class CompressedWriter(io.RawIOBase):
+    """
+    Binary writer that compresses COMPRESS_CHUNK-sized chunks on a small thread pool while the caller keeps
+    producing. Every chunk becomes a complete gzip member / zstd frame, written in order, so the result is an ordinary
+    multi-member .gz / multi-frame .zst file. After flush() the file ends on a member boundary (safe to truncate to).
+    """
+
+    def __init__(self, path: Path, codec: str, level: int | None = None, threads: int | None = None,
+                 mode: str = "wb"):
+        super().__init__()
+        if codec not in COMPRESS_SUFFIX:
+            raise ValueError(f"unknown compression codec: {codec}")
+        self.path = path
+        self.codec = codec
+        self.level = COMPRESS_LEVEL if level is None else level
+        self._zstd = _zstd() if codec == "zstd" else None
+        self._local = threading.local()  # zstd compressor contexts are not thread-safe: one per pool thread
+        self._threads = threads or COMPRESS_THREADS
+        self._pool = ThreadPoolExecutor(max_workers=self._threads, thread_name_prefix="compress")
+        self._pending: deque[Future] = deque()
+        self._buf = bytearray()
+        self._f = path.open(mode)
+
+    def _compress(self, chunk: bytes) -> bytes:
+        if self.codec == "gzip":
+            return compress_bytes(chunk, "gzip", self.level)
+        cctx = getattr(self._local, "cctx", None)
+        if cctx is None:
+            cctx = self._local.cctx = self._zstd.ZstdCompressor(level=3 if self.level is None else self.level)
+        return cctx.compress(chunk)
+
+    def _submit(self) -> None:
+        self._pending.append(self._pool.submit(self._compress, bytes(self._buf)))
+        self._buf.clear()
+        while len(self._pending) > 2 * self._threads:  # bound memory held by queued chunks
+            self._f.write(self._pending.popleft().result())
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buf += data
+        if len(self._buf) >= COMPRESS_CHUNK:
+            self._submit()
+        return len(data)
+
+    def flush(self) -> None:
+        if self.closed:
+            return
+        if self._buf:
+            self._submit()
+        while self._pending:
+            self._f.write(self._pending.popleft().result())
+        self._f.flush()
+
+    def tell(self) -> int:
+        return self._f.tell()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            super().close()  # flushes
+        finally:
+            self._pool.shutdown()
+            self._f.close()
+
+
+def compress_bytes(data: bytes, codec: str | None, level: int | None = None) -> bytes:
+    """data as one complete gzip member / zstd frame (unchanged when codec is None); members concatenate freely."""
+    level = COMPRESS_LEVEL if level is None else level
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6 if level is None else level, mtime=0)
+    if codec == "zstd":
+        return _zstd().ZstdCompressor(level=3 if level is None else level).compress(data)
+    return data
+
+
+def sniff_codec(path: Path) -> str | None:
+    """gzip / zstd from the file's magic bytes; None for plain (or empty) files."""
+    with path.open("rb") as f:
+        head = f.read(4)
+    if head.startswith(_GZIP_MAGIC):
+        return "gzip"
+    if head == _ZSTD_MAGIC:
+        return "zstd"
+    return None
+
+
+def open_read(path: Path, text: bool = True):
+    """Open a plain, gzip or zstd file for line-by-line reading; the codec is detected, not taken from the name."""
+    codec = sniff_codec(path)
+    if codec == "gzip":
+        raw = gzip.open(path, "rb")
+    elif codec == "zstd":
+        reader = _zstd().ZstdDecompressor().stream_reader(path.open("rb"), read_across_frames=True)
+        raw = io.BufferedReader(reader, buffer_size=1 << 20)
+    else:
+        raw = path.open("rb")
+    return io.TextIOWrapper(raw, encoding="utf-8") if text else raw
+
+
+def open_write(path: Path, codec: str | None, text: bool = True, append: bool = False, newline: str | None = None):
+    """Open an output file, compressed with codec on background threads, or plain when codec is None."""
+    if not codec:
+        if text:
+            return path.open("a" if append else "w", encoding="utf-8", newline=newline)
+        return path.open("ab" if append else "wb")
+    raw = CompressedWriter(path, codec, mode="ab" if append else "wb")
+    return io.TextIOWrapper(raw, encoding="utf-8", newline=newline) if text else raw
+
+
+# ----------------------------- Duplicate detection -----------------------------
+
+def id_digest(value: Any) -> int:
+    """
+    Compact 64-bit signed digest of an id value (blake2b); 0 means "no id".
+    Collision odds stay negligible (~1e-5 at 10^7 ids), so counts are exact in practice.
+    """
+    if value is None or value == "":
+        return 0
+    d = int.from_bytes(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+    return d or 1
+
+
+class DedupIndex:
+    """
+    Run-wide id index: digest -> ordinal (line number in the JSONL) of its latest occurrence.
+    Kept in a dict up to max_memory_ids entries, then spilled to an on-disk SQLite hash index, so tens of
+    millions of ids fit without holding records (or raw id strings) in memory.
+    """
+
+    def __init__(self, spill_path: Path, max_memory_ids: int = 2_000_000):
+        self.spill_path = spill_path
+        self.max_memory_ids = max_memory_ids
+        self.mem: dict[int, int] = {}
+        self.db = None
+        self.ordinal = 0  # ordinal of the next record written
+        self.total_duplicates = 0
+
+    def _spill(self) -> None:
+        import sqlite3
+        self.spill_path.unlink(missing_ok=True)
+        self.db = sqlite3.connect(str(self.spill_path))
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute("CREATE TABLE ids (h INTEGER PRIMARY KEY, pos INTEGER NOT NULL)")
+        self.db.executemany("INSERT INTO ids (h, pos) VALUES (?, ?)", self.mem.items())
+        self.mem = {}
+        print(f"  dedup index spilled to {self.spill_path}", file=sys.stderr)
+
+    def add(self, digest: int) -> bool:
+        """Record digest at the current ordinal; False if it was already seen."""
+        if self.db is None:
+            seen = digest in self.mem
+            self.mem[digest] = self.ordinal
+            if len(self.mem) > self.max_memory_ids:
+                self._spill()
+        else:
+            seen = self.db.execute("SELECT 1 FROM ids WHERE h = ?", (digest,)).fetchone() is not None
+            self.db.execute("INSERT INTO ids (h, pos) VALUES (?, ?) ON CONFLICT(h) DO UPDATE SET pos = excluded.pos",
+                            (digest, self.ordinal))
+        if seen:
+            self.total_duplicates += 1
+        return not seen
+
+    def advance(self) -> None:
+        """Move to the next ordinal (call once per record actually written)."""
+        self.ordinal += 1
+
+    def latest(self, digest: int) -> int | None:
+        if self.db is None:
+            return self.mem.get(digest)
+        row = self.db.execute("SELECT pos FROM ids WHERE h = ?", (digest,)).fetchone()
+        return row[0] if row else None
+
+    def replay(self, ids_path: Path, count: int) -> None:
+        """Rebuild from the first count digests of a run's ids file (used by --resume)."""
+        ids = array("q")
+        with ids_path.open("rb") as f:
+            ids.frombytes(f.read(count * 8))
+        for digest in ids:
+            if digest:
+                self.add(digest)
+            self.advance()
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+            self.spill_path.unlink(missing_ok=True)
+
+
+def keep_latest_rewrite(jsonl_path: Path, ids_path: Path, dedup: DedupIndex, compress: str | None = None) -> int:
+    """Rewrite the JSONL keeping only the latest occurrence of each id (records without id are kept). Returns drops."""
+    dropped = 0
+    tmp = jsonl_path.with_suffix(".dedup.tmp")
+    ids = array("q")
+    with open_read(jsonl_path, text=False) as src, ids_path.open("rb") as idf, \
+            open_write(tmp, compress, text=False) as dst:
+        for ordinal, line in enumerate(src):
+            if ordinal % 1_000_000 == 0:
+                del ids[:]
+                ids.frombytes(idf.read(1_000_000 * 8))
+            digest = ids[ordinal % 1_000_000]
+            if digest and dedup.latest(digest) != ordinal:
+                dropped += 1
+                continue
+            dst.write(line)
+    os.replace(tmp, jsonl_path)
+    return dropped
+
+
+# ----------------------------- Outputs: JSON/JSONL + CSV (single) + XLSX (single workbook) -----------------------------
+
+class JsonCodec:
+    """
+    JSON backend for the per-record hot paths (JSONL lines, list cells, JSON array records).
+    stdlib (the default) writes the same bytes as earlier versions. orjson is several times faster but writes
+    compact separators ({"a":1} instead of {"a": 1}): equal JSON, different bytes, so it is opt-in. Values orjson
+    rejects (ints beyond 64 bits, NaN) fall back to the stdlib.
+    """
+
+    def __init__(self, name: str = "stdlib"):
+        self.name = name
+        if name == "orjson":
+            import orjson  # type: ignore
+            self._orjson = orjson
+            self.loads = self._orjson_loads
+            self.dumps = self._orjson_dumps
+            self.dumps_pretty = self._orjson_dumps_pretty
+        else:
+            # reuse encoders: json.dumps(..., ensure_ascii=False) builds a new JSONEncoder on every call
+            self.loads = json.loads
+            self.dumps = json.JSONEncoder(ensure_ascii=False).encode
+            self.dumps_pretty = json.JSONEncoder(ensure_ascii=False, indent=2).encode
+
+    def _orjson_loads(self, s: str | bytes) -> Any:
+        try:
+            return self._orjson.loads(s)
+        except ValueError:
+            return json.loads(s)
+
+    def _orjson_dumps(self, v: Any) -> str:
+        try:
+            return self._orjson.dumps(v).decode("utf-8")
+        except TypeError:
+            return json.dumps(v, ensure_ascii=False)
+
+    def _orjson_dumps_pretty(self, v: Any) -> str:
+        try:
+            return self._orjson.dumps(v, option=self._orjson.OPT_INDENT_2).decode("utf-8")
+        except TypeError:
+            return json.dumps(v, ensure_ascii=False, indent=2)
+
+
+CODEC = JsonCodec()
+
+
+def set_json_codec(name: str) -> str:
+    """Select the record codec: orjson, stdlib, or auto (orjson when installed). Returns the codec in use."""
+    global CODEC
+    if name in ("auto", "orjson"):
+        try:
+            CODEC = JsonCodec("orjson")
+            return CODEC.name
+        except ImportError as e:
+            if name == "orjson":
+                die(f"--json-codec orjson requested but orjson is not available: {e}. Install orjson or use stdlib.",
+                    exc=ConfigError)
+    CODEC = JsonCodec("stdlib")
+    return CODEC.name
+
+
+def write_jsonl(all_items: Iterable[dict[str, Any]], jsonl_path: Path, compress: str | None = None) -> int:
+    n = 0
+    with open_write(jsonl_path, compress) as jf:
+        for obj in all_items:
+            if "__PAGE_META__" in obj:
+                continue
+            jf.write(CODEC.dumps(obj) + "\n")
+            n += 1
+    return n
+
+
+_TS_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?$")
+
+
+def value_type(v: Any) -> str:
+    """Column type tag of a flattened leaf: null | bool | int | float | timestamp | string | json (lists)."""
+    if v is None:
+        return "null"
+    if isinstance(v, bool):
+        return "bool"
+    if isinstance(v, int):
+        return "int"
+    if isinstance(v, float):
+        return "float"
+    if isinstance(v, list):
+        return "json"
+    if isinstance(v, str) and len(v) >= 16 and v[4] == "-" and _TS_RE.match(v):
+        return "timestamp"
+    return "string"
+
+
+def merge_type(a: str | None, b: str) -> str:
+    """Widen two column type tags (null adopts the other; int+float -> float; other mixes -> string)."""
+    if a is None or a == "null" or a == b:
+        return b
+    if b == "null":
+        return a
+    if {a, b} == {"int", "float"}:
+        return "float"
+    return "string"
+
+
+def collect_schema(d: dict[str, Any], schema: dict[str, str], prefix: str = "") -> None:
+    """Fold d's flattened key paths and value types into schema (in place)."""
+    for k, v in d.items():
+        key = f"{prefix}.{k}" if prefix else k
+        if isinstance(v, dict):
+            collect_schema(v, schema, key)
+        else:
+            schema[key] = merge_type(schema.get(key), value_type(v))
+
+
+def merge_schema(dst: dict[str, str], src: dict[str, str]) -> dict[str, str]:
+    for k, t in src.items():
+        dst[k] = merge_type(dst.get(k), t)
+    return dst
+
+
+def shard_ranges(path: Path, shards: int) -> list[tuple[int, int]]:
+    """Split a plain (uncompressed) JSONL file into at most `shards` newline-aligned [start, end) byte ranges."""
+    size = path.stat().st_size
+    bounds = [0]
+    with path.open("rb") as f:
+        for k in range(1, shards):
+            f.seek(max(size * k // shards - 1, bounds[-1]))
+            f.readline()  # move to the start of the next line
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def read_range(path: Path, start: int, end: int) -> Iterable[bytes]:
+    """Lines of path in the byte range [start, end) (start must be a line start, as shard_ranges guarantees)."""
+    with path.open("rb") as f:
+        f.seek(start)
+        pos = start
+        for line in f:
+            if pos >= end:
+                break
+            pos += len(line)
+            yield line
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool for CPU-bound conversion; spawned (not forked) so no fetch/compression threads are inherited."""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _schema_shard(job: dict[str, Any]) -> dict[str, str]:
+    set_json_codec(job["codec"])
+    schema: dict[str, str] = {}
+    loads = CODEC.loads
+    for line in read_range(Path(job["path"]), job["start"], job["end"]):
+        line = line.strip()
+        if line:
+            collect_schema(loads(line), schema)
+    return schema
+
+
+def build_schema_from_jsonl(jsonl_path: Path, workers: int = 1) -> dict[str, str]:
+    """
+    Union of flattened keys (with types) without loading all records in RAM (fallback when no sidecar).
+    With workers > 1, a plain JSONL is split into newline-aligned shards scanned in a process pool, and the
+    partial schemas are merged at the end (compressed files are scanned sequentially).
+    """
+    if workers > 1 and sniff_codec(jsonl_path) is None:
+        jobs = [{"path": str(jsonl_path), "start": a, "end": b, "codec": CODEC.name}
+                for a, b in shard_ranges(jsonl_path, workers * 4)]
+        schema: dict[str, str] = {}
+        with process_pool(workers) as pool:
+            for part in pool.map(_schema_shard, jobs):
+                merge_schema(schema, part)
+        return schema
+    schema = {}
+    loads = CODEC.loads
+    with open_read(jsonl_path, text=False) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            collect_schema(loads(line), schema)
+    return schema
+
+
+def build_headers_from_jsonl(jsonl_path: Path, workers: int = 1) -> list[str]:
+    """Make a union of flattened keys without loading all records in RAM (fallback when no schema sidecar)."""
+    return sorted(build_schema_from_jsonl(jsonl_path, workers))
+
+
+def schema_path_for(jsonl_path: Path) -> Path:
+    return jsonl_path.with_name(jsonl_path.name.split(".")[0] + ".schema.json")
+
+
+def write_schema_sidecar(jsonl_path: Path, schema: dict[str, str], record_count: int) -> Path:
+    """Persist the flattened headers and column types discovered while the JSONL was written."""
+    path = schema_path_for(jsonl_path)
+    headers = sorted(schema)
+    path.write_text(json.dumps({"jsonl": jsonl_path.name, "record_count": record_count, "headers": headers,
+                                "types": {h: schema[h] for h in headers}}, indent=2), encoding="utf-8")
+    return path
+
+
+def load_schema(jsonl_path: Path, workers: int = 1) -> dict[str, str]:
+    """Column schema from the sidecar if present, else one discovery pass over the JSONL."""
+    path = schema_path_for(jsonl_path)
+    if path.exists():
+        try:
+            doc = json.loads(path.read_text(encoding="utf-8"))
+            headers, types = doc.get("headers"), doc.get("types") or {}
+            if isinstance(headers, list):
+                return {str(h): str(types.get(h, "string")) for h in headers}
+        except (OSError, ValueError):
+            pass
+    return build_schema_from_jsonl(jsonl_path, workers)
+
+
+def load_headers(jsonl_path: Path, workers: int = 1) -> list[str]:
+    """Headers from the schema sidecar if present, else one discovery pass over the JSONL."""
+    return sorted(load_schema(jsonl_path, workers))
+
+
+def flatten_for_row(d: dict[str, Any], headers: list[str]) -> dict[str, Any]:
+    """Flatten d according to headers. Lists are JSON-encoded strings. (Per-record; bulk paths use RowFlattener.)"""
+    def flatten(d0: dict[str, Any], prefix: str = "", out: dict[str, Any] | None = None) -> dict[str, Any]:
+        if out is None:
+            out = {}
+        for k, v in d0.items():
+            key = f"{prefix}.{k}" if prefix else k
+            if isinstance(v, dict):
+                flatten(v, key, out)
+            elif isinstance(v, list):
+                out[key] = json.dumps(v, ensure_ascii=False)
+            else:
+                out[key] = v
+        return out
+    flat = flatten(d)
+    return {h: flat.get(h, None) for h in headers}
+
+
+class RowFlattener:
+    """
+    Flattens records into header-ordered row lists (same cells as flatten_for_row) through compiled plans.
+    A plan is cached per (path prefix, key tuple) of each dict level and holds every key's column index and
+    precomputed dotted path, so records of a known shape are flattened without recursion or key-string building.
+    Records are expected as JSON decoders produce them (plain dict / list containers).
+    """
+
+    MAX_PLANS = 4096  # plans are small; the cap only guards against key orders that never repeat
+
+    def __init__(self, headers: list[str], dumps=None):
+        self.headers = headers
+        self.width = len(headers)
+        self.dumps = dumps or CODEC.dumps
+        self._col = {h: i for i, h in enumerate(headers)}
+        self._plans: dict[tuple[str, tuple[str, ...]], tuple[tuple[str, int, str], ...]] = {}
+
+    def _compile(self, prefix: str, keys: tuple[str, ...]) -> tuple[tuple[str, int, str], ...]:
+        if len(self._plans) >= self.MAX_PLANS:
+            self._plans.clear()
+        plan = []
+        for k in keys:
+            path = f"{prefix}.{k}" if prefix else k
+            plan.append((k, self._col.get(path, -1), path))
+        self._plans[(prefix, keys)] = compiled = tuple(plan)
+        return compiled
+
+    def row(self, obj: dict[str, Any]) -> list[Any]:
+        out: list[Any] = [None] * self.width
+        plans, dumps = self._plans, self.dumps
+        pending = [("", obj)]
+        while pending:
+            prefix, d = pending.pop()
+            keys = tuple(d)
+            plan = plans.get((prefix, keys)) or self._compile(prefix, keys)
+            for k, col, path in plan:
+                v = d[k]
+                t = type(v)
+                if t is dict:
+                    pending.append((path, v))
+                elif col >= 0:
+                    out[col] = dumps(v) if t is list else v
+        return out
+
+
+class JsonArrayWriter:
+    """Pretty-printed JSON array (same layout as json.dumps(arr, indent=2)), written one record at a time."""
+
+    KIND = "json"
+
+    def __init__(self, path: Path, compress: str | None = None):
+        self.path = path
+        self._f = open_write(path, compress)
+        self.n = 0
+
+    @staticmethod
+    def record(obj: dict[str, Any]) -> str:
+        """One array element, indented one level (no separator)."""
+        return CODEC.dumps_pretty(obj).replace("\n", "\n  ")
+
+    def write(self, obj: dict[str, Any]) -> None:
+        self._f.write("[\n  " if self.n == 0 else ",\n  ")
+        self._f.write(self.record(obj))
+        self.n += 1
+
+    def close(self) -> None:
+        self._f.write("\n]" if self.n else "[]")
+        self._f.close()
+
+
+class CsvRowWriter:
+    """One CSV file (unbounded; limited by disk) fed with flattened, header-ordered rows."""
+
+    KIND = "csv"
+
+    def __init__(self, path: Path, headers: list[str], compress: str | None = None):
+        self.path = path
+        self._f = open_write(path, compress, newline="")
+        self._w = csv.writer(self._f)
+        self._w.writerow(headers)
+
+    def write(self, row: list[Any]) -> None:
+        self._w.writerow(row)
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class XlsxRowWriter:
+    """
+    One XLSX workbook fed with flattened rows, streamed straight into xlsxwriter in constant_memory mode.
+    Rolls over to a new findings_NN sheet at exactly max_rows_per_sheet data rows, never new files.
+    Column widths (first 50 columns) are tracked incrementally while writing.
+    """
+
+    KIND = "xlsx"
+    AUTOSIZE_COLS = 50
+    MAX_WIDTH = 80
+
+    def __init__(self, path: Path, headers: list[str],
+                 max_rows_per_sheet: int = 1_048_000):  # Excel limit minus buffer for header
+        try:
+            import xlsxwriter  # type: ignore
+        except Exception as e:
+            die(f"XLSX requested but xlsxwriter is not available: {e}. Install xlsxwriter or use --no-xlsx.",
+                exc=ConfigError)
+        self.path = path
+        self.headers = headers
+        self.max_rows_per_sheet = max_rows_per_sheet
+        self._wb = xlsxwriter.Workbook(str(path), {"constant_memory": True, "strings_to_urls": False,
+                                                   "strings_to_formulas": False})
+        self._ws = None
+        self._sheet_idx = 0
+        self._sheet_rows = 0
+        self._widths: list[int] = []
+
+    def _new_sheet(self) -> None:
+        self._finish_sheet()
+        self._sheet_idx += 1
+        self._ws = self._wb.add_worksheet(f"findings_{self._sheet_idx:02d}")
+        self._ws.write_row(0, 0, self.headers)
+        self._sheet_rows = 0
+        self._widths = [len(h) for h in self.headers[:self.AUTOSIZE_COLS]]
+
+    def _finish_sheet(self) -> None:
+        if self._ws is None:
+            return
+        for i, w in enumerate(self._widths):
+            self._ws.set_column(i, i, max(10, min(self.MAX_WIDTH, w) + 2))
+
+    def write(self, values: list[Any]) -> None:
+        if self._ws is None or self._sheet_rows >= self.max_rows_per_sheet:
+            self._new_sheet()
+        self._sheet_rows += 1
+        self._ws.write_row(self._sheet_rows, 0, values)  # type: ignore[union-attr]
+        widths = self._widths
+        for i in range(len(widths)):
+            v = values[i]
+            if v is not None and widths[i] < self.MAX_WIDTH:
+                n = len(v) if isinstance(v, str) else len(str(v))
+                if n > widths[i]:
+                    widths[i] = n
+
+    def close(self) -> None:
+        if self._ws is None:
+            self._new_sheet()  # header-only sheet for an empty export
+        self._finish_sheet()
+        self._wb.close()
+
+
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+class ParquetRowWriter:
+    """
+    One Parquet file fed with flattened rows, written in bounded row groups (zstd, dictionary-encoded strings).
+    Column types come from the discovered schema: int/float/bool/timestamp stay typed, lists are JSON strings.
+    Requires pyarrow.
+    """
+
+    KIND = "parquet"
+    ARROW_TYPES = {"int": "int64", "float": "float64", "bool": "bool_", "timestamp": "timestamp",
+                   "string": "string", "json": "string", "null": "string"}
+
+    def __init__(self, path: Path, schema: dict[str, str], row_group_size: int = 100_000,
+                 headers: list[str] | None = None):
+        try:
+            import pyarrow as pa  # type: ignore
+            import pyarrow.parquet as pq  # type: ignore
+        except Exception as e:
+            die(f"Parquet requested but pyarrow is not available: {e}. Install pyarrow or drop --parquet.",
+                exc=ConfigError)
+        self._pa = pa
+        self.path = path
+        self.headers = headers if headers is not None else sorted(schema)
+        self.types = [schema.get(h, "string") for h in self.headers]
+        fields = []
+        for h, t in zip(self.headers, self.types):
+            if t == "timestamp":
+                fields.append(pa.field(h, pa.timestamp("us", tz="UTC")))
+            else:
+                fields.append(pa.field(h, getattr(pa, self.ARROW_TYPES.get(t, "string"))()))
+        self.arrow_schema = pa.schema(fields)
+        self.row_group_size = row_group_size
+        self._writer = pq.ParquetWriter(
+            str(path), self.arrow_schema, compression="zstd",
+            use_dictionary=[h for h, t in zip(self.headers, self.types) if t in ("string", "null")] or False,
+        )
+        self._cols: list[list[Any]] = [[] for _ in self.headers]
+        self._n = 0
+        self.bad_values = 0
+
+    def _convert(self, v: Any, t: str) -> Any:
+        if v is None:
+            return None
+        try:
+            if t == "timestamp":
+                ts = datetime.fromisoformat(v.replace("Z", "+00:00"))
+                return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+            if t == "float":
+                return float(v)
+            if t in ("string", "json", "null"):
+                return v if isinstance(v, str) else CODEC.dumps(v)
+            if t == "int" and not (isinstance(v, int) and INT64_MIN <= v <= INT64_MAX):
+                raise ValueError(f"not an int64: {v!r}")  # pyarrow would raise OverflowError in _flush
+            if t == "bool" and not isinstance(v, bool):
+                raise TypeError(f"not a bool: {v!r}")
+            return v
+        except (TypeError, ValueError):
+            self.bad_values += 1
+            return None
+
+    def write(self, row: list[Any]) -> None:
+        for col, v, t in zip(self._cols, row, self.types):
+            col.append(self._convert(v, t))
+        self._n += 1
+        if self._n >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._n:
+            return
+        table = self._pa.Table.from_arrays(
+            [self._pa.array(col, type=f.type) for col, f in zip(self._cols, self.arrow_schema)],
+            schema=self.arrow_schema,
+        )
+        self._writer.write_table(table)
+        self._cols = [[] for _ in self.headers]
+        self._n = 0
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+        if self.bad_values:
+            print(f"WARN: {self.bad_values} value(s) did not match their Parquet column type and were left null",
+                  file=sys.stderr)
+
+
+def convert_jsonl(jsonl_path: Path, headers: list[str], json_path: Path | None = None,
+                  csv_path: Path | None = None, xlsx_path: Path | None = None,
+                  parquet_path: Path | None = None, schema: dict[str, str] | None = None,
+                  compress: str | None = None, workers: int = 1) -> int:
+    """
+    Single decode-and-flatten pass over the JSONL (plain, .gz or .zst) feeding every requested writer
+    (JSON array, CSV, XLSX, Parquet). compress applies to the JSON and CSV outputs.
+    With workers > 1 and a plain JSONL, JSON and CSV are produced by convert_jsonl_sharded.
+    Returns the number of records converted.
+    """
+    if workers > 1 and (json_path or csv_path) and sniff_codec(jsonl_path) is None:
+        return convert_jsonl_sharded(jsonl_path, headers, json_path, csv_path, xlsx_path, parquet_path, schema,
+                                     compress, workers)
+    writers_obj = [JsonArrayWriter(json_path, compress)] if json_path else []
+    writers_row: list[Any] = []
+    if csv_path:
+        writers_row.append(CsvRowWriter(csv_path, headers, compress))
+    if xlsx_path:
+        writers_row.append(XlsxRowWriter(xlsx_path, headers))
+    if parquet_path:
+        writers_row.append(ParquetRowWriter(parquet_path, schema or {}, headers=headers))
+
+    n = 0
+    loads = CODEC.loads
+    flattener = RowFlattener(headers)
+    clock = time.perf_counter
+    # per-component time for the run report: decode, flatten, and each writer by its output kind
+    names = [w.KIND for w in writers_obj + writers_row]
+    spent = [0.0] * (len(names) + 2)
+    with open_read(jsonl_path, text=False) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            t0 = clock()
+            obj = loads(line)
+            t1 = clock()
+            spent[0] += t1 - t0
+            k = 2
+            for w in writers_obj:
+                w.write(obj)
+                t2 = clock()
+                spent[k] += t2 - t1
+                t1, k = t2, k + 1
+            if writers_row:
+                row = flattener.row(obj)
+                t2 = clock()
+                spent[1] += t2 - t1
+                t1 = t2
+                for w in writers_row:
+                    w.write(row)
+                    t2 = clock()
+                    spent[k] += t2 - t1
+                    t1, k = t2, k + 1
+            n += 1
+    for i, w in enumerate(writers_obj + writers_row):
+        t0 = clock()
+        w.close()
+        spent[i + 2] += clock() - t0
+    active_metrics().add_components("outputs", dict(zip(["decode", "flatten"] + names, spent)))
+    return n
+
+
+def _convert_shard(job: dict[str, Any]) -> int:
     """
-    Stream JSONL -> one XLSX workbook. Adds sheets as needed, never new files.
-    Requires pandas + XlsxWriter. Avoids big in-memory frames by chunking.
+    Process-pool worker: decode and flatten one byte range of the JSONL into part files, a headerless CSV part
+    and/or JSON array elements joined by separators (no brackets). Returns the records converted.
     """
+    global COMPRESS_LEVEL, COMPRESS_THREADS
+    set_json_codec(job["codec"])
+    COMPRESS_LEVEL, COMPRESS_THREADS = job["level"], 1  # one process per core already
+    json_f = open_write(Path(job["json_part"]), job["compress"]) if job["json_part"] else None
+    csv_f = open_write(Path(job["csv_part"]), job["compress"], newline="") if job["csv_part"] else None
+    csv_w = csv.writer(csv_f) if csv_f else None
+    loads = CODEC.loads
+    flattener = RowFlattener(job["headers"])
+    n = 0
     try:
-        import pandas as pd  # type: ignore
-    except Exception as e:
-        die(f"XLSX requested but pandas is not available: {e}. Install pandas/openpyxl/xlsxwriter or use --no-xlsx.")
+        for line in read_range(Path(job["path"]), job["start"], job["end"]):
+            line = line.strip()
+            if not line:
+                continue
+            obj = loads(line)
+            if json_f:
+                if n:
+                    json_f.write(",\n  ")
+                json_f.write(JsonArrayWriter.record(obj))
+            if csv_w:
+                csv_w.writerow(flattener.row(obj))
+            n += 1
+    finally:
+        for f in (json_f, csv_f):
+            if f:
+                f.close()
+    return n
 
-    xlsx_path = out_dir / f"{base_name}.xlsx"
-    writer = pd.ExcelWriter(str(xlsx_path), engine="xlsxwriter",
-                            datetime_format="yyyy-mm-dd hh:mm:ss",
-                            date_format="yyyy-mm-dd")
 
-    sheet_idx = 1
-    rows_buffer: list[dict[str, Any]] = []
-    sheet_rows_written = 0
+def _join_parts(path: Path, parts: list[Path], counts: list[int], compress: str | None,
+                head: bytes = b"", sep: bytes = b"", tail: bytes = b"", empty: bytes | None = None) -> None:
+    """Concatenate shard part files into path in order (compressed parts are whole members, so bytes just append)."""
+    def piece(data: bytes) -> None:
+        if data:
+            out.write(compress_bytes(data, compress))
 
-    def flush_buffer_to_sheet():
-        nonlocal rows_buffer, sheet_rows_written, sheet_idx
-        if not rows_buffer:
+    with path.open("wb") as out:
+        if empty is not None and not any(counts):
+            piece(empty)
             return
-        import pandas as pd
-        df = pd.DataFrame(rows_buffer, columns=headers)
-        sheet_name = f"findings_{sheet_idx:02d}"
-        df.to_excel(writer, index=False, sheet_name=sheet_name)
-        ws = writer.sheets[sheet_name]
-        for i, col in enumerate(df.columns[:50]):  # cap autosize to first 50 cols
-            max_len = min(80, max(len(str(col)), int(df[col].astype(str).map(len).max())))
-            ws.set_column(i, i, max(10, max_len + 2))
-        sheet_rows_written += len(rows_buffer)
-        rows_buffer = []
-
-    with jsonl_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
+        piece(head)
+        first = True
+        for part, n in zip(parts, counts):
+            if not n:
                 continue
-            obj = json.loads(line)
-            rows_buffer.append(flatten_for_row(obj, headers))
-
-            if len(rows_buffer) >= chunk_size:
-                if sheet_rows_written + len(rows_buffer) > max_rows_per_sheet:
-                    if sheet_rows_written > 0:
-                        flush_buffer_to_sheet()
-                        sheet_idx += 1
-                        sheet_rows_written = 0
-                    while len(rows_buffer) > max_rows_per_sheet:
-                        cut = rows_buffer[:max_rows_per_sheet]
-                        rows_buffer = rows_buffer[max_rows_per_sheet:]
-                        import pandas as pd
-                        df = pd.DataFrame(cut, columns=headers)
-                        sheet_name = f"findings_{sheet_idx:02d}"
-                        df.to_excel(writer, index=False, sheet_name=sheet_name)
-                        sheet_idx += 1
-                    flush_buffer_to_sheet()
-                else:
-                    flush_buffer_to_sheet()
+            if not first:
+                piece(sep)
+            with part.open("rb") as pf:
+                shutil.copyfileobj(pf, out, 1 << 20)
+            first = False
+        piece(tail)
+
+
+def convert_jsonl_sharded(jsonl_path: Path, headers: list[str], json_path: Path | None = None,
+                          csv_path: Path | None = None, xlsx_path: Path | None = None,
+                          parquet_path: Path | None = None, schema: dict[str, str] | None = None,
+                          compress: str | None = None, workers: int = 2) -> int:
+    """
+    Multi-core conversion of a plain JSONL: newline-aligned byte ranges are decoded and flattened in a process
+    pool with the shared header list, then the part files are joined in order into the single JSON / CSV file
+    (same header row and layout as the sequential pass). XLSX and Parquet keep one writer each and are fed
+    from this process while the pool works. Returns the number of records converted.
+    """
+    ranges = shard_ranges(jsonl_path, workers * 4)
+    json_parts = [json_path.with_name(f"{json_path.name}.part{k:04d}") for k in range(len(ranges))] if json_path else []
+    csv_parts = [csv_path.with_name(f"{csv_path.name}.part{k:04d}") for k in range(len(ranges))] if csv_path else []
+    jobs = [{"path": str(jsonl_path), "start": a, "end": b, "headers": headers, "codec": CODEC.name,
+             "compress": compress, "level": COMPRESS_LEVEL,
+             "json_part": str(json_parts[k]) if json_path else None,
+             "csv_part": str(csv_parts[k]) if csv_path else None}
+            for k, (a, b) in enumerate(ranges)]
+    try:
+        t0 = time.monotonic()
+        with process_pool(workers) as pool:
+            futures = [pool.submit(_convert_shard, job) for job in jobs]
+            if xlsx_path or parquet_path:
+                convert_jsonl(jsonl_path, headers, xlsx_path=xlsx_path, parquet_path=parquet_path, schema=schema)
+            counts = [f.result() for f in futures]
+        active_metrics().add_components("outputs", {"sharded_json_csv": time.monotonic() - t0})
+        if json_path:
+            _join_parts(json_path, json_parts, counts, compress, head=b"[\n  ", sep=b",\n  ", tail=b"\n]",
+                        empty=b"[]")
+        if csv_path:
+            buf = io.StringIO()
+            csv.writer(buf).writerow(headers)
+            _join_parts(csv_path, csv_parts, counts, compress, head=buf.getvalue().encode("utf-8"))
+    finally:
+        for part in json_parts + csv_parts:
+            part.unlink(missing_ok=True)
+    return sum(counts)
+
+
+def write_csv_single_from_jsonl(jsonl_path: Path, out_dir: Path, base_name: str, headers: list[str],
+                                compress: str | None = None, workers: int = 1) -> Path:
+    """Stream JSONL -> one CSV file (unbounded; limited by disk); workers > 1 shards it across processes."""
+    csv_path = out_dir / f"{base_name}.csv{COMPRESS_SUFFIX.get(compress, '')}"
+    convert_jsonl(jsonl_path, headers, csv_path=csv_path, compress=compress, workers=workers)
+    return csv_path
 
-    # final flush
-    if rows_buffer:
-        if sheet_rows_written + len(rows_buffer) > max_rows_per_sheet:
-            flush_buffer_to_sheet()
-            sheet_idx += 1
-            sheet_rows_written = 0
-        flush_buffer_to_sheet()
 
-    writer.close()
+def write_xlsx_one_workbook_from_jsonl(
+    jsonl_path: Path, out_dir: Path, base_name: str, headers: list[str]
+) -> Path:
+    """Stream JSONL -> one XLSX workbook (multi-sheet if needed)."""
+    xlsx_path = out_dir / f"{base_name}.xlsx"
+    convert_jsonl(jsonl_path, headers, xlsx_path=xlsx_path)
     return xlsx_path
 
 
+def write_json_array_from_jsonl(jsonl_path: Path, json_path: Path, compress: str | None = None,
+                                workers: int = 1) -> int:
+    """Stream JSONL -> pretty-printed JSON array, one record at a time."""
+    return convert_jsonl(jsonl_path, [], json_path=json_path, compress=compress, workers=workers)
+
+
 def write_all_outputs(
-    all_items: list[dict[str, Any]], out_dir: Path, no_csv: bool = False, no_xlsx: bool = False
-) -> tuple[Path, Path, Path | None, Path | None]:
+    jsonl_path: Path, out_dir: Path, base: str, no_csv: bool = False, no_xlsx: bool = False,
+    schema: dict[str, str] | None = None, parquet: bool = False, compress: str | None = None, workers: int = 1,
+    no_json: bool = False
+) -> tuple[Path, Path | None, Path | None, Path | None, Path | None]:
     """
-    Writes:
-      - JSONL (authoritative stream)
-      - JSON (array)
-      - CSV (single file, streamed) [unless --no-csv]
+    From the already-streamed JSONL (authoritative), writes in one decode pass:
+      - JSON (array) [unless --no-json]
+      - CSV (single file) [unless --no-csv]
       - XLSX (single workbook with multiple sheets) [unless --no-xlsx]
-    Returns: (jsonl_path, json_path, csv_path_or_None, xlsx_path_or_None)
+      - Parquet (typed columns, row groups) [with --parquet]
+    schema (flattened header -> type) defaults to the sidecar (or a discovery pass if it is missing).
+    compress (gzip/zstd) compresses the JSON and CSV files (.gz/.zst); XLSX and Parquet compress internally.
+    workers > 1 converts JSON/CSV (and any header discovery) in a process pool over JSONL shards.
+    Returns: (jsonl_path, json_path_or_None, csv_path_or_None, xlsx_path_or_None, parquet_path_or_None)
     """
     out_dir.mkdir(parents=True, exist_ok=True)
-    ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")  # timezone-aware UTC
-    base = f"report_all_{ts}"
-
-    # JSONL
-    jsonl_path = out_dir / f"{base}.jsonl"
-    _ = write_jsonl(all_items, jsonl_path)
-
-    # JSON array
-    json_path = out_dir / f"{base}.json"
-    arr = [o for o in all_items if "__PAGE_META__" not in o]
-    json_path.write_text(json.dumps(arr, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    headers = build_headers_from_jsonl(jsonl_path)
-
-    # CSV (single)
-    csv_path: Path | None = None
-    if not no_csv:
-        csv_path = write_csv_single_from_jsonl(jsonl_path, out_dir, base_name=base, headers=headers)
-
-    # XLSX (one workbook)
-    xlsx_path: Path | None = None
-    if not no_xlsx:
-        xlsx_path = write_xlsx_one_workbook_from_jsonl(
-            jsonl_path, out_dir, base_name=base, headers=headers,
-            max_rows_per_sheet=1_048_000, chunk_size=100_000
-        )
+    suffix = COMPRESS_SUFFIX.get(compress, "")
+    json_path = None if no_json else out_dir / f"{base}.json{suffix}"
+    csv_path = None if no_csv else out_dir / f"{base}.csv{suffix}"
+    xlsx_path = None if no_xlsx else out_dir / f"{base}.xlsx"
+    parquet_path = out_dir / f"{base}.parquet" if parquet else None
+    if schema is None and (csv_path or xlsx_path or parquet_path):
+        schema = load_schema(jsonl_path, workers)
+    schema = schema or {}
+    if json_path or csv_path or xlsx_path or parquet_path:
+        convert_jsonl(jsonl_path, sorted(schema), json_path=json_path, csv_path=csv_path, xlsx_path=xlsx_path,
+                      parquet_path=parquet_path, schema=schema, compress=compress, workers=workers)
+    return jsonl_path, json_path, csv_path, xlsx_path, parquet_path
 
-    return jsonl_path, json_path, csv_path, xlsx_path
 
+# ----------------------------- Delta sync store -----------------------------
+
+class SyncStore:
+    """
+    Persistent local "current state" store for --sync (SQLite in the output directory).
+    findings: one row per --id-field value (latest record wins); sync_state: high-water mark + header union.
+    """
+
+    FILENAME = "sync_store.sqlite"
+
+    def __init__(self, path: Path):
+        import sqlite3
+        self.path = path
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("CREATE TABLE IF NOT EXISTS findings (id TEXT PRIMARY KEY, doc TEXT NOT NULL, synced_at TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+        self.db.commit()
+
+    def get_state(self, key: str) -> Any:
+        row = self.db.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_state(self, key: str, value: Any) -> None:
+        self.db.execute("INSERT INTO sync_state (key, value) VALUES (?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, json.dumps(value)))
+        self.db.commit()
+
+    def upsert_jsonl(self, jsonl_path: Path, id_field: str, synced_at: str) -> dict[str, int]:
+        """Upsert every JSONL record keyed by id_field; later lines win. Returns inserted/updated/missing_id counts."""
+        stats = {"inserted": 0, "updated": 0, "missing_id": 0}
+        loads = CODEC.loads
+        with open_read(jsonl_path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                fid = lookup_field(loads(line), id_field)
+                if fid is None or fid == "":
+                    stats["missing_id"] += 1
+                    continue
+                cur = self.db.execute("INSERT OR IGNORE INTO findings (id, doc, synced_at) VALUES (?, ?, ?)",
+                                      (str(fid), line, synced_at))
+                if cur.rowcount:
+                    stats["inserted"] += 1
+                else:
+                    self.db.execute("UPDATE findings SET doc = ?, synced_at = ? WHERE id = ?", (line, synced_at, str(fid)))
+                    stats["updated"] += 1
+        self.db.commit()
+        return stats
+
+    def export_jsonl(self, jsonl_path: Path, compress: str | None = None) -> int:
+        """Write the current state (ordered by id) as JSONL; returns the record count."""
+        n = 0
+        with open_write(jsonl_path, compress) as out:
+            for (doc,) in self.db.execute("SELECT doc FROM findings ORDER BY id"):
+                out.write(doc + "\n")
+                n += 1
+        return n
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def sync_start_date(hwm: str, overlap_hours: float) -> str:
+    """First date to query after high-water mark hwm (ISO timestamp), minus the safety overlap."""
+    return (datetime.fromisoformat(hwm) - timedelta(hours=overlap_hours)).date().isoformat()
+
+
+def merged_page_meta(pages: list[dict[str, Any]]) -> dict[str, Any]:
+    """Page metadata of all pages combined (later non-null values win)."""
+    merged: dict[str, Any] = {}
+    for p in pages:
+        if isinstance(p.get("meta"), dict):
+            merged.update((k, v) for k, v in p["meta"].items() if v is not None)
+    return merged
+
+
+def server_page_no(page_meta: dict[str, Any]) -> int:
+    """
+    The server's index of a fixed-size page (page_no only counts fetches, e.g. when a HAL next link skips one).
+    --size auto pages keep page_no: their server indexes depend on the size asked.
+    """
+    number = (page_meta.get("meta") or {}).get("number")
+    return number if isinstance(number, int) and "offset" not in page_meta else page_meta["page_no"]
+
+
+def find_page_gaps(pages: list[dict[str, Any]], size: int | str) -> list[dict[str, Any]]:
+    """
+    Pages to refetch, judged against the server's total_pages / total_elements:
+      fixed size : server page indexes below total_pages never seen, and pages with fewer items than they should
+                   hold (the page size, or what total_elements leaves for the last page)
+      --size auto: pages are placed by the item offset and count they actually returned; each offset range below
+                   total_elements that no page covers is requested with the size the server serves (page meta
+                   size, else the window's largest page), keeping only the missing slice
+    Each gap: {"page_no", "page", "size", "reason": "missing"|"short"}; new pages get unused page_no values.
+    With --size auto, "offset", "skip" and "take" say which slice of the returned items fills the gap.
+    """
+    meta = merged_page_meta(pages)
+    te = meta.get("total_elements") if isinstance(meta.get("total_elements"), int) else None
+    next_no = max((p["page_no"] for p in pages), default=-1) + 1
+    gaps: list[dict[str, Any]] = []
+    if size == "auto" or any("offset" in p for p in pages):
+        if te is None or not pages:
+            return gaps
+        s = meta["size"] if isinstance(meta.get("size"), int) and meta["size"] > 0 else max(p["size"] for p in pages)
+        covered, after_short = 0, False
+        for p in sorted(pages, key=page_order) + [{"offset": te, "count": 0, "size": 0}]:
+            a = covered
+            while a < p["offset"]:
+                start = a // s * s
+                take = min(p["offset"], start + s) - a
+                gaps.append({"page_no": next_no, "page": a // s, "size": s, "offset": a, "skip": a - start,
+                             "take": take, "reason": "short" if after_short else "missing"})
+                next_no += 1
+                a += take
+            covered = max(covered, p["offset"] + p["count"])
+            after_short = p["count"] < p["size"]
+        return gaps
+
+    assert isinstance(size, int)
+    per_page = meta["size"] if isinstance(meta.get("size"), int) else size  # the server may cap ?size=
+    total_pages = meta.get("total_pages")
+    if not isinstance(total_pages, int):
+        total_pages = -(-te // per_page) if te is not None else None
+    by_index = {server_page_no(p): p for p in pages}
+    last = total_pages - 1 if total_pages is not None else max(by_index, default=0)
+    for n in range(last + 1):
+        if n not in by_index:
+            if total_pages is not None:
+                gaps.append({"page_no": next_no, "page": n, "size": size, "reason": "missing"})
+                next_no += 1
+            continue
+        expected = per_page if n < last else (te - per_page * last if te is not None else None)
+        if expected is not None and by_index[n]["count"] < expected:
+            gaps.append({"page_no": by_index[n]["page_no"], "page": n, "size": size, "reason": "short"})
+    return gaps
+
+
+VERIFY_ROUNDS = 3
+
+
+def repair_window(
+    rid: str, w_start: str, w_end: str, res: dict[str, Any], size: int | str, window_dir: Path, stamp: bool,
+    id_field: str | None, workers: int = 4
+) -> dict[str, Any]:
+    """
+    --verify gap filling, before the window is appended: refetch the pages find_page_gaps reports (concurrently,
+    up to VERIFY_ROUNDS rounds) and write them as page files, replacing short pages, so append_window_pages merges
+    them in page order. Updates res["pages"], res["count"] and res["schema"] in place.
+    Returns {"actions": [one per refetch], "unresolved": [gaps still open]}.
+    """
+    by_no = {p["page_no"]: p for p in res["pages"]}
+    actions: list[dict[str, Any]] = []
+    gaps = find_page_gaps(res["pages"], size)
+    fetch = lambda g: call_api("GET", GET_URL_T.format(rid=rid, page=g["page"], size=g["size"]),  # noqa: E731
+                               missing_ok=True)
+    gone = False
+    for rnd in range(1, VERIFY_ROUNDS + 1):
+        if not gaps or gone:
+            break
+        for g, page in ordered_map(fetch, gaps, workers):
+            before = by_no[g["page_no"]]["count"] if g["page_no"] in by_no else None
+            action = dict(g, round=rnd, count_before=before)
+            if page is None:
+                actions.append(dict(action, count_after=before, result="report no longer exists"))
+                gone = True
+                continue
+            items = extract_items(page)
+            pm = {"page_no": g["page_no"], "count": len(items), "meta": normalize_page_meta(page), "repaired": True}
+            if "offset" in g:  # keep what the page really holds of the gap (the server may serve fewer per page)
+                start = g["page"] * served_page_size(page, items, g["size"])
+                lo, end = max(g["offset"], start), g["offset"] + g["take"]
+                items = items[lo - start:max(lo, end) - start]
+                pm.update(count=len(items), size=max(0, end - lo), offset=lo)
+            else:
+                pm["order"] = g["page"]
+            write_page_file(window_dir, g["page_no"], items, rid, w_start, w_end, stamp, id_field, res["schema"])
+            by_no[g["page_no"]] = pm
+            actions.append(dict(action, count_after=len(items),
+                                result="filled" if len(items) > (before or 0) else "unchanged"))
+        if any("offset" not in p for p in by_no.values()):
+            for p in by_no.values():  # fixed size: refetched pages slot in by server page index
+                p["order"] = server_page_no(p)
+        res["pages"] = sorted(by_no.values(), key=page_order)
+        res["count"] = sum(p["count"] for p in res["pages"])
+        gaps = find_page_gaps(res["pages"], size)
+    if actions:
+        filled = sum(1 for a in actions if a["result"] == "filled")
+        print(f"    verify: refetched {len(actions)} page(s), {filled} filled, "
+              f"{len(gaps)} gap(s) left  ({rid})")
+    return {"actions": actions, "unresolved": gaps}
+
+
+def verify_window(
+    rid: str, pages_seen_meta: list[dict[str, Any]], collected: int, id_field: str | None, icons: bool,
+    duplicate_count: int | None = None, duplicates_resolved: bool = False, repair: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """
+    Compare pages seen with server page metadata and items collected with total_elements (after any
+    repair_window refetches); print the result and return the audit record.
+    strict_ok is False on a page or total mismatch, unresolved gaps, or duplicates that --dedup did not drop.
+    """
+    print(f"    {ICONS['audit'] if icons else ''} running verification …".rstrip())
+    seen_indexes = {server_page_no(p) for p in pages_seen_meta}
+    merged_meta = merged_page_meta(pages_seen_meta)
+
+    total_pages = merged_meta.get("total_pages")
+    pages_seen_count = len(seen_indexes)
+    strict_ok = True
+    page_sizes = Counter(p["size"] for p in pages_seen_meta if p.get("size") and not p.get("repaired"))
+    total_elements = merged_meta.get("total_elements")
+    if len(page_sizes) > 1 or any(p.get("repaired") and "offset" in p for p in pages_seen_meta):
+        total_pages = None  # --size auto: server page counts depend on the size asked; item totals decide
+    elif isinstance(total_pages, int):
+        same = (pages_seen_count == total_pages)
+        strict_ok = same
+        status_icon = "✅" if same and icons else ("⚠️" if icons else "")
+        print(f"      {status_icon} pages: seen={pages_seen_count} reported={total_pages} "
+              f"=> {'OK' if same else 'MISMATCH'}".rstrip())
+    else:
+        print(f"      {'❔ ' if icons else ''}pages: seen={pages_seen_count} reported=? (not provided)".rstrip())
+    if isinstance(total_elements, int):
+        same = (collected == total_elements)
+        strict_ok = strict_ok and same
+        status_icon = "✅" if same and icons else ("⚠️" if icons else "")
+        print(f"      {status_icon} totals: collected={collected} expected={total_elements} "
+              f"=> {'OK' if same else 'MISMATCH'}".rstrip())
+    else:
+        print(f"      {'❔ ' if icons else ''}totals: collected={collected} expected=? (not provided)".rstrip())
+    if repair and (repair["actions"] or repair["unresolved"]):
+        strict_ok = strict_ok and not repair["unresolved"]
+        status_icon = ("✅" if not repair["unresolved"] else "⚠️") if icons else ""
+        print(f"      {status_icon} repaired: {len(repair['actions'])} page refetch(es), "
+              f"{len(repair['unresolved'])} gap(s) unresolved".rstrip())
+
+    if duplicate_count is not None:
+        ok = duplicate_count == 0 or duplicates_resolved
+        strict_ok = strict_ok and ok
+        status_icon = ("✅" if duplicate_count == 0 else "⚠️") if icons else ""
+        print(f"      {status_icon} duplicates ({id_field}): {duplicate_count}"
+              f"{' (dropped)' if duplicate_count and duplicates_resolved else ''}".rstrip())
+
+    audit = {
+        "report_id": rid,
+        "page_indexes_seen": sorted(list(seen_indexes)),
+        "pages_seen_count": pages_seen_count,
+        "total_pages_reported": total_pages,
+        "total_elements_reported": total_elements,
+        "collected_count_after_verify": collected,
+        "id_field": id_field,
+        "duplicate_id_count": duplicate_count,
+        "strict_ok": strict_ok
+    }
+    if repair is not None:
+        audit["repairs"] = repair["actions"]
+        audit["unresolved_gaps"] = repair["unresolved"]
+    if page_sizes:
+        audit["page_sizes"] = {str(k): v for k, v in sorted(page_sizes.items())}
+    return audit
+
+
+# ----------------------------- Distributed paging (--queue / --worker) -----------------------------
+# The coordinator (--queue FILE) POSTs and polls the reports, reads page 0 of each and puts the remaining pages
+# in a SQLite work queue as page-range units; workers (--worker FILE, any number, any host sharing the storage)
+# claim units with leases and write the pages as spool page files next to the queue. The coordinator then
+# merges them exactly like pages it fetched itself (dedup, --verify repairs, outputs, audit).
+
+class LeaseLost(Exception):
+    """A worker's lease on a unit expired and another worker may have claimed it."""
+
+
+class WorkQueue:
+    """
+    Durable page-range queue in one SQLite file (rollback journal, so it also works on shared network storage
+    with POSIX locks). units: one row per (run, window, first_page..last_page; last_page NULL = follow to the end)
+    with state pending → leased (owner, lease_until) → done (pages, count, schema) or failed after MAX_ATTEMPTS.
+    A leased unit whose lease ran out is claimable again, so a crashed worker only costs its lease time; after
+    MAX_ATTEMPTS expired leases it fails instead of cycling between dying workers forever.
+    """
+
+    MAX_ATTEMPTS = 5
+    POLL_S = 1.0
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._local = threading.local()
+        self.fragments = path.with_name(f"{path.stem}_fragments")
+        with self._tx() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            db.execute("CREATE TABLE IF NOT EXISTS units (id INTEGER PRIMARY KEY, run TEXT NOT NULL, "
+                       "window INTEGER NOT NULL, spec TEXT NOT NULL, first_page INTEGER NOT NULL, last_page INTEGER, "
+                       "state TEXT NOT NULL DEFAULT 'pending', owner TEXT, lease_until REAL, "
+                       "attempts INTEGER NOT NULL DEFAULT 0, pages TEXT, count INTEGER, schema TEXT, error TEXT)")
+            db.execute("CREATE INDEX IF NOT EXISTS units_window ON units (run, window)")
+            db.execute("CREATE INDEX IF NOT EXISTS units_state ON units (state, lease_until)")
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            import sqlite3
+            db = self._local.db = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+            db.row_factory = sqlite3.Row
+        return db
+
+    @contextlib.contextmanager
+    def _tx(self):
+        """One write transaction; BEGIN IMMEDIATE takes the write lock up front so claims never race."""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def set_meta(self, key: str, value: Any) -> None:
+        with self._tx() as db:
+            db.execute("INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = "
+                       "excluded.value", (key, json.dumps(value)))
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        row = self._db().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def window_units(self, run: str, window: int) -> list[dict[str, Any]]:
+        rows = self._db().execute("SELECT * FROM units WHERE run = ? AND window = ? ORDER BY first_page",
+                                  (run, window)).fetchall()
+        return [dict(r, spec=json.loads(r["spec"])) for r in rows]
+
+    def enqueue(self, run: str, window: int, spec: dict[str, Any], ranges: list[tuple[int, int | None]],
+                done: dict[str, Any] | None = None) -> None:
+        """Replace the window's units with `ranges`, plus an already finished unit (done: first_page, pages, ...)."""
+        with self._tx() as db:
+            db.execute("DELETE FROM units WHERE run = ? AND window = ?", (run, window))
+            if done:
+                db.execute("INSERT INTO units (run, window, spec, first_page, last_page, state, pages, count, schema) "
+                           "VALUES (?, ?, ?, ?, ?, 'done', ?, ?, ?)",
+                           (run, window, json.dumps(spec), done["first_page"], done["last_page"],
+                            json.dumps(done["pages"]), done["count"], json.dumps(done["schema"])))
+            db.executemany("INSERT INTO units (run, window, spec, first_page, last_page) VALUES (?, ?, ?, ?, ?)",
+                           [(run, window, json.dumps(spec), a, b) for a, b in ranges])
+
+    def claim(self, owner: str, lease_s: float) -> dict[str, Any] | None:
+        now = time.time()
+        with self._tx() as db:
+            # a unit whose workers keep dying (lease runs out every time) fails like one that keeps raising
+            db.execute("UPDATE units SET state = 'failed', owner = NULL, lease_until = NULL, "
+                       "error = COALESCE(error, ?) WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+                       (f"lease expired {self.MAX_ATTEMPTS} times (worker died or hung)", now, self.MAX_ATTEMPTS))
+            row = db.execute("SELECT * FROM units WHERE state = 'pending' OR (state = 'leased' AND lease_until < ?) "
+                             "ORDER BY id LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE units SET state = 'leased', owner = ?, lease_until = ?, attempts = attempts + 1 "
+                       "WHERE id = ?", (owner, now + lease_s, row["id"]))
+        return dict(row, spec=json.loads(row["spec"]), attempts=row["attempts"] + 1)
+
+    def renew(self, unit_id: int, owner: str, lease_s: float) -> bool:
+        with self._tx() as db:
+            cur = db.execute("UPDATE units SET lease_until = ? WHERE id = ? AND owner = ? AND state = 'leased'",
+                             (time.time() + lease_s, unit_id, owner))
+        return cur.rowcount == 1
+
+    def complete(self, unit_id: int, owner: str, pages: list[dict[str, Any]], count: int,
+                 schema: dict[str, str]) -> bool:
+        with self._tx() as db:
+            cur = db.execute("UPDATE units SET state = 'done', pages = ?, count = ?, schema = ?, error = NULL, "
+                             "lease_until = NULL WHERE id = ? AND owner = ? AND state = 'leased'",
+                             (json.dumps(pages), count, json.dumps(schema), unit_id, owner))
+        return cur.rowcount == 1
+
+    def fail(self, unit_id: int, owner: str, error: str) -> None:
+        with self._tx() as db:
+            db.execute("UPDATE units SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                       "owner = NULL, lease_until = NULL, error = ? WHERE id = ? AND owner = ? AND state = 'leased'",
+                       (self.MAX_ATTEMPTS, error, unit_id, owner))
+
+    def retry_failed(self, run: str, window: int) -> int:
+        """Give the window's failed units a fresh set of attempts (a resumed coordinator)."""
+        with self._tx() as db:
+            cur = db.execute("UPDATE units SET state = 'pending', attempts = 0 WHERE run = ? AND window = ? "
+                             "AND state = 'failed'", (run, window))
+        return cur.rowcount
+
+    def counts(self, run: str | None = None, window: int | None = None) -> Counter:
+        sql, params = "SELECT state, COUNT(*) FROM units", []
+        if run is not None:
+            sql += " WHERE run = ?" + (" AND window = ?" if window is not None else "")
+            params = [run] + ([window] if window is not None else [])
+        return Counter(dict(self._db().execute(sql + " GROUP BY state", params).fetchall()))
+
+    def drop_run(self, run: str) -> None:
+        with self._tx() as db:
+            db.execute("DELETE FROM units WHERE run = ?", (run,))
+
+
+def distribute_window(
+    queue: WorkQueue, run: str, idx: int, rid: str, w_start: str, w_end: str, size: int, window_dir: Path,
+    stamp: bool, id_field: str | None, unit_pages: int
+) -> dict[str, Any]:
+    """
+    Coordinator side of one COMPLETED report: fetch page 0 (for total_pages), queue the other pages in units of
+    unit_pages (or one open-ended unit without total_pages), then wait until workers finished them all.
+    A window already queued for the same report id (--resume) is only waited for. Returns spool_window's result.
+    """
+    units = queue.window_units(run, idx)
+    if not units or units[0]["spec"]["rid"] != rid:
+        shutil.rmtree(window_dir, ignore_errors=True)
+        window_dir.mkdir(parents=True, exist_ok=True)
+        page = call_api("GET", GET_URL_T.format(rid=rid, page=0, size=size))
+        items = extract_items(page)
+        meta = normalize_page_meta(page)
+        schema: dict[str, str] = {}
+        n = write_page_file(window_dir, 0, items, rid, w_start, w_end, stamp, id_field, schema)
+        total_pages = meta.get("total_pages")
+        if isinstance(total_pages, int):
+            ranges: list[tuple[int, int | None]] = [(a, min(a + unit_pages, total_pages) - 1)
+                                                    for a in range(1, total_pages, unit_pages)]
+        else:
+            ranges = [(1, None)] if _next_page(page, len(items), rid, size, 0)[0] else []
+        spec = {"rid": rid, "w_start": w_start, "w_end": w_end, "size": size, "stamp": stamp, "id_field": id_field,
+                "dir": str(window_dir)}
+        queue.enqueue(run, idx, spec, ranges, done={"first_page": 0, "last_page": 0, "count": n, "schema": schema,
+                                                     "pages": [{"page_no": 0, "count": n, "meta": meta}]})
+        print(f"    queued {len(ranges)} unit(s) after page 0 (total_pages={total_pages})  ({rid})")
+    elif retried := queue.retry_failed(run, idx):
+        print(f"    re-queued {retried} failed unit(s)  ({rid})")
+
+    while True:
+        states = queue.counts(run, idx)
+        if states["failed"]:
+            errors = {u["error"] for u in queue.window_units(run, idx) if u["state"] == "failed"}
+            die(f"report {rid}: {states['failed']} work unit(s) failed {WorkQueue.MAX_ATTEMPTS} times: "
+                f"{'; '.join(sorted(e for e in errors if e))}", exc=ApiError)
+        if not states["pending"] and not states["leased"]:
+            break
+        time.sleep(WorkQueue.POLL_S)
+
+    pages: list[dict[str, Any]] = []
+    schema = {}
+    count = 0
+    for u in queue.window_units(run, idx):
+        pages += json.loads(u["pages"])
+        merge_schema(schema, json.loads(u["schema"]))
+        count += u["count"]
+    pages.sort(key=lambda p: p["page_no"])
+    active_metrics().add_items(rid, count, merged_page_meta(pages).get("total_elements"))
+    return {"pages": pages, "count": count, "schema": schema, "window_dir": window_dir}
+
+
+def work_unit(queue: WorkQueue, unit: dict[str, Any], owner: str, lease_s: float,
+              page_workers: int) -> tuple[list[dict[str, Any]], int, dict[str, str]]:
+    """
+    Worker side: fetch the unit's pages into a private staging directory, renewing the lease after every page,
+    then move the page files into the window directory. Raises LeaseLost when another worker took over.
+    """
+    spec = unit["spec"]
+    rid, size = spec["rid"], spec["size"]
+    window_dir = Path(spec["dir"])
+    staging = window_dir / f".unit_{unit['id']}_{re.sub(r'[^A-Za-z0-9]+', '_', owner)}"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    pages: list[dict[str, Any]] = []
+    schema: dict[str, str] = {}
+
+    def keep(page_no: int, items: list[dict[str, Any]], meta: dict[str, Any]) -> None:
+        n = write_page_file(staging, page_no, items, rid, spec["w_start"], spec["w_end"], spec["stamp"],
+                            spec["id_field"], schema)
+        pages.append({"page_no": page_no, "count": n, "meta": meta})
+        if not queue.renew(unit["id"], owner, lease_s):
+            raise LeaseLost(f"unit {unit['id']}")
+
+    try:
+        if unit["last_page"] is None:  # no total_pages: follow HAL next / page meta like stream_report_items
+            current: dict[str, Any] | None = None
+            items: list[dict[str, Any]] = []
+            for obj in stream_report_items(rid, size, start_page=unit["first_page"]):
+                if "__PAGE_META__" in obj:
+                    if current is not None:
+                        keep(current["page_no"], items, current["meta"])
+                    current, items = obj["__PAGE_META__"], []
+                else:
+                    items.append(obj)
+            if current is not None:
+                keep(current["page_no"], items, current["meta"])
+        else:
+            fetch = lambda n: call_api("GET", GET_URL_T.format(rid=rid, page=n, size=size))  # noqa: E731
+            for page_no, page in ordered_map(fetch, list(range(unit["first_page"], unit["last_page"] + 1)),
+                                             page_workers):
+                keep(page_no, extract_items(page), normalize_page_meta(page))
+        for p in pages:
+            if spec["id_field"]:
+                os.replace(page_ids_file(staging, p["page_no"]), page_ids_file(window_dir, p["page_no"]))
+            os.replace(page_file(staging, p["page_no"]), page_file(window_dir, p["page_no"]))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return pages, sum(p["count"] for p in pages), schema
+
+
+def run_worker(args: argparse.Namespace) -> int:
+    """
+    --worker: claim and fetch units from the queue on --workers threads until there has been nothing to claim for
+    --worker-idle seconds. Uses the coordinator's API base URL unless --base-url is given. Returns units done.
+    """
+    check_env()
+    apply_cli_settings(args)
+    queue = WorkQueue(Path(args.worker))
+    if not args.base_url and (url := queue.get_meta("base_url")):
+        set_base_url(url)
+    lease_s = float(queue.get_meta("lease_s", 300))
+    host = f"{socket.gethostname()}:{os.getpid()}"
+    done = [0]
+    lock = threading.Lock()
+    print(f"Worker {host}: {max(1, args.workers)} thread(s) on {queue.path}")
+
+    def loop(n: int) -> None:
+        owner = f"{host}:{n}"
+        idle_since = time.monotonic()
+        while True:
+            unit = queue.claim(owner, lease_s)
+            if unit is None:
+                if time.monotonic() - idle_since > args.worker_idle:
+                    return
+                time.sleep(WorkQueue.POLL_S)
+                continue
+            last = "end" if unit["last_page"] is None else unit["last_page"]
+            label = f"unit {unit['id']} ({unit['spec']['rid']} pages {unit['first_page']}..{last})"
+            try:
+                pages, count, schema = work_unit(queue, unit, owner, lease_s, args.page_workers)
+            except LeaseLost:
+                print(f"  {label}: lease lost, left to the worker that took it over", file=sys.stderr)
+            except Exception as e:  # retried by another claim up to WorkQueue.MAX_ATTEMPTS
+                print(f"  {label}: attempt {unit['attempts']} failed: {e}", file=sys.stderr)
+                queue.fail(unit["id"], owner, f"{type(e).__name__}: {e}")
+            else:
+                if queue.complete(unit["id"], owner, pages, count, schema):
+                    with lock:
+                        done[0] += 1
+                    print(f"  {label}: {count} items")
+            idle_since = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers), thread_name_prefix="unit") as pool:
+        list(pool.map(loop, range(max(1, args.workers))))
+    print(f"Worker {host}: {done[0]} unit(s) done, idle for {args.worker_idle:g}s; exiting. API: {GOVERNOR.summary()}")
+    return done[0]
 
-# ----------------------------- CLI / Main -----------------------------
 
-def main() -> None:
+def start_local_workers(queue_path: Path, n: int, args: argparse.Namespace) -> list[subprocess.Popen]:
+    """--local-workers: n worker processes of this script on this machine (stopped by the coordinator)."""
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--worker", str(queue_path), "--workers", "1",
+           "--page-workers", str(args.page_workers), "--worker-idle", "86400", "--transport", args.transport,
+           "--http-timeout", str(args.http_timeout), "--json-codec", args.json_codec]
+    if args.max_rps:
+        cmd += ["--max-rps", str(args.max_rps / n)]  # the coordinator's rate budget, split between the workers
+    return [subprocess.Popen(cmd, stdout=subprocess.DEVNULL) for _ in range(n)]
+
+
+# ----------------------------- Library API -----------------------------
+# In-process use: `import VERACODE_REPORT_FETCH as vrf`, then vrf.configure(...) and
+#   for finding in vrf.iter_findings("2024-01-01", "2024-12-31"): ...
+#   vrf.export_findings("2024-01-01", "2024-12-31", [vrf.JsonlSink("f.jsonl"), vrf.CallbackSink(handle)])
+#   async for finding in vrf.aiter_findings(...): ...
+# Errors are raised as ReportFetchError subclasses; nothing here exits the process.
+
+def configure(base_url: str | None = None, transport: str = "native", http_timeout: float = 120.0,
+              json_codec: str = "stdlib", max_rps: float | None = None, max_concurrency: int = 16,
+              max_reports: int = 0) -> None:
+    """
+    Process-wide client settings (API host, transport, record codec, request rate limits, reports in flight),
+    as the CLI sets them.
+    """
+    global TRANSPORT, HTTP_TIMEOUT
+    if transport not in ("native", "httpie"):
+        die(f"unknown transport {transport!r} (native or httpie)", exc=ConfigError)
+    TRANSPORT = transport
+    HTTP_TIMEOUT = (10.0, http_timeout)
+    set_json_codec(json_codec)
+    GOVERNOR.configure(max_rps, max_concurrency, max_reports=max_reports)
+    if base_url:
+        set_base_url(base_url)
+
+
+def iter_findings(
+    date_from: str, date_to: str, report_type: str = "FINDINGS", filters: dict[str, Any] | None = None,
+    size: int | str = 1000, page_workers: int = 1, stamp: bool = True, max_inflight: int = 4,
+    poll_strategy: str = "adaptive", poll_interval: float = 2.0, poll_timeout: int = 600,
+    windows: list[tuple[str, str]] | None = None
+) -> Iterator[dict[str, Any]]:
+    """
+    Every finding in [date_from, date_to], stamped like the CLI's JSONL rows, straight from the API pages:
+    no spool files, JSONL or converted outputs. Reports for up to max_inflight windows generate concurrently
+    while earlier windows are paged (page_workers GETs at a time); findings arrive in window and page order.
+    windows replaces the 180-day split (e.g. plan_windows output). Settings and credentials are checked here,
+    before the first report is requested.
+    """
     check_env()
+    windows = windows or windows_180(date_from, date_to)
+    return _iter_findings(windows, report_type, filters or {}, size, page_workers, stamp, max_inflight,
+                          poll_strategy, poll_interval, poll_timeout)
+
+
+def _iter_findings(windows, report_type, filters, size, page_workers, stamp, max_inflight, poll_strategy,
+                   poll_interval, poll_timeout) -> Iterator[dict[str, Any]]:
+    ready = run_windows(windows, report_type, filters, lambda idx, rid: None, max_inflight=max_inflight, workers=1,
+                        sleep_s=0.5, max_wait_s=poll_timeout, interval_s=poll_interval, icons=False,
+                        poll_strategy=poll_strategy)
+    for w_start, w_end, rid, _ in ready:
+        for obj in stream_report_items(rid, size, page_workers):
+            if "__PAGE_META__" in obj:
+                continue
+            yield stamp_record(obj, rid, w_start, w_end) if stamp else obj
+
+
+class JsonlSink:
+    """Findings as JSON Lines (plain, gzip or zstd), one record per line as in the CLI's JSONL."""
+
+    def __init__(self, path: str | Path, compress: str | None = None):
+        self.path = Path(path)
+        self._f = open_write(self.path, compress)
+        self.n = 0
+
+    def write(self, obj: dict[str, Any]) -> None:
+        self._f.write(CODEC.dumps(obj) + "\n")
+        self.n += 1
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class CsvSink:
+    """
+    Flattened findings as one CSV, written in the same pass. With headers, exactly those columns.
+    Without, columns are discovered as records arrive and new ones are appended on the right (earlier rows
+    stay shorter); if any were added after the first row, close() rewrites the header line once.
+    """
+
+    def __init__(self, path: str | Path, headers: list[str] | None = None, compress: str | None = None):
+        self.path = Path(path)
+        self.compress = compress
+        self.discover = headers is None
+        self.headers = list(headers or [])
+        self._known = set(self.headers)
+        self._flat = RowFlattener(self.headers)
+        self._f = open_write(self.path, compress, newline="")
+        self._w = csv.writer(self._f)
+        self._header_width: int | None = None
+        self.n = 0
+
+    def write(self, obj: dict[str, Any]) -> None:
+        if self.discover:
+            schema: dict[str, str] = {}
+            collect_schema(obj, schema)
+            new = sorted(k for k in schema if k not in self._known)
+            if new:
+                self.headers += new
+                self._known.update(new)
+                self._flat = RowFlattener(self.headers)
+        if self._header_width is None:
+            self._w.writerow(self.headers)
+            self._header_width = len(self.headers)
+        self._w.writerow(self._flat.row(obj))
+        self.n += 1
+
+    def close(self) -> None:
+        if self._header_width is None:
+            self._w.writerow(self.headers)
+            self._header_width = len(self.headers)
+        self._f.close()
+        if len(self.headers) == self._header_width:
+            return
+        buf = io.StringIO()
+        csv.writer(buf).writerow(self.headers)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open_read(self.path, text=False) as src, open_write(tmp, self.compress, text=False) as dst:
+            src.readline()
+            dst.write(buf.getvalue().encode("utf-8"))
+            shutil.copyfileobj(src, dst, 1 << 20)
+        os.replace(tmp, self.path)
+
+
+class XlsxSink:
+    """
+    Flattened findings as one XLSX workbook (XlsxRowWriter), written in the same pass. Rows are streamed, so the
+    header row is fixed: pass headers, or the first `sample` findings are held back to discover the columns.
+    Columns first seen after that are not written; their names are collected in dropped_columns.
+    """
+
+    def __init__(self, path: str | Path, headers: list[str] | None = None, sample: int = 1000):
+        self.path = Path(path)
+        self.headers = headers
+        self.sample = sample
+        self._buffer: list[dict[str, Any]] = []
+        self._writer: XlsxRowWriter | None = None
+        self._flat: RowFlattener | None = None
+        self._known: set[str] = set()
+        self.dropped_columns: set[str] = set()
+        self.n = 0
+        if headers is not None:
+            self._start(headers)
+
+    def _start(self, headers: list[str]) -> None:
+        self._writer = XlsxRowWriter(self.path, headers)
+        self._flat = RowFlattener(headers)
+        self._known = set(headers)
+
+    def _schema_start(self) -> None:
+        schema: dict[str, str] = {}
+        for obj in self._buffer:
+            collect_schema(obj, schema)
+        self._start(sorted(schema))
+        for obj in self._buffer:
+            self._writer.write(self._flat.row(obj))  # type: ignore[union-attr]
+        self._buffer = []
+
+    def write(self, obj: dict[str, Any]) -> None:
+        self.n += 1
+        if self._writer is None:
+            self._buffer.append(obj)
+            if len(self._buffer) >= self.sample:
+                self._schema_start()
+            return
+        if self.headers is None:
+            schema: dict[str, str] = {}
+            collect_schema(obj, schema)
+            self.dropped_columns.update(k for k in schema if k not in self._known)
+        self._writer.write(self._flat.row(obj))  # type: ignore[union-attr]
+
+    def close(self) -> None:
+        if self._writer is None:
+            self._schema_start()
+        self._writer.close()  # type: ignore[union-attr]
+        if self.dropped_columns:
+            print(f"WARN: {self.path}: {len(self.dropped_columns)} column(s) first seen after the header sample "
+                  f"were not written; pass headers= to include them", file=sys.stderr)
+
+
+class CallbackSink:
+    """Hands every finding to fn (queues, database writers, ...); aexport_findings awaits an async fn."""
+
+    def __init__(self, fn: Callable[[dict[str, Any]], Any], on_close: Callable[[], Any] | None = None):
+        self.fn = fn
+        self.on_close = on_close
+
+    def write(self, obj: dict[str, Any]) -> Any:
+        return self.fn(obj)
+
+    def close(self) -> Any:
+        return self.on_close() if self.on_close else None
+
+
+def export_findings(date_from: str, date_to: str, sinks: list[Any], **options: Any) -> int:
+    """
+    One pass of iter_findings(date_from, date_to, **options) feeding every sink (objects with write(finding) and
+    close()). Sinks are closed even when fetching fails. Returns the number of findings.
+    """
+    findings = iter_findings(date_from, date_to, **options)
+    n = 0
+    try:
+        for obj in findings:
+            for sink in sinks:
+                sink.write(obj)
+            n += 1
+    finally:
+        for sink in sinks:
+            sink.close()
+    return n
+
+
+async def aiter_findings(date_from: str, date_to: str, batch: int = 500,
+                         **options: Any) -> AsyncIterator[dict[str, Any]]:
+    """iter_findings for asyncio: the blocking API work runs in a worker thread, `batch` findings per hand-over."""
+    loop = asyncio.get_running_loop()
+    findings = await loop.run_in_executor(None, lambda: iter_findings(date_from, date_to, **options))
+    try:
+        while True:
+            chunk = await loop.run_in_executor(None, lambda: list(itertools.islice(findings, batch)))
+            if not chunk:
+                return
+            for obj in chunk:
+                yield obj
+    finally:
+        await loop.run_in_executor(None, findings.close)
+
+
+async def aexport_findings(date_from: str, date_to: str, sinks: list[Any], **options: Any) -> int:
+    """export_findings for asyncio; a sink's write()/close() may return an awaitable (e.g. an async CallbackSink)."""
+    n = 0
+    try:
+        async for obj in aiter_findings(date_from, date_to, **options):
+            for sink in sinks:
+                res = sink.write(obj)
+                if inspect.isawaitable(res):
+                    await res
+            n += 1
+    finally:
+        for sink in sinks:
+            res = sink.close()
+            if inspect.isawaitable(res):
+                await res
+    return n
+
+
+# ----------------------------- CLI / Main -----------------------------
 
+def build_parser() -> argparse.ArgumentParser:
+    """The CLI options; build_parser().parse_args(argv) is also what run_export() takes."""
     ap = argparse.ArgumentParser(
-        description="Veracode Reporting API via HTTPie/HMAC. Robust pagination with retries. JSON/JSONL/CSV outputs. Optional XLSX."
+        description="Veracode Reporting API via HMAC-signed requests (native or HTTPie). Robust pagination with retries. "
+                    "JSON/JSONL/CSV outputs. Optional XLSX."
     )
-    ap.add_argument("--from", dest="date_from", required=True, help="YYYY-MM-DD")
-    ap.add_argument("--to", dest="date_to", required=True, help="YYYY-MM-DD")
+    ap.add_argument("--from", dest="date_from", default=None,
+                    help="YYYY-MM-DD (required, except with --resume or after the first --sync)")
+    ap.add_argument("--to", dest="date_to", default=None, help="YYYY-MM-DD (default today with --sync)")
     ap.add_argument("--report-type", default="FINDINGS", help="Report type (e.g., FINDINGS)")
-    ap.add_argument("--size", type=int, default=1000, help="Page size for GET")
+    ap.add_argument("--size", type=parse_page_size, default=1000,
+                    help="Page size for GET, or 'auto' to tune it per report from measured throughput")
     ap.add_argument("--out", default="./out", help="Output directory")
     ap.add_argument("--filters", default=None, help="Path to JSON with extra POST filters (merged)")
     ap.add_argument("--sleep", type=float, default=0.5, help="Pause after POST before polling")
     ap.add_argument("--poll-timeout", type=int, default=600, help="Seconds to wait for report completion")
-    ap.add_argument("--poll-interval", type=float, default=2.0, help="Polling interval in seconds")
+    ap.add_argument("--poll-interval", type=float, default=2.0,
+                    help="Polling interval in seconds (with --poll-strategy fixed)")
+    ap.add_argument("--poll-strategy", choices=["adaptive", "fixed"], default="adaptive",
+                    help="adaptive: quick first check, history-guided wait, then capped backoff; fixed: --poll-interval")
+    ap.add_argument("--poll-max-interval", type=float, default=30.0,
+                    help="Upper bound between status checks with --poll-strategy adaptive")
+    ap.add_argument("--plan", choices=["fixed", "adaptive", "probe"], default="fixed",
+                    help="Window planning: fixed 180-day windows (stable across runs, so --cache-dir keys hit); "
+                         "adaptive sizes windows from findings counts of earlier runs (fixed until there are any); "
+                         "probe first asks the server for counts")
+    ap.add_argument("--window-target", type=int, default=0,
+                    help="Findings per adaptive window (0 = auto: estimated total / (2 x --max-inflight), "
+                         f"at least {WINDOW_TARGET_MIN:,})")
+    ap.add_argument("--volume-history", default=None,
+                    help="JSON file of findings per window from earlier runs (default <out>/window_volumes.json)")
+    ap.add_argument("--poll-history", default=None,
+                    help="JSON file of past report generation times (default <out>/poll_history.json)")
     ap.add_argument("--icons", action="store_true", help="Add visual icons to logs")
     ap.add_argument("--no-stamp", action="store_true",
                     help="Do not add source_report_id/window_start/window_end to each record")
     ap.add_argument("--verify", action="store_true",
-                    help="After paging, verify coverage using server metadata; fetch missing pages if any")
+                    help="After paging, check pages/totals against server metadata and refetch missing or short pages")
     ap.add_argument("--strict", action="store_true",
                     help="With --verify, exit non-zero on any mismatch/duplicate")
     ap.add_argument("--id-field", default=None,
                     help="Optional unique id field (e.g., finding_id) to check for duplicates")
+    ap.add_argument("--dedup", choices=["report", "drop", "keep-latest"], default="report",
+                    help="With --id-field: only count duplicates (report), drop repeats after the first (drop), "
+                         "or keep only the last occurrence (keep-latest)")
+    ap.add_argument("--dedup-memory-ids", type=int, default=2_000_000,
+                    help="Ids tracked in memory before the duplicate index spills to disk")
+    ap.add_argument("--no-json", action="store_true",
+                    help="Skip the pretty-printed JSON array (the JSONL is always written)")
     ap.add_argument("--no-xlsx", action="store_true",
                     help="Skip generating the Excel (.xlsx) file")
     ap.add_argument("--no-csv", action="store_true",
                     help="Skip generating the CSV file")
-    args = ap.parse_args()
+    ap.add_argument("--parquet", action="store_true",
+                    help="Also write a typed, zstd-compressed Parquet file (requires pyarrow)")
+    ap.add_argument("--compress", choices=["none", "gzip", "zstd"], default="none",
+                    help="Compress the JSONL, JSON and CSV outputs (.gz/.zst; zstd requires zstandard)")
+    ap.add_argument("--compress-level", type=int, default=None,
+                    help="Compression level (default: gzip 6, zstd 3)")
+    ap.add_argument("--compress-threads", type=int, default=COMPRESS_THREADS,
+                    help="Background threads compressing output chunks")
+    ap.add_argument("--convert-workers", type=int, default=1,
+                    help="Processes converting the JSONL to JSON/CSV in parallel shards (1 = single pass)")
+    ap.add_argument("--json-codec", choices=["auto", "orjson", "stdlib"], default="stdlib",
+                    help="Record JSON encoder/decoder: stdlib json module, or orjson (faster; compact separators, so "
+                         "output bytes differ). auto: orjson when installed, else stdlib")
+    ap.add_argument("--transport", choices=["native", "httpie"], default="native",
+                    help="HTTP transport: in-process pooled session (native) or HTTPie subprocess (fallback)")
+    ap.add_argument("--base-url", default=None,
+                    help="API base URL (default $VERACODE_API_BASE_URL or https://api.veracode.com)")
+    ap.add_argument("--max-inflight", type=int, default=4,
+                    help="Max windows submitted/polled/paged concurrently (1 = one window at a time)")
+    ap.add_argument("--workers", type=int, default=4,
+                    help="Worker threads paging COMPLETED reports")
+    ap.add_argument("--page-workers", type=int, default=1,
+                    help="Concurrent page GETs per report once page 0 reports total_pages (1 = sequential)")
+    ap.add_argument("--resume", action="store_true",
+                    help="Resume the interrupted run recorded in <out>/run_manifest.json (same parameters required)")
+    ap.add_argument("--sync", action="store_true",
+                    help="Delta sync: fetch only findings updated since the stored high-water mark, upsert them into "
+                         "<out>/sync_store.sqlite keyed by --id-field and export the current-state snapshot")
+    ap.add_argument("--sync-overlap-hours", type=float, default=24.0,
+                    help="With --sync, re-query this much before the high-water mark")
+    ap.add_argument("--max-rps", type=float, default=None,
+                    help="Ceiling on API requests/second across all workers (default: unlimited)")
+    ap.add_argument("--max-concurrency", type=int, default=16,
+                    help="Upper bound for the adaptive (AIMD) number of in-flight API requests")
+    ap.add_argument("--max-reports", type=int, default=0,
+                    help="Reports being generated or paged at once across all windows and --jobs (0 = no cap "
+                         "beyond --max-inflight per export)")
+    ap.add_argument("--http-timeout", type=float, default=120.0,
+                    help="Native transport read timeout in seconds")
+    ap.add_argument("--metrics-json", default=None,
+                    help="Run report path: API latency/retries/bytes, poll waits, stage times and peak memory "
+                         "(default <out>/run_report_<base>.json)")
+    ap.add_argument("--prometheus-textfile", default=None,
+                    help="Also write the run metrics in Prometheus text format (node_exporter textfile collector)")
+    ap.add_argument("--progress", choices=["auto", "on", "off"], default="auto",
+                    help="Live progress line with items/sec and ETA on stderr (auto: only on a terminal)")
+    ap.add_argument("--jobs", default=None,
+                    help="Job-spec JSON: many exports (filters, report type, dates, output options) run by this one "
+                         "invocation, sharing the connection pool, rate budget and report polling")
+    ap.add_argument("--job-workers", type=int, default=8,
+                    help="With --jobs, exports running at once (0 = all jobs)")
+    ap.add_argument("--queue", default=None,
+                    help="Coordinator: put the pages of every report in this SQLite work queue (shared storage) for "
+                         "--worker processes, then merge their fragments into the usual outputs")
+    ap.add_argument("--worker", default=None,
+                    help="Worker: claim and fetch page ranges from this work queue instead of running an export")
+    ap.add_argument("--unit-pages", type=int, default=20, help="With --queue, pages per work unit")
+    ap.add_argument("--lease-seconds", type=float, default=300.0,
+                    help="With --queue, seconds a worker may hold a unit without progress before others reclaim it")
+    ap.add_argument("--local-workers", type=int, default=0,
+                    help="With --queue, also start this many --worker processes on this machine")
+    ap.add_argument("--worker-idle", type=float, default=60.0,
+                    help="With --worker, exit after this many seconds without a unit to claim")
+    ap.add_argument("--cache-dir", default=None,
+                    help="Cache report ids and raw pages per window here; reruns replay historical windows "
+                         "from it (the newest window is always fetched)")
+    ap.add_argument("--cache-ttl-hours", type=float, default=24.0,
+                    help="With --cache-dir, reuse a cached COMPLETED report id for this long")
+    ap.add_argument("--cache-max-mb", type=float, default=2048.0,
+                    help="With --cache-dir, evict least recently used windows beyond this size")
+    return ap
+
+
+def apply_cli_settings(args: argparse.Namespace) -> None:
+    """The process-wide CLI options: HTTP client, rate limits, record codec, compression level/threads."""
+    global COMPRESS_LEVEL, COMPRESS_THREADS
+    COMPRESS_LEVEL = args.compress_level
+    COMPRESS_THREADS = max(1, args.compress_threads)
+    configure(base_url=args.base_url, transport=args.transport, http_timeout=args.http_timeout,
+              json_codec=args.json_codec, max_rps=args.max_rps, max_concurrency=args.max_concurrency,
+              max_reports=args.max_reports)
+
+
+def run_export(args: argparse.Namespace, apply_settings: bool = True, poll_history: PollHistory | None = None,
+               volumes: VolumeHistory | None = None) -> dict[str, Any] | None:
+    """
+    The CLI's on-disk export: plan and fetch the windows (resume, cache, dedup, sync), then write the JSONL and
+    converted outputs and the run report. Raises ReportFetchError subclasses. Returns the record count and output
+    paths, or None when --resume finds the run already completed.
+    run_batch passes apply_settings=False (applied once for all jobs) and the histories its jobs share.
+    """
+    check_env()
+    if apply_settings:
+        apply_cli_settings(args)
+    metrics = Metrics()
+    outer = getattr(_JOB, "metrics", None)
+    _JOB.metrics = metrics
+    local_workers = start_local_workers(Path(args.queue), args.local_workers, args) \
+        if args.queue and args.local_workers > 0 else []
+    try:
+        return _export(args, metrics, poll_history, volumes)
+    finally:
+        _JOB.metrics = outer
+        for proc in local_workers:
+            proc.terminate()
+        for proc in local_workers:
+            proc.wait()
+
+
+def _export(args: argparse.Namespace, metrics: Metrics, poll_history: PollHistory | None,
+            volumes: VolumeHistory | None) -> dict[str, Any] | None:
+    compress = None if args.compress == "none" else args.compress
+    if compress == "zstd":
+        _zstd()  # fail before any report is requested
 
     out_dir = Path(args.out)
     out_dir.mkdir(parents=True, exist_ok=True)
     audit_dir = out_dir / "audit"
 
     extra: dict[str, Any] = {}
-    if args.filters:
+    if isinstance(args.filters, dict):  # --jobs may give the filters object itself
+        extra = dict(args.filters)
+    elif args.filters:
         try:
             extra = json.loads(Path(args.filters).read_text(encoding="utf-8"))
-            if not isinstance(extra, dict):
-                die("--filters must be a JSON object")
         except Exception as e:
-            die(f"reading --filters: {e}")
+            die(f"reading --filters: {e}", exc=ConfigError)
+        if not isinstance(extra, dict):
+            die("--filters must be a JSON object", exc=ConfigError)
+
+    if args.queue and not isinstance(args.size, int):
+        die("--queue splits reports into page ranges and needs a fixed --size", exc=ConfigError)
 
-    windows = windows_180(args.date_from, args.date_to)
+    prior: RunManifest | None = RunManifest.load(out_dir) if args.resume else None
+    if prior:  # resumed runs default to the interrupted run's range
+        args.date_from = args.date_from or prior.data["params"]["date_from"]
+        args.date_to = args.date_to or prior.data["params"]["date_to"]
+
+    store: SyncStore | None = None
+    if args.sync:
+        if not args.id_field:
+            die("--sync needs --id-field to key the local store (e.g., --id-field finding_id)", exc=ConfigError)
+        store = SyncStore(out_dir / SyncStore.FILENAME)
+        hwm = store.get_state("high_water_mark")
+        if not args.date_from:
+            if not hwm:
+                die("first --sync run needs --from (no high-water mark stored yet)", exc=ConfigError)
+            args.date_from = sync_start_date(hwm, args.sync_overlap_hours)
+        args.date_to = args.date_to or datetime.now(timezone.utc).date().isoformat()
+        print(f"Sync: high-water mark {hwm or '(none)'} → querying last_updated {args.date_from} .. {args.date_to}")
+    if not args.date_from or not args.date_to:
+        die("--from and --to are required", exc=ConfigError)
+
+    poll_history = poll_history or PollHistory(
+        Path(args.poll_history) if args.poll_history else out_dir / "poll_history.json")
+    volumes = volumes or VolumeHistory(
+        Path(args.volume_history) if args.volume_history else out_dir / "window_volumes.json")
+    volume_key = VolumeHistory.key(args.report_type, extra)
+    probed: dict[tuple[str, str], str] = {}  # probe report ids, reused for windows the plan keeps
+    if prior:  # the interrupted run's windows, whatever the plan would say now
+        windows = [(w["start"], w["end"]) for w in prior.data["windows"]]
+    else:
+        windows = windows_180(args.date_from, args.date_to)
+        if args.plan == "probe":
+            density = volumes.density(volume_key)
+            unknown = [w for w in windows if estimate_window(*w, density) is None]
+            if unknown:
+                print(f"Probing {len(unknown)} window(s) for total_elements …")
+                for w_start, w_end, rid, total in probe_window_totals(
+                        unknown, args.report_type, extra, max_inflight=args.max_inflight, workers=args.workers,
+                        sleep_s=args.sleep, max_wait_s=args.poll_timeout, interval_s=args.poll_interval,
+                        icons=args.icons, poll_strategy=args.poll_strategy, poll_cap_s=args.poll_max_interval,
+                        history=poll_history):
+                    print(f"  {w_start} → {w_end}: {total if total is not None else '?'} findings")
+                    if isinstance(total, int):
+                        volumes.record(volume_key, w_start, w_end, total)
+                    probed[(w_start, w_end)] = rid
+        density = volumes.density(volume_key) if args.plan != "fixed" else {}
+        if density:
+            estimated = estimate_window(args.date_from, args.date_to, density) or 0.0
+            target = args.window_target or max(WINDOW_TARGET_MIN, estimated / (2 * max(1, args.max_inflight)))
+            windows = plan_windows(args.date_from, args.date_to, density, target)
+            print(f"Plan: {len(windows)} window(s) of up to ~{target:,.0f} findings "
+                  f"(~{estimated:,.0f} estimated in total)")
+    density = volumes.density(volume_key)
     print("Windows:")
     for s, e in windows:
-        print(f"  - {ICONS['window'] if args.icons else ''} {s} -> {e}".rstrip())
+        est = estimate_window(s, e, density)
+        print(f"  - {ICONS['window'] if args.icons else ''} {s} -> {e}{f'  (~{est:,.0f})' if est else ''}".rstrip())
+
+    params = {
+        "date_from": args.date_from, "date_to": args.date_to, "report_type": args.report_type,
+        "size": args.size, "filters": extra, "no_stamp": args.no_stamp,
+        "id_field": args.id_field, "dedup": args.dedup if args.id_field else None, "compress": compress,
+    }
+    if prior:
+        manifest = prior
+        changed = sorted(k for k in params if manifest.data["params"].get(k) != params[k])
+        if changed:
+            die(f"--resume: run parameters differ from {manifest.path} ({', '.join(changed)})", exc=ConfigError)
+        if manifest.data["completed"]:
+            print(f"Nothing to resume: {manifest.path} records a completed run.")
+            return None
+        base = manifest.data["base"]
+    else:
+        ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")  # timezone-aware UTC
+        base = f"report_all_{ts}"
+        manifest = RunManifest.create(out_dir, base, params, windows)
+        for i, w in enumerate(windows):
+            if w in probed:
+                manifest.set_report(i, probed[w])
+
+    jsonl_path = out_dir / f"{base}.jsonl{COMPRESS_SUFFIX.get(compress, '')}"
+    spool_dir = out_dir / f".spool_{base}"
+    queue: WorkQueue | None = None
+    run_key = base
+    if args.queue:  # pages are fetched by --worker processes into the queue's fragments directory
+        queue = WorkQueue(Path(args.queue))
+        queue.set_meta("base_url", BASE_URL)
+        queue.set_meta("lease_s", args.lease_seconds)
+        run_key = f"{base}_{hashlib.sha1(str(out_dir.resolve()).encode()).hexdigest()[:8]}"
+        spool_dir = queue.fragments / run_key
+        print(f"Queue: {queue.path} (fragments in {spool_dir})")
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    keep_latest_done = manifest.data.get("keep_latest_done", False)
+    with jsonl_path.open("ab") as jf:  # drop any window that was only partially appended
+        if jf.tell() > manifest.data["jsonl_bytes"]:
+            jf.truncate(manifest.data["jsonl_bytes"])
+
+    # run-wide duplicate tracking: one id digest per JSONL line in <base>.ids, index spills to disk when large
+    dedup: DedupIndex | None = None
+    ids_path = out_dir / f"{base}.ids"
+    if args.id_field and not keep_latest_done:
+        dedup = DedupIndex(out_dir / f"{base}.ids.sqlite", max_memory_ids=args.dedup_memory_ids)
+        ids_count = manifest.data.get("ids_count", 0)
+        with ids_path.open("ab") as idf:
+            idf.truncate(ids_count * 8)
+        if ids_count:
+            dedup.replay(ids_path, ids_count)
 
-    all_items: list[dict[str, Any]] = []
     grand_total = 0
+    schema: dict[str, str] = {}
+    todo: list[int] = []
+    for i, w in enumerate(manifest.data["windows"]):
+        if w["status"] == "written":
+            grand_total += w["written"] if w.get("written") is not None else w["count"]
+            merge_schema(schema, w["schema"])
+        else:
+            todo.append(i)
+    if args.resume:
+        print(f"Resuming {base}: {len(windows) - len(todo)} window(s) already written, {len(todo)} to go.")
 
-    for w_start, w_end in windows:
-        print(f"{ICONS['window'] if args.icons else ''} === Window {w_start} → {w_end} ===".rstrip())
-        rid = post_report(args.report_type, w_start, w_end, extra)
-        print(f"  {ICONS['report'] if args.icons else ''} report id: {rid}".rstrip())
-        if args.sleep > 0:
-            time.sleep(args.sleep)
-        poll_ready(rid, max_wait_s=args.poll_timeout, interval_s=args.poll_interval, icons=args.icons)
+    # historical windows come from the cache: all pages (no API call at all) or at least a live report id
+    cache: ReportCache | None = None
+    cache_keys: dict[int, str] = {}
+    cached: dict[int, str] = {}
+    if args.cache_dir:
+        cache = ReportCache(Path(args.cache_dir), ttl_s=args.cache_ttl_hours * 3600,
+                            max_bytes=int(args.cache_max_mb * (1 << 20)))
+        reused = 0
+        for j, i in enumerate(todo):
+            w = manifest.window(i)
+            key = cache_keys[i] = ReportCache.key(args.report_type, w["start"], w["end"], extra)
+            if i == len(windows) - 1:
+                continue
+            entry = cache.complete(key)
+            if entry and w["report_id"] in (None, entry["report_id"]):
+                cached[j] = entry["report_id"]
+            elif not w["report_id"] and (rid := cache.report_id(key)):
+                manifest.set_report(i, rid)
+                reused += 1
+        print(f"Cache: {len(cached)} window(s) replayed from {cache.root}, {reused} cached report id(s) reused")
 
-        window_total = 0
-        pages_seen_meta: list[dict[str, Any]] = []
-        window_items: list[dict[str, Any]] = []
+    def window_dir(i: int) -> Path:
+        return spool_dir / f"window_{i:04d}"
 
-        for obj in stream_report_items(rid, args.size):
-            if "__PAGE_META__" in obj:
-                meta = obj["__PAGE_META__"]
-                pages_seen_meta.append(meta)
+    def on_report(j: int, rid: str) -> None:
+        i = todo[j]
+        manifest.set_report(i, rid)
+        shutil.rmtree(window_dir(i), ignore_errors=True)
+
+    def page_fn(j: int, rid: str) -> dict[str, Any]:
+        i = todo[j]
+        w = manifest.window(i)
+        if w["status"] == "paged":
+            return {"pages": w["pages"], "count": w["count"], "schema": w["schema"], "window_dir": window_dir(i),
+                    "repair": w.get("repair")}
+        if queue and j not in cached:
+            res = distribute_window(queue, run_key, i, rid, w["start"], w["end"], args.size, window_dir(i),
+                                    stamp=not args.no_stamp, id_field=args.id_field,
+                                    unit_pages=max(1, args.unit_pages))
+            manifest.update_window(i, pages=res["pages"])
+        else:
+            source = tee = None
+            if j in cached:  # replayed from the start: pages of an interrupted replay are dropped
+                manifest.set_report(i, rid)
+                shutil.rmtree(window_dir(i), ignore_errors=True)
+                source = cache.replay(cache_keys[i])  # type: ignore[union-attr]
+                if source is None:  # evicted since the plan was made: fetch the window after all
+                    print(f"  cache entry for {w['start']} → {w['end']} is gone; fetching the window",
+                          file=sys.stderr)
+                    if fetch_status(rid, missing_ok=True) is None:  # the cached report has expired too
+                        rid = post_report(args.report_type, w["start"], w["end"], extra)
+                        manifest.set_report(i, rid)
+                    poll_ready(rid, args.poll_timeout, args.poll_interval, args.icons)
+                    cache.put_report(cache_keys[i], rid)  # type: ignore[union-attr]
+                    tee = cache.writer(cache_keys[i], rid)  # type: ignore[union-attr]
+            elif cache and manifest.first_missing_page(i) == 0:
+                tee = cache.writer(cache_keys[i], rid)
+            res = spool_window(rid, w["start"], w["end"], args.size, args.page_workers, window_dir(i),
+                               stamp=not args.no_stamp, start_page=manifest.first_missing_page(i),
+                               prior_pages=w["pages"], on_page=lambda m: manifest.page_done(i, m),
+                               id_field=args.id_field, source=source, tee=tee)
+        if args.verify:
+            res["repair"] = repair_window(rid, w["start"], w["end"], res, args.size, window_dir(i),
+                                          stamp=not args.no_stamp, id_field=args.id_field,
+                                          workers=max(4, args.page_workers))
+            manifest.update_window(i, pages=res["pages"], repair=res["repair"])
+            if cache and res["repair"]["actions"]:
+                cache.drop_pages(cache_keys[i])
+        manifest.window_paged(i, res["count"], res["schema"])
+        return res
+
+    def on_ready(j: int, stats: dict[str, Any]) -> None:
+        manifest.update_window(todo[j], poll=stats)
+        metrics.poll(manifest.window(todo[j])["report_id"], stats)
+        if cache:
+            cache.put_report(cache_keys[todo[j]], manifest.window(todo[j])["report_id"])
+
+    metrics.windows = len(todo)
+    progress = None
+    if args.progress == "on" or (args.progress == "auto" and sys.stderr.isatty()):
+        progress = ProgressLine(metrics, tty=sys.stderr.isatty())
+    window_results = run_windows(
+        [windows[i] for i in todo], args.report_type, extra, page_fn,
+        max_inflight=args.max_inflight, workers=args.workers, sleep_s=args.sleep,
+        max_wait_s=args.poll_timeout, interval_s=args.poll_interval, icons=args.icons,
+        known_rids={j: manifest.window(i)["report_id"] for j, i in enumerate(todo) if manifest.window(i)["report_id"]},
+        on_report=on_report, on_ready=on_ready,
+        poll_strategy=args.poll_strategy, poll_cap_s=args.poll_max_interval,
+        history=poll_history, cached=cached,
+    )
+    # compressed JSONL: each window ends a gzip member / zstd frame, so jsonl_bytes stays a safe truncation point
+    with metrics.stage("fetch"), progress or contextlib.nullcontext(), \
+            open_write(jsonl_path, compress, text=False, append=True) as jf, \
+            (ids_path.open("ab") if dedup else contextlib.nullcontext()) as idf:
+        for j, (w_start, w_end, rid, res) in enumerate(window_results):
+            rid = manifest.window(todo[j])["report_id"] or rid  # a replay that fell back may have a new report
+            print(f"{ICONS['window'] if args.icons else ''} === Window {w_start} → {w_end} ===".rstrip())
+            print(f"  {ICONS['report'] if args.icons else ''} report id: {rid}".rstrip())
+
+            window_total = 0
+            for meta in res["pages"]:
                 print(
                     f"    {ICONS['page'] if args.icons else ''} "
                     f"page {meta['page_no']}: {meta['count']} items"
-                    f"  {ICONS['arrow'] if args.icons else ''}  window_total={window_total}, grand_total={grand_total}"
+                    f"  {ICONS['arrow'] if args.icons else ''}  window_total={window_total}, "
+                    f"grand_total={grand_total + window_total}"
                     .rstrip()
                 )
-                continue
+                window_total += meta["count"]
 
-            # stamp finding with provenance
-            if args.no_stamp:
-                stamped = obj
-            else:
-                stamped = dict(obj)
-                stamped["source_report_id"] = rid
-                stamped["window_start"] = w_start
-                stamped["window_end"] = w_end
+            # append this window's pages to the authoritative JSONL, in window order, then checkpoint
+            written, dups = append_window_pages(res["window_dir"], res["pages"], jf, dedup, idf,
+                                                drop_duplicates=(args.dedup == "drop"))
+            jf.flush()
+            if idf:
+                idf.flush()
+            manifest.window_written(todo[j], jf.tell(), ids_count=dedup.ordinal if dedup else 0,
+                                    written=written, duplicates=dups if dedup else None)
+            window_total = written
+            grand_total += window_total
+            merge_schema(schema, res["schema"])
+            total_elements = merged_page_meta(res["pages"]).get("total_elements")
+            volumes.record(volume_key, w_start, w_end,
+                           total_elements if isinstance(total_elements, int) else res["count"])
 
-            all_items.append(stamped)
-            window_items.append(stamped)
-            window_total += 1
-            grand_total += 1
+            if args.verify:
+                audit = verify_window(rid, res["pages"], res["count"], args.id_field, args.icons,
+                                      duplicate_count=dups if dedup else None,
+                                      duplicates_resolved=(args.dedup != "report"), repair=res.get("repair"))
+                audit["written_count"] = written
+                audit["poll"] = manifest.window(todo[j]).get("poll")
+                audit_dir.mkdir(parents=True, exist_ok=True)
+                (audit_dir / f"audit_{rid}.json").write_text(json.dumps(audit, indent=2), encoding="utf-8")
+                if args.strict and not audit["strict_ok"]:
+                    die(f"--strict: verification failed for report {rid} (see {audit_dir / f'audit_{rid}.json'})",
+                        code=3, exc=VerificationError)
 
-        if args.verify:
-            print(f"    {ICONS['audit'] if args.icons else ''} running verification …".rstrip())
-            seen_indexes = {p["page_no"] for p in pages_seen_meta}
-            meta_sources = [p.get("meta") or {} for p in pages_seen_meta if isinstance(p.get("meta"), dict)]
-            merged_meta: dict[str, Any] = {}
-            for m in meta_sources:
-                for k, v in m.items():
-                    if v is not None:
-                        merged_meta[k] = v
-
-            total_pages = merged_meta.get("total_pages")
-            pages_seen_count = len(seen_indexes)
-            if isinstance(total_pages, int):
-                same = (pages_seen_count == total_pages)
-                status_icon = "✅" if same and args.icons else ("⚠️" if args.icons else "")
-                print(f"      {status_icon} pages: seen={pages_seen_count} reported={total_pages} "
-                      f"=> {'OK' if same else 'MISMATCH'}".rstrip())
-            else:
-                print(f"      {'❔ ' if args.icons else ''}pages: seen={pages_seen_count} reported=? (not provided)".rstrip())
-
-            audit = {
-                "report_id": rid,
-                "page_indexes_seen": sorted(list(seen_indexes)),
-                "pages_seen_count": pages_seen_count,
-                "total_pages_reported": total_pages,
-                "total_elements_reported": merged_meta.get("total_elements"),
-                "collected_count_after_verify": len(window_items),
-                "id_field": args.id_field,
-                "duplicate_id_count": None,
-                "strict_ok": True
-            }
-            audit_dir.mkdir(parents=True, exist_ok=True)
-            (audit_dir / f"audit_{rid}.json").write_text(json.dumps(audit, indent=2), encoding="utf-8")
+            print(f"  {ICONS['done'] if args.icons else ''} window complete: {window_total} items  "
+                  f"{f'duplicates={dups}  ' if dedup else ''}(grand_total={grand_total})".rstrip())
+    shutil.rmtree(spool_dir, ignore_errors=True)
+    if queue:
+        queue.drop_run(run_key)
+
+    if args.id_field:
+        dropped = 0
+        if dedup and args.dedup == "keep-latest":
+            with metrics.stage("dedup"):
+                dropped = keep_latest_rewrite(jsonl_path, ids_path, dedup, compress)
+            grand_total -= dropped
+            manifest.update_run(keep_latest_done=True, keep_latest_dropped=dropped,
+                                jsonl_bytes=jsonl_path.stat().st_size)
+        elif keep_latest_done:
+            dropped = manifest.data.get("keep_latest_dropped", 0)
+            grand_total -= dropped
+        if args.dedup == "drop":
+            dropped = sum(w.get("duplicates") or 0 for w in manifest.data["windows"])
+        per_window = [
+            {"window_start": w["start"], "window_end": w["end"], "report_id": w["report_id"],
+             "duplicate_id_count": w.get("duplicates")}
+            for w in manifest.data["windows"]
+        ]
+        run_audit = {
+            "base": base,
+            "id_field": args.id_field,
+            "dedup_mode": args.dedup,
+            "duplicate_id_count": sum(w["duplicate_id_count"] or 0 for w in per_window),
+            "duplicates_dropped": dropped,
+            "records_written": grand_total,
+            "index_spilled_to_disk": bool(dedup and dedup.db is not None),
+            "windows": per_window,
+        }
+        audit_dir.mkdir(parents=True, exist_ok=True)
+        (audit_dir / f"audit_run_{base}.json").write_text(json.dumps(run_audit, indent=2), encoding="utf-8")
+        print(f"  {ICONS['audit'] if args.icons else ''} duplicates ({args.id_field}): "
+              f"{run_audit['duplicate_id_count']} seen, {dropped} dropped [{args.dedup}]".strip())
+        if dedup:
+            dedup.close()
+    write_schema_sidecar(jsonl_path, schema, grand_total)
 
-        print(f"  {ICONS['done'] if args.icons else ''} window complete: {window_total} items  (grand_total={grand_total})".rstrip())
+    delta_path: Path | None = None
+    run_base = base
+    if store:
+        # upsert the delta, then export the full current state instead of the delta
+        with metrics.stage("sync"):
+            stats = store.upsert_jsonl(jsonl_path, args.id_field, synced_at=manifest.data["started_at"])
+            schema = merge_schema(store.get_state("schema") or {}, schema)
+            store.set_state("schema", schema)
+            delta_path = jsonl_path
+            base = base.replace("report_all_", "snapshot_", 1)
+            jsonl_path = out_dir / f"{base}.jsonl{COMPRESS_SUFFIX.get(compress, '')}"
+            snapshot_total = store.export_jsonl(jsonl_path, compress)
+        write_schema_sidecar(jsonl_path, schema, snapshot_total)
+        print(f"Sync: {stats['inserted']} new, {stats['updated']} updated, {stats['missing_id']} without "
+              f"{args.id_field}; snapshot holds {snapshot_total} findings")
 
     # Write outputs (CSV single file; XLSX single workbook; both skippable)
-    jsonl_path, json_path, csv_path, xlsx_path = write_all_outputs(
-        all_items, out_dir, no_csv=args.no_csv, no_xlsx=args.no_xlsx
-    )
+    with metrics.stage("outputs"):
+        jsonl_path, json_path, csv_path, xlsx_path, parquet_path = write_all_outputs(
+            jsonl_path, out_dir, base, no_csv=args.no_csv, no_xlsx=args.no_xlsx, schema=schema,
+            parquet=args.parquet, compress=compress, workers=args.convert_workers, no_json=args.no_json
+        )
+    if store:
+        store.set_state("high_water_mark", manifest.data["started_at"])
+        store.close()
+    manifest.mark_completed()
+    ids_path.unlink(missing_ok=True)
+
+    report = metrics.report(base=run_base, started_at=manifest.data["started_at"], records=grand_total)
+    report_path = Path(args.metrics_json) if args.metrics_json else out_dir / f"run_report_{run_base}.json"
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.prometheus_textfile:
+        # write-then-rename so the textfile collector never scrapes a half-written file
+        prom_path = Path(args.prometheus_textfile)
+        tmp = prom_path.with_name(prom_path.name + ".tmp")
+        tmp.write_text(metrics.prometheus(report), encoding="utf-8")
+        os.replace(tmp, prom_path)
 
     print("Outputs:")
+    if delta_path:
+        print(f"  DELTA : {delta_path}")
     print(f"  JSONL : {jsonl_path}")
-    print(f"  JSON  : {json_path}")
+    print(f"  JSON  : {json_path if json_path else '(skipped)'}")
     print(f"  CSV   : {csv_path if csv_path else '(skipped)'}")
     print(f"  XLSX  : {xlsx_path if xlsx_path else '(skipped)'}")
+    if parquet_path:
+        print(f"  PARQ  : {parquet_path}")
+    print(f"  REPORT: {report_path}")
+    print(f"  API: {GOVERNOR.summary()}")
+    polls = [w["poll"] for w in manifest.data["windows"] if w.get("poll")]
+    if polls:
+        print(f"  Report generation: {sum(p['polls'] for p in polls)} status call(s), "
+              f"longest wait {max(p['wait_s'] for p in polls):.1f}s")
     print(f"{ICONS['done'] if args.icons else ''} Grand total items: {grand_total}".rstrip())
+    return {"records": grand_total, "jsonl": jsonl_path, "json": json_path, "csv": csv_path, "xlsx": xlsx_path,
+            "parquet": parquet_path, "delta": delta_path, "run_report": report_path}
+
+
+# ----------------------------- Batch jobs (--jobs) -----------------------------
+# One invocation runs many exports. Each job has its own <out>/<name>/ directory (JSONL, outputs, audits,
+# manifest, run report); every job shares the process-wide session, GOVERNOR (rate budget, AIMD concurrency,
+# --max-reports) and the poll/volume histories, and its reports are polled while other jobs page theirs.
+
+# options that are process-wide, so a job cannot set its own
+BATCH_SHARED = {"base_url", "transport", "http_timeout", "json_codec", "max_rps", "max_concurrency", "max_reports",
+                "compress_level", "compress_threads", "poll_history", "volume_history", "progress", "jobs",
+                "job_workers", "worker", "worker_idle"}
+_JOB_NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+def load_jobs(path: Path, parser: argparse.ArgumentParser,
+              base: argparse.Namespace) -> list[tuple[str, argparse.Namespace]]:
+    """
+    Parse a job spec into (name, options) per job. The spec is a list of jobs or {"defaults": {...}, "jobs": [...]};
+    a job is an object of CLI options by long name ("from", "report_type", "no_xlsx": true, ...) applied over the
+    invocation's options and the defaults, plus "name" (output subdirectory; default job_NN). "filters" is either
+    a filters JSON path, as with --filters, or the filters object itself.
+    """
+    try:
+        spec = json.loads(path.read_text(encoding="utf-8"))
+    except Exception as e:
+        die(f"reading --jobs: {e}", exc=ConfigError)
+    if isinstance(spec, list):
+        spec = {"jobs": spec}
+    if not isinstance(spec, dict) or not isinstance(spec.get("jobs"), list) or not spec["jobs"]:
+        die("--jobs must be a non-empty list of jobs or an object with a \"jobs\" list", exc=ConfigError)
+    defaults = spec.get("defaults") or {}
+    actions = {opt: a for a in parser._actions for opt in a.option_strings}
+    jobs: list[tuple[str, argparse.Namespace]] = []
+    for n, job in enumerate(spec["jobs"], 1):
+        if not isinstance(job, dict):
+            die(f"--jobs: job {n} is not an object", exc=ConfigError)
+        opts = {**defaults, **job}
+        name = str(opts.pop("name", f"job_{n:02d}"))
+        if not _JOB_NAME_RE.match(name) or name in {j[0] for j in jobs}:
+            die(f"--jobs: job name {name!r} must be unique and use only letters, digits, '.', '_' and '-'",
+                exc=ConfigError)
+        ns = copy.copy(base)
+        ns.out = str(Path(base.out) / name)
+        ns.cache_dir = str(Path(base.cache_dir) / name) if base.cache_dir else None
+        ns.metrics_json = ns.prometheus_textfile = None
+        ns.progress = "off"
+        tokens: list[str] = []
+        direct: dict[str, Any] = {}
+        for key, val in opts.items():
+            action = actions.get("--" + key.lstrip("-").replace("_", "-"))
+            if action is None or action.dest == "help":
+                die(f"--jobs: job {name}: unknown option {key!r}", exc=ConfigError)
+            if action.dest in BATCH_SHARED:
+                die(f"--jobs: job {name}: {key!r} applies to the whole batch; set it on the command line",
+                    exc=ConfigError)
+            if action.dest == "filters" and isinstance(val, dict):
+                direct["filters"] = val
+            elif action.nargs == 0:  # flags: true sets them, false clears them
+                if not isinstance(val, bool):
+                    die(f"--jobs: job {name}: {key!r} takes true or false", exc=ConfigError)
+                direct[action.dest] = action.const if val else not action.const
+            elif val is not None:
+                tokens += [action.option_strings[-1], str(val)]
+        try:
+            ns = parser.parse_args(tokens, namespace=ns)
+        except SystemExit:  # argparse already printed what was wrong
+            die(f"--jobs: job {name}: invalid options {tokens}", exc=ConfigError)
+        for k, v in direct.items():
+            setattr(ns, k, v)
+        jobs.append((name, ns))
+    return jobs
+
+
+def run_batch(args: argparse.Namespace, parser: argparse.ArgumentParser) -> dict[str, Any]:
+    """
+    --jobs: run every job of the spec as one export (run_export) on --job-workers threads. A failing job does not
+    stop the others; the batch report (<out>/batch_report_<ts>.json or --metrics-json) lists every job's outcome.
+    """
+    check_env()
+    apply_cli_settings(args)
+    jobs = load_jobs(Path(args.jobs), parser, args)
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    poll_history = PollHistory(Path(args.poll_history) if args.poll_history else out_dir / "poll_history.json")
+    volumes = VolumeHistory(Path(args.volume_history) if args.volume_history else out_dir / "window_volumes.json")
+    workers = len(jobs) if args.job_workers <= 0 else min(args.job_workers, len(jobs))
+    print(f"Batch: {len(jobs)} job(s) from {args.jobs}, {workers} at a time")
+
+    def run_job(name: str, ns: argparse.Namespace) -> dict[str, Any]:
+        t0 = time.monotonic()
+        entry: dict[str, Any] = {"name": name, "out": ns.out}
+        try:
+            res = run_export(ns, apply_settings=False, poll_history=poll_history, volumes=volumes)
+            entry.update(status="ok" if res else "nothing to resume",
+                         **{k: str(v) if isinstance(v, Path) else v for k, v in (res or {}).items()})
+        except ReportFetchError as e:
+            entry.update(status="failed", error=str(e), code=e.code, http_status=getattr(e, "status", None))
+            print(f"ERROR: job {name}: {e}", file=sys.stderr)
+        except Exception as e:  # a bug in one job must not lose the others' results
+            entry.update(status="failed", error=f"{type(e).__name__}: {e}", code=1)
+            print(f"ERROR: job {name}: {type(e).__name__}: {e}", file=sys.stderr)
+        entry["seconds"] = round(time.monotonic() - t0, 3)
+        records = f" ({entry['records']} records)" if entry.get("records") is not None else ""
+        print(f"Batch: job {name} {entry['status']} after {entry['seconds']:.1f}s{records}")
+        return entry
+
+    started_at = datetime.now(timezone.utc)
+    t0 = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job") as pool:
+        results = list(pool.map(lambda job: run_job(*job), jobs))
+
+    failed = [r for r in results if r["status"] == "failed"]
+    report = {"started_at": started_at.isoformat(timespec="seconds"), "wall_s": round(time.monotonic() - t0, 3),
+              "job_spec": args.jobs, "jobs": results, "failed": len(failed), "api": dict(GOVERNOR.stats)}
+    ts = started_at.strftime("%Y%m%d_%H%M%S")
+    report_path = Path(args.metrics_json) if args.metrics_json else out_dir / f"batch_report_{ts}.json"
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.prometheus_textfile:
+        prefix = "veracode_report_fetch_batch"
+        lines = [f"# TYPE {prefix}_job_success gauge"]
+        lines += [f'{prefix}_job_success{{job="{r["name"]}"}} {int(r["status"] != "failed")}' for r in results]
+        lines += [f"# TYPE {prefix}_job_records gauge"]
+        lines += [f'{prefix}_job_records{{job="{r["name"]}"}} {r["records"]}'
+                  for r in results if r.get("records") is not None]
+        lines += [f"# TYPE {prefix}_job_duration_seconds gauge"]
+        lines += [f'{prefix}_job_duration_seconds{{job="{r["name"]}"}} {r["seconds"]}' for r in results]
+        lines += [f"# TYPE {prefix}_duration_seconds gauge", f"{prefix}_duration_seconds {report['wall_s']}",
+                  f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+                  f"{prefix}_last_run_timestamp_seconds {int(time.time())}"]
+        prom_path = Path(args.prometheus_textfile)
+        tmp = prom_path.with_name(prom_path.name + ".tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, prom_path)
+
+    print("Batch:")
+    for r in results:
+        detail = r.get("error") or f"{r.get('records', 0)} records -> {r['out']}"
+        print(f"  {r['name']:<24} {r['status']:<17} {r['seconds']:>8.1f}s  {detail}")
+    print(f"  REPORT: {report_path}")
+    print(f"  API: {GOVERNOR.summary()}")
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    """CLI entry point: parse argv, run the export, and turn a ReportFetchError into ERROR: <msg> + its exit code."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        if args.worker:
+            run_worker(args)
+            return 0
+        if args.jobs:
+            report = run_batch(args, parser)
+            return max((j["code"] for j in report["jobs"] if j["status"] == "failed"), default=0)
+        run_export(args)
+    except ReportFetchError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return e.code
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# benchmarks/bench_e2e.py
+# End-to-end benchmark against the bundled mock Reporting API (no tenant or real keys needed).
+# For each data size, every stage runs in its own child process so peak RSS is per stage:
+#   fetch   : VERACODE_REPORT_FETCH.py run (POST, poll, page, spool, JSONL) with all conversions skipped
+#   headers : schema/header discovery pass over the JSONL (ignoring the sidecar)
+#   json    : JSONL -> pretty-printed JSON array
+#   csv     : JSONL -> single CSV
+#   xlsx    : JSONL -> single workbook (skipped when xlsxwriter is missing)
+# Reports seconds, items/sec, API calls (fetch) and peak RSS; --save writes the results as JSON and
+# --compare flags stages slower (items/sec) or bigger (RSS) than a saved baseline by more than --tolerance.
+#
+# Usage: python benchmarks/bench_e2e.py --sizes 10000,50000 --save bench.json
+#        python benchmarks/bench_e2e.py --sizes 10000,50000 --compare bench.json
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+HERE = Path(__file__).resolve().parent
+TOOL = HERE.parent / "VERACODE_REPORT_FETCH.py"
+sys.path.insert(0, str(HERE))
+sys.path.insert(0, str(HERE.parent))
+
+STAGES = ["fetch", "headers", "json", "csv", "xlsx"]
+WINDOWS = 3  # --from/--to below span three 180-day windows, i.e. three reports
+
+
+def run_child(cmd: list[str], env: dict[str, str] | None = None) -> tuple[float, float, str]:
+    """Run cmd to completion; returns (wall seconds, peak RSS in MB of that child, stdout). Unix only (wait4)."""
+    with tempfile.TemporaryFile("w+") as out, tempfile.TemporaryFile("w+") as err:
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdout=out, stderr=err, env=env)
+        _, status, usage = os.wait4(proc.pid, 0)  # reap it ourselves to get this child's own rusage
+        wall = time.perf_counter() - t0
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        out.seek(0)
+        err.seek(0)
+        if proc.returncode:
+            sys.exit(f"benchmark step failed ({proc.returncode}): {' '.join(cmd)}\n{err.read()[-4000:]}")
+        rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        return wall, rss_mb, out.read()
+
+
+def stage_main(stage: str, jsonl: str, out_dir: str) -> None:
+    """Child-process entry point: run one conversion stage and print its record count as JSON."""
+    import VERACODE_REPORT_FETCH as vrf
+
+    jsonl_path, out = Path(jsonl), Path(out_dir)
+    vrf.set_json_codec("auto")
+    if stage == "headers":
+        n = len(vrf.build_headers_from_jsonl(jsonl_path))
+        print(json.dumps({"columns": n}))
+        return
+    headers = vrf.load_headers(jsonl_path)
+    if stage == "json":
+        n = vrf.write_json_array_from_jsonl(jsonl_path, out / "bench.json")
+    elif stage == "csv":
+        n = vrf.convert_jsonl(jsonl_path, headers, csv_path=out / "bench.csv")
+    elif stage == "xlsx":
+        n = vrf.convert_jsonl(jsonl_path, headers, xlsx_path=out / "bench.xlsx")
+    else:
+        raise SystemExit(f"unknown stage {stage}")
+    print(json.dumps({"records": n}))
+
+
+def bench_size(size: int, args: argparse.Namespace, work: Path) -> dict[str, dict[str, Any]]:
+    from mock_reporting_api import MockReportingAPI
+
+    per_report = max(1, size // WINDOWS)
+    api = MockReportingAPI(records=per_report, processing_s=args.processing_s, latency_ms=args.latency_ms,
+                           shape=args.shape, meta="mixed", fault_429=args.fault_429, fault_5xx=args.fault_5xx,
+                           fault_truncate=args.fault_truncate, retry_after=0.2).start()
+    out_dir = work / f"size_{size}"
+    env = dict(os.environ)
+    env.setdefault("VERACODE_API_KEY_ID", "0" * 32)
+    env.setdefault("VERACODE_API_KEY_SECRET", "0" * 128)
+    results: dict[str, dict[str, Any]] = {}
+    try:
+        cmd = [sys.executable, str(TOOL), "--base-url", api.url, "--from", "2024-01-01", "--to", "2024-12-31",
+               "--out", str(out_dir), "--no-json", "--no-csv", "--no-xlsx", "--poll-strategy", "fixed",
+               "--poll-interval", "0.5", "--sleep", "0.2"] + args.tool_args
+        wall, rss, out = run_child(cmd, env)
+        total = re.search(r"Grand total items: (\d+)", out)
+        calls = re.search(r"API: (\d+) request", out)
+        records = int(total.group(1)) if total else per_report * WINDOWS
+        results["fetch"] = {"seconds": wall, "items_per_s": records / wall, "rss_mb": rss, "records": records,
+                            "api_calls": int(calls.group(1)) if calls else None, "server": dict(api.stats)}
+    finally:
+        api.stop()
+
+    jsonl = next(out_dir.glob("report_all_*.jsonl"))
+    for stage in STAGES[1:]:
+        if stage == "xlsx" and not args.xlsx:
+            continue
+        wall, rss, out = run_child([sys.executable, __file__, "--stage", stage, str(jsonl), str(out_dir)])
+        res = json.loads(out.strip().splitlines()[-1])
+        results[stage] = {"seconds": wall, "items_per_s": records / wall, "rss_mb": rss, **res}
+    return results
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Stages whose items/sec dropped, or peak RSS grew, by more than tolerance versus the baseline."""
+    problems = []
+    for size, stages in current["sizes"].items():
+        for stage, cur in stages.items():
+            base = baseline.get("sizes", {}).get(size, {}).get(stage)
+            if not base:
+                continue
+            if cur["items_per_s"] < base["items_per_s"] * (1 - tolerance):
+                problems.append(f"{size} {stage}: items/s {base['items_per_s']:,.0f} -> {cur['items_per_s']:,.0f}")
+            if base.get("rss_mb") and cur["rss_mb"] > base["rss_mb"] * (1 + tolerance):
+                problems.append(f"{size} {stage}: peak RSS {base['rss_mb']:.0f} MB -> {cur['rss_mb']:.0f} MB")
+    return problems
+
+
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "--stage":
+        stage_main(*sys.argv[2:5])
+        return
+
+    ap = argparse.ArgumentParser(description="End-to-end benchmark against the local mock Reporting API")
+    ap.add_argument("--sizes", default="10000,50000", help="Comma-separated total record counts")
+    ap.add_argument("--shape", choices=["flat", "nested", "wide"], default="nested")
+    ap.add_argument("--processing-s", type=float, default=0.5, help="Mock report generation time")
+    ap.add_argument("--latency-ms", type=float, default=5.0, help="Mock per-request latency")
+    ap.add_argument("--fault-429", type=float, default=0.0)
+    ap.add_argument("--fault-5xx", type=float, default=0.0)
+    ap.add_argument("--fault-truncate", type=float, default=0.0)
+    ap.add_argument("--no-xlsx", dest="xlsx", action="store_false", help="Skip the XLSX stage")
+    ap.add_argument("--keep", action="store_true", help="Keep the working directory")
+    ap.add_argument("--save", default=None, help="Write results JSON here")
+    ap.add_argument("--compare", default=None, help="Baseline results JSON to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    ap.add_argument("tool_args", nargs=argparse.REMAINDER,
+                    help="Extra VERACODE_REPORT_FETCH.py flags after --, e.g. -- --size auto --page-workers 4")
+    args = ap.parse_args()
+    args.tool_args = [a for a in args.tool_args if a != "--"]
+    if args.xlsx:
+        try:
+            import xlsxwriter  # noqa: F401  # type: ignore
+        except ImportError:
+            args.xlsx = False
+
+    work = Path(tempfile.mkdtemp(prefix="vrf_bench_"))
+    results: dict[str, Any] = {"python": sys.version.split()[0], "cpus": os.cpu_count(), "shape": args.shape,
+                               "tool_args": args.tool_args, "sizes": {}}
+    print(f"{'size':>8}  {'stage':<8} {'seconds':>8} {'items/s':>12} {'API calls':>9} {'peak RSS':>9}")
+    try:
+        for size in [int(x) for x in args.sizes.split(",") if x.strip()]:
+            stages = bench_size(size, args, work)
+            results["sizes"][str(size)] = stages
+            for stage, r in stages.items():
+                calls = r.get("api_calls")
+                print(f"{size:>8}  {stage:<8} {r['seconds']:>8.2f} {r['items_per_s']:>12,.0f} "
+                      f"{calls if calls is not None else '':>9} {r['rss_mb']:>7.0f}MB")
+    finally:
+        if not args.keep:
+            import shutil
+            shutil.rmtree(work, ignore_errors=True)
+        else:
+            print(f"working directory kept: {work}")
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.compare:
+        problems = compare(results, json.loads(Path(args.compare).read_text(encoding="utf-8")), args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}")
+        if problems:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} versus {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
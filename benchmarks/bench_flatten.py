@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# benchmarks/bench_flatten.py
+# Microbenchmark: JSONL line -> flattened CSV/XLSX/Parquet row, per record.
+#   legacy   : json.loads + flatten_for_row (recursive closure, f-string keys, dict comprehension over headers)
+#   compiled : json.loads + RowFlattener (plans cached per record shape)
+#   orjson   : orjson.loads + RowFlattener with orjson list cells (skipped when orjson is not installed)
+#
+# Usage: python benchmarks/bench_flatten.py [--records 200000] [--repeat 3]
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import VERACODE_REPORT_FETCH as vrf  # noqa: E402
+
+
+def make_lines(n: int, seed: int = 7) -> list[bytes]:
+    """Findings-like records: a few nested objects, lists, mixed scalar types, some optional keys."""
+    rnd = random.Random(seed)
+    lines = []
+    for i in range(n):
+        rec = {
+            "finding_id": f"F-{i}",
+            "app": {"name": f"app{i % 50}", "id": i % 50, "business_unit": {"name": f"bu{i % 7}"}},
+            "severity": rnd.randint(0, 5),
+            "status": rnd.choice(["OPEN", "CLOSED", "REOPENED"]),
+            "cwe": {"id": rnd.randint(1, 900), "name": "Improper Input Validation"},
+            "tags": [rnd.randint(0, 9) for _ in range(rnd.randint(0, 3))],
+            "first_found_date": "2024-01-02 10:00:00.000",
+            "last_updated": "2024-03-04T05:06:07Z",
+            "score": rnd.random() * 10,
+            "ok": rnd.random() < 0.5,
+            "source_report_id": "32a3eef0-9fbc-4c3a-bcdd-7952103a1e9c",
+            "window_start": "2024-01-01",
+            "window_end": "2024-06-28",
+        }
+        if i % 3 == 0:
+            rec["mitigation"] = {"status": "NONE", "comments": ["a", "b"]}
+        lines.append(json.dumps(rec, ensure_ascii=False).encode("utf-8"))
+    return lines
+
+
+def bench(label: str, fn, items: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - t0)
+    print(f"  {label:<9} {len(items) / best:>12,.0f} records/s  ({best:.3f}s)")
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Flattening + JSON decode microbenchmark")
+    ap.add_argument("--records", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    lines = make_lines(args.records)
+    schema: dict[str, str] = {}
+    for line in lines:
+        vrf.collect_schema(json.loads(line), schema)
+    headers = sorted(schema)
+    print(f"{args.records} records, {len(headers)} columns")
+
+    stdlib = vrf.JsonCodec("stdlib")
+    flat = vrf.RowFlattener(headers, dumps=stdlib.dumps)
+    objs = [json.loads(line) for line in lines]
+    print("flatten only (records already decoded):")
+    bench("legacy", lambda obj: vrf.flatten_for_row(obj, headers), objs, args.repeat)
+    bench("compiled", flat.row, objs, args.repeat)
+
+    print("decode + flatten (the CSV/XLSX/Parquet hot loop):")
+    legacy = bench("legacy", lambda line: vrf.flatten_for_row(json.loads(line), headers), lines, args.repeat)
+    compiled = bench("compiled", lambda line: flat.row(stdlib.loads(line)), lines, args.repeat)
+
+    try:
+        fast = vrf.JsonCodec("orjson")
+    except ImportError:
+        print("  orjson    (not installed)")
+        fast = None
+    if fast:
+        flat_fast = vrf.RowFlattener(headers, dumps=fast.dumps)
+        best = bench("orjson", lambda line: flat_fast.row(fast.loads(line)), lines, args.repeat)
+        print(f"speedup vs legacy: compiled {legacy / compiled:.2f}x, compiled+orjson {legacy / best:.2f}x")
+    else:
+        print(f"speedup vs legacy: compiled {legacy / compiled:.2f}x")
+
+    # sanity: the compiled plan yields exactly the legacy cells (stdlib codec)
+    for line in lines[:1000]:
+        a = list(vrf.flatten_for_row(json.loads(line), headers).values())
+        b = flat.row(json.loads(line))
+        assert a == b, (a, b)
+
+
+if __name__ == "__main__":
+    main()
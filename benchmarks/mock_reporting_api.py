@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# benchmarks/mock_reporting_api.py
+# Local stand-in for the Veracode Reporting API (/appsec/v1/analytics/report) for benchmarks and offline runs.
+# - POST creates a report; status goes SUBMITTED -> PROCESSING -> COMPLETED over --processing-s seconds
+# - Paged GETs (?page=&size=) with HAL _links (self/first/last/next) and page metadata in snake_case
+#   (page_metadata.total_elements) or camelCase (page.totalElements), or alternating per report (mixed)
+# - Findings per report fixed (--records) or proportional to the requested date range (--per-day, with an
+#   optional --hot-from/--hot-factor busy period) for window-planning tests
+# - Deterministic records (flat / nested / wide shapes), configurable latency and injected faults
+#   (429 with Retry-After, 5xx, 200 responses with truncated JSON, short pages, HAL next links skipping a page)
+# - GET /__stats returns request/fault counters as JSON
+# HMAC signatures are not checked; any well-formed VERACODE_API_KEY_ID/SECRET pair works.
+#
+# Usage: python benchmarks/mock_reporting_api.py --port 8765 --records 50000
+#        python VERACODE_REPORT_FETCH.py --base-url http://127.0.0.1:8765 --from 2024-01-01 --to 2024-06-01
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+REPORT_PATH = "/appsec/v1/analytics/report"
+SEVERITIES = ["INFORMATIONAL", "VERY_LOW", "LOW", "MEDIUM", "HIGH", "VERY_HIGH"]
+STATUSES = ["OPEN", "CLOSED", "REOPENED", "NEW"]
+
+
+def make_record(shape: str, report_no: int, i: int, start: str, shared_ids: bool = False) -> dict[str, Any]:
+    """Deterministic finding i of report report_no (ids repeat across reports with shared_ids)."""
+    rnd = random.Random(report_no * 1_000_003 + i)
+    rec: dict[str, Any] = {
+        "finding_id": f"F{i}" if shared_ids else f"R{report_no}-F{i}",
+        "severity": rnd.randint(0, 5),
+        "status": rnd.choice(STATUSES),
+        "first_found_date": f"{start} {rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:00.000",
+        "last_updated": f"{start}T{rnd.randint(0, 23):02d}:00:00Z",
+        "score": round(rnd.random() * 10, 3),
+        "resolved": rnd.random() < 0.3,
+    }
+    if shape == "flat":
+        rec.update({"app_name": f"app{i % 97}", "app_id": i % 97, "cwe_id": rnd.randint(1, 900)})
+        return rec
+    rec.update({
+        "app": {"name": f"app{i % 97}", "id": i % 97, "business_unit": {"name": f"bu{i % 11}"}},
+        "cwe": {"id": rnd.randint(1, 900), "name": "Improper Input Validation"},
+        "severity_name": SEVERITIES[rec["severity"]],
+        "tags": [f"t{rnd.randint(0, 20)}" for _ in range(rnd.randint(0, 3))],
+    })
+    if i % 3 == 0:
+        rec["mitigation"] = {"status": "PROPOSED", "comments": ["reviewed", f"ticket {i}"]}
+    if shape == "wide":
+        for k in range(1, 41):
+            rec[f"custom_{k:02d}"] = rnd.choice([None, k, f"value {k}", k * 0.5])
+    return rec
+
+
+class MockReportingAPI:
+    """Threaded HTTP server holding report state; start() serves in the background, stop() shuts it down."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, records: int = 10_000, processing_s: float = 1.0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, per_item_us: float = 0.0,
+                 max_page_size: int = 1000, meta: str = "snake", shape: str = "nested", shared_ids: bool = False,
+                 fault_429: float = 0.0, fault_5xx: float = 0.0, fault_truncate: float = 0.0,
+                 fault_short: float = 0.0, fault_skip: float = 0.0, retry_after: float = 1.0, seed: int = 1,
+                 per_day: float = 0.0, hot_from: str | None = None, hot_factor: float = 1.0):
+        self.records = records
+        self.per_day = per_day
+        self.hot_from = hot_from
+        self.hot_factor = hot_factor
+        self.processing_s = processing_s
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.per_item_us = per_item_us
+        self.max_page_size = max_page_size
+        self.meta = meta
+        self.shape = shape
+        self.shared_ids = shared_ids
+        self.faults = {"429": fault_429, "5xx": fault_5xx, "truncate": fault_truncate, "short": fault_short,
+                       "skip": fault_skip}
+        self.retry_after = retry_after
+        self.rnd = random.Random(seed)
+        self.reports: dict[str, dict[str, Any]] = {}
+        self.stats = {"post": 0, "status": 0, "page": 0, "items": 0, "429": 0, "5xx": 0, "truncate": 0, "short": 0, "skip": 0,
+                      "404": 0}
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockReportingAPI":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mock-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def serve_forever(self) -> None:
+        self.server.serve_forever()
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self.lock:
+            self.stats[key] += n
+
+    def _fault(self) -> str | None:
+        with self.lock:
+            roll = self.rnd.random()
+        for kind in self.faults:
+            if roll < self.faults[kind]:
+                return kind
+            roll -= self.faults[kind]
+        return None
+
+    def _report_size(self, body: dict[str, Any]) -> int:
+        """Findings in a new report: --records, or --per-day times the days in the requested range."""
+        if not self.per_day:
+            return self.records
+        start = date.fromisoformat(str(body.get("last_updated_start_date") or "2024-01-01")[:10])
+        end = date.fromisoformat(str(body.get("last_updated_end_date") or start.isoformat())[:10])
+        hot = date.fromisoformat(self.hot_from) if self.hot_from else None
+        total, d = 0.0, start
+        while d <= end:
+            total += self.per_day * (self.hot_factor if hot and d >= hot else 1.0)
+            d += timedelta(days=1)
+        return int(total)
+
+    def _status(self, report: dict[str, Any]) -> str:
+        elapsed = time.monotonic() - report["created"]
+        if elapsed >= self.processing_s:
+            return "COMPLETED"
+        return "SUBMITTED" if elapsed < self.processing_s / 3 else "PROCESSING"
+
+    def _page(self, base: str, rid: str, report: dict[str, Any], page: int, size: int,
+              fault: str | None = None) -> dict[str, Any]:
+        """One page; fault "short" drops the second half of its items, "skip" points next past the following page."""
+        size = max(1, min(size, self.max_page_size))
+        total = report["records"]
+        total_pages = (total + size - 1) // size
+        lo, hi = page * size, min(total, (page + 1) * size)
+        if fault == "short":
+            hi = lo + (hi - lo) // 2
+        items = [make_record(self.shape, report["no"], i, report["start"], self.shared_ids) for i in range(lo, hi)]
+        self._count("items", len(items))
+        if self.per_item_us:
+            time.sleep(len(items) * self.per_item_us / 1e6)
+
+        def href(p: int) -> dict[str, str]:
+            return {"href": f"{base}{REPORT_PATH}/{rid}?page={p}&size={size}"}
+
+        links = {"self": href(page), "first": href(0), "last": href(max(total_pages - 1, 0))}
+        step = 2 if fault == "skip" else 1
+        if page + step < total_pages:
+            links["next"] = href(page + step)
+        camel = self.meta == "camel" or (self.meta == "mixed" and report["no"] % 2 == 1)
+        doc: dict[str, Any] = {"_embedded": {"findings": items}, "_links": links}
+        if camel:
+            doc["page"] = {"number": page, "size": size, "totalElements": total, "totalPages": total_pages}
+        else:
+            doc["page_metadata"] = {"number": page, "size": size, "total_elements": total,
+                                    "total_pages": total_pages}
+        return doc
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _send(self, code: int, obj: Any, headers: dict[str, str] | None = None, truncate: bool = False):
+                body = json.dumps(obj).encode("utf-8")
+                if truncate:
+                    body = body[: max(1, len(body) // 2)]
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _delay(self) -> None:
+                ms = api.latency_ms + (api.rnd.random() * api.jitter_ms if api.jitter_ms else 0.0)
+                if ms > 0:
+                    time.sleep(ms / 1000)
+
+            def _injected(self) -> bool:
+                """Serve an injected 429/5xx fault; truncation is applied by the caller to a real body."""
+                fault = api._fault()
+                if fault == "429":
+                    api._count("429")
+                    self._send(429, {"message": "Too Many Requests"}, {"Retry-After": f"{api.retry_after:g}"})
+                    return True
+                if fault == "5xx":
+                    api._count("5xx")
+                    self._send(api.rnd.choice([500, 502, 503, 504]), {"message": "injected server error"})
+                    return True
+                self._truncate = fault == "truncate"
+                self._page_fault = fault if fault in ("short", "skip") else None
+                return False
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b"{}"
+                self._delay()
+                if urlparse(self.path).path.rstrip("/") != REPORT_PATH:
+                    return self._send(404, {"message": "not found"})
+                if self._injected():
+                    return
+                try:
+                    body = json.loads(raw or b"{}")
+                except ValueError:
+                    return self._send(400, {"message": "invalid JSON"})
+                rid = str(uuid.uuid4())
+                with api.lock:
+                    no = len(api.reports)
+                    api.reports[rid] = {"no": no, "created": time.monotonic(), "body": body,
+                                        "records": api._report_size(body),
+                                        "start": str(body.get("last_updated_start_date") or "2024-01-01")[:10]}
+                    api.stats["post"] += 1
+                self._send(200, {"_embedded": {"id": rid, "status": "SUBMITTED", "report_type": body.get(
+                    "report_type", "FINDINGS")}}, truncate=self._truncate)
+
+            def do_GET(self) -> None:
+                u = urlparse(self.path)
+                if u.path == "/__stats":
+                    with api.lock:
+                        return self._send(200, dict(api.stats, reports=len(api.reports)))
+                self._delay()
+                if not u.path.startswith(REPORT_PATH + "/"):
+                    return self._send(404, {"message": "not found"})
+                if self._injected():
+                    return
+                rid = u.path.rsplit("/", 1)[-1]
+                report = api.reports.get(rid)
+                if report is None:
+                    api._count("404")
+                    return self._send(404, {"message": f"report {rid} not found"})
+                q = parse_qs(u.query)
+                status = api._status(report)
+                if "page" not in q or status != "COMPLETED":
+                    api._count("status")
+                    return self._send(200, {"_embedded": {"id": rid, "status": status}}, truncate=self._truncate)
+                api._count("page")
+                base = f"http://{self.headers.get('Host') or api.url.split('://', 1)[1]}"
+                doc = api._page(base, rid, report, int(q["page"][0]), int(q.get("size", ["1000"])[0]),
+                                fault=self._page_fault)
+                if self._truncate:
+                    api._count("truncate")
+                if self._page_fault:
+                    api._count(self._page_fault)
+                self._send(200, doc, truncate=self._truncate)
+
+        return Handler
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Local mock of the Veracode Reporting API")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--records", type=int, default=10_000, help="Findings per report")
+    ap.add_argument("--per-day", type=float, default=0.0,
+                    help="Findings per day of the requested range instead of a fixed --records")
+    ap.add_argument("--hot-from", default=None, help="With --per-day, date from which volume is multiplied")
+    ap.add_argument("--hot-factor", type=float, default=1.0, help="Volume multiplier from --hot-from on")
+    ap.add_argument("--processing-s", type=float, default=1.0, help="Seconds from POST until COMPLETED")
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per request")
+    ap.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra latency per request (0..N ms)")
+    ap.add_argument("--per-item-us", type=float, default=0.0, help="Extra page latency per returned item")
+    ap.add_argument("--max-page-size", type=int, default=1000, help="Server-side cap on ?size=")
+    ap.add_argument("--meta", choices=["snake", "camel", "mixed"], default="snake",
+                    help="Page metadata style: page_metadata.total_elements, page.totalElements, or alternating")
+    ap.add_argument("--shape", choices=["flat", "nested", "wide"], default="nested", help="Record shape")
+    ap.add_argument("--shared-ids", action="store_true", help="Reuse finding_id values across reports")
+    ap.add_argument("--fault-429", type=float, default=0.0, help="Probability of a 429 (with Retry-After)")
+    ap.add_argument("--fault-5xx", type=float, default=0.0, help="Probability of a 500/502/503/504")
+    ap.add_argument("--fault-truncate", type=float, default=0.0, help="Probability of a 200 with truncated JSON")
+    ap.add_argument("--fault-short", type=float, default=0.0, help="Probability of a page missing half its items")
+    ap.add_argument("--fault-skip", type=float, default=0.0, help="Probability of a next link that skips a page")
+    ap.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    api = MockReportingAPI(
+        args.host, args.port, records=args.records, processing_s=args.processing_s, latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms, per_item_us=args.per_item_us, max_page_size=args.max_page_size, meta=args.meta,
+        shape=args.shape, shared_ids=args.shared_ids, fault_429=args.fault_429, fault_5xx=args.fault_5xx,
+        fault_truncate=args.fault_truncate, fault_short=args.fault_short, fault_skip=args.fault_skip,
+        retry_after=args.retry_after, seed=args.seed, per_day=args.per_day, hot_from=args.hot_from,
+        hot_factor=args.hot_factor,
+    )
+    print(f"Mock Reporting API on {api.url}{REPORT_PATH} ({args.records} findings/report)", flush=True)
+    try:
+        api.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
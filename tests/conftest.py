@@ -0,0 +1,71 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "benchmarks")]
+
+import VERACODE_REPORT_FETCH as vrf  # noqa: E402
+from mock_reporting_api import MockReportingAPI  # noqa: E402
+
+# fast report generation/polling for exports against the mock
+FAST = ["--sleep", "0", "--poll-strategy", "fixed", "--poll-interval", "0.05", "--no-xlsx"]
+
+
+@pytest.fixture(autouse=True)
+def api_keys(monkeypatch):
+    """Any well-formed key pair signs requests to the mock."""
+    monkeypatch.setenv("VERACODE_API_KEY_ID", "0" * 32)
+    monkeypatch.setenv("VERACODE_API_KEY_SECRET", "0" * 128)
+
+
+@pytest.fixture(autouse=True)
+def reset_settings():
+    """Undo process-wide settings a test (or an export it ran) changed."""
+    yield
+    vrf.configure(base_url="https://api.veracode.com", transport="native", json_codec="stdlib")
+    vrf._AUTO_SIZE_HINT = 250
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    """Retry backoff in milliseconds instead of seconds."""
+    monkeypatch.setattr(vrf, "backoff_delay", lambda attempt, cap=60.0, jitter=0.75: 0.01)
+
+
+@pytest.fixture
+def mock_api():
+    """start(**MockReportingAPI options) -> a running mock the API URLs point at; stopped after the test."""
+    servers = []
+
+    def start(**kw):
+        kw.setdefault("records", 500)
+        kw.setdefault("processing_s", 0.05)
+        api = MockReportingAPI(**kw).start()
+        servers.append(api)
+        vrf.set_base_url(api.url)
+        return api
+
+    yield start
+    for api in servers:
+        api.stop()
+
+
+@pytest.fixture
+def export(tmp_path):
+    """export(api, *argv) runs the CLI export in-process over --from 2024-01-01 --to 2024-03-01 (one window)."""
+
+    def run(api, *argv, out=None):
+        args = vrf.build_parser().parse_args(
+            ["--base-url", api.url, "--from", "2024-01-01", "--to", "2024-03-01", "--out", str(out or tmp_path / "out"),
+             *FAST, *argv])
+        return vrf.run_export(args)
+
+    return run
+
+
+def read_jsonl(path) -> list[dict]:
+    with vrf.open_read(Path(path)) as f:
+        return [json.loads(line) for line in f]
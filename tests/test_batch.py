@@ -0,0 +1,62 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+from conftest import FAST, read_jsonl
+
+
+def _spec(tmp_path, spec) -> str:
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    return str(path)
+
+
+def _batch(api, tmp_path, spec, *argv):
+    return vrf.main(["--base-url", api.url, "--out", str(tmp_path / "out"), "--jobs", _spec(tmp_path, spec),
+                     "--size", "100", *FAST, *argv])
+
+
+def test_batch_runs_every_job_into_its_own_directory(mock_api, tmp_path):
+    api = mock_api(records=150)
+    spec = {"defaults": {"from": "2024-01-01", "to": "2024-03-01", "no_csv": True},
+            "jobs": [{"name": "high", "filters": {"severity": [4, 5]}},
+                     {"to": "2024-12-31", "size": 50}]}
+    assert _batch(api, tmp_path, spec, "--job-workers", "2") == 0
+    report = json.loads(next((tmp_path / "out").glob("batch_report_*.json")).read_text(encoding="utf-8"))
+    jobs = {j["name"]: j for j in report["jobs"]}
+    assert set(jobs) == {"high", "job_02"} and report["failed"] == 0
+    assert jobs["high"]["records"] == 150 and jobs["job_02"]["records"] == 3 * 150  # three windows
+    assert len(read_jsonl(jobs["job_02"]["jsonl"])) == 450
+    assert jobs["high"]["csv"] is None and (tmp_path / "out" / "high").is_dir()
+    assert api.stats["post"] == 4
+
+
+def test_failing_job_does_not_stop_the_others(mock_api, tmp_path):
+    api = mock_api(records=40)
+    spec = [{"name": "bad", "from": "2024-02-30", "to": "2024-03-01"},
+            {"name": "good", "from": "2024-01-01", "to": "2024-03-01"}]
+    prom = tmp_path / "batch.prom"
+    assert _batch(api, tmp_path, spec, "--metrics-json", str(tmp_path / "batch.json"),
+                  "--prometheus-textfile", str(prom)) == 2
+    report = json.loads((tmp_path / "batch.json").read_text(encoding="utf-8"))
+    jobs = {j["name"]: j for j in report["jobs"]}
+    assert jobs["bad"]["status"] == "failed" and "YYYY-MM-DD" in jobs["bad"]["error"]
+    assert jobs["good"]["status"] == "ok" and jobs["good"]["records"] == 40
+    text = prom.read_text(encoding="utf-8")
+    assert 'job_success{job="bad"} 0' in text and 'job_success{job="good"} 1' in text
+
+
+@pytest.mark.parametrize("spec, message", [
+    ([], "non-empty"),
+    ([{"bogus": 1}], "unknown option"),
+    ([{"max_rps": 5}], "whole batch"),
+    ([{"name": "a"}, {"name": "a"}], "unique"),
+    ([{"no_csv": "yes"}], "true or false"),
+])
+def test_invalid_job_specs_are_config_errors(tmp_path, spec, message):
+    parser = vrf.build_parser()
+    base = parser.parse_args(["--out", str(tmp_path)])
+    with pytest.raises(vrf.ConfigError, match=message):
+        vrf.load_jobs(Path(_spec(tmp_path, spec)), parser, base)
@@ -0,0 +1,71 @@
+import shutil
+
+import VERACODE_REPORT_FETCH as vrf
+from conftest import read_jsonl
+
+TWO_WINDOWS = ["--from", "2024-01-01", "--to", "2024-08-01", "--size", "40"]
+
+
+def _cached_export(export, api, tmp_path, name):
+    return export(api, *TWO_WINDOWS, "--cache-dir", str(tmp_path / "cache"), out=tmp_path / name)
+
+
+def test_rerun_replays_historical_windows(mock_api, export, tmp_path):
+    api = mock_api(records=100)
+    first = read_jsonl(_cached_export(export, api, tmp_path, "a")["jsonl"])
+    posts, pages = api.stats["post"], api.stats["page"]
+    second = read_jsonl(_cached_export(export, api, tmp_path, "b")["jsonl"])
+    assert api.stats["post"] - posts == 1  # only the newest window is generated again
+    assert api.stats["page"] - pages == 3
+    assert second[:100] == first[:100]
+    assert len(second) == 200
+
+
+def test_replay_falls_back_to_the_api_when_the_entry_was_evicted(mock_api, export, tmp_path, monkeypatch):
+    api = mock_api(records=100)
+    first = read_jsonl(_cached_export(export, api, tmp_path, "a")["jsonl"])
+    real_complete = vrf.ReportCache.complete
+
+    def complete_then_evicted(self, key):
+        entry = real_complete(self, key)
+        shutil.rmtree(self.root / key)  # e.g. another run's eviction right after planning
+        return entry
+
+    monkeypatch.setattr(vrf.ReportCache, "complete", complete_then_evicted)
+    second = read_jsonl(_cached_export(export, api, tmp_path, "b")["jsonl"])
+    assert second[:100] == first[:100] and len(second) == 200
+    assert api.stats["post"] == 3  # the cached report id was still valid
+
+
+def test_replay_of_an_evicted_entry_reposts_an_expired_report(mock_api, export, tmp_path, monkeypatch):
+    api = mock_api(records=60)
+    _cached_export(export, api, tmp_path, "a")
+    real_complete = vrf.ReportCache.complete
+
+    def complete_then_evicted(self, key):
+        entry = real_complete(self, key)
+        shutil.rmtree(self.root / key)
+        api.reports.pop(entry["report_id"], None) if entry else None
+        return entry
+
+    monkeypatch.setattr(vrf.ReportCache, "complete", complete_then_evicted)
+    res = _cached_export(export, api, tmp_path, "b")
+    rows = read_jsonl(res["jsonl"])
+    assert len(rows) == 120
+    assert api.stats["post"] == 4 and api.stats["404"] == 1
+    assert len({r["source_report_id"] for r in rows}) == 2
+
+
+def test_replay_returns_none_for_missing_entries(tmp_path):
+    cache = vrf.ReportCache(tmp_path, ttl_s=60, max_bytes=1 << 20)
+    key = vrf.ReportCache.key("FINDINGS", "2024-01-01", "2024-01-31", {})
+    assert cache.replay(key) is None
+    cache.put_report(key, "r1")
+    assert cache.replay(key) is None  # report id only, no pages
+    tee = cache.writer(key, "r1")
+    tee.start_page({"page_no": 0, "count": 1, "meta": {}})
+    tee.item({"a": 1})
+    tee.commit(1)
+    assert list(cache.replay(key)) == [{"__PAGE_META__": {"page_no": 0, "count": 1, "meta": {}}}, {"a": 1}]
+    (tmp_path / key / "page_000000.jsonl.gz").unlink()
+    assert cache.replay(key) is None
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+
+
+def test_default_codec_writes_stdlib_bytes(mock_api, export):
+    assert vrf.build_parser().parse_args([]).json_codec == "stdlib"
+    api = mock_api(records=20)
+    res = export(api)
+    with vrf.open_read(res["jsonl"]) as f:
+        for line in f:
+            assert line.rstrip("\n") == json.dumps(json.loads(line), ensure_ascii=False)
+
+
+def test_stdlib_codec_round_trips():
+    codec = vrf.JsonCodec("stdlib")
+    doc = {"a": 1, "é": [1.5, None, True], "n": 2 ** 70}
+    assert codec.dumps(doc) == json.dumps(doc, ensure_ascii=False)
+    assert codec.loads(codec.dumps(doc)) == doc
+    assert codec.dumps_pretty(doc) == json.dumps(doc, ensure_ascii=False, indent=2)
+
+
+def test_orjson_codec_is_opt_in_and_falls_back_to_stdlib():
+    pytest.importorskip("orjson")
+    assert vrf.set_json_codec("orjson") == "orjson"
+    assert vrf.CODEC.dumps({"a": 1}) == '{"a":1}'
+    assert vrf.CODEC.dumps({"n": 2 ** 70}) == '{"n": 1180591620717411303424}'  # beyond 64 bits: stdlib
+    assert vrf.CODEC.loads('{"x": [1, 2]}') == {"x": [1, 2]}
+    assert vrf.set_json_codec("stdlib") == "stdlib"
+    assert vrf.CODEC.dumps({"a": 1}) == '{"a": 1}'
+
+
+def test_orjson_missing(monkeypatch):
+    import builtins
+    real_import = builtins.__import__
+
+    def no_orjson(name, *a, **k):
+        if name == "orjson":
+            raise ImportError("No module named 'orjson'")
+        return real_import(name, *a, **k)
+
+    monkeypatch.setattr(builtins, "__import__", no_orjson)
+    assert vrf.set_json_codec("auto") == "stdlib"
+    with pytest.raises(vrf.ConfigError, match="orjson"):
+        vrf.set_json_codec("orjson")
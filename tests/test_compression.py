@@ -0,0 +1,54 @@
+import csv
+import importlib.util
+import io
+import json
+
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+from conftest import read_jsonl
+
+CODECS = ["gzip", pytest.param("zstd", marks=pytest.mark.skipif(
+    not importlib.util.find_spec("zstandard"), reason="zstandard is not installed"))]
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_writer_output_is_a_plain_multi_member_file(tmp_path, monkeypatch, codec):
+    monkeypatch.setattr(vrf, "COMPRESS_CHUNK", 1000)  # many members / frames
+    path = tmp_path / f"t{vrf.COMPRESS_SUFFIX[codec]}"
+    lines = [f"line {i} " + "x" * (i % 50) for i in range(2000)]
+    with vrf.open_write(path, codec) as f:
+        for line in lines:
+            f.write(line + "\n")
+    assert vrf.sniff_codec(path) == codec
+    with vrf.open_read(path) as f:
+        assert f.read().splitlines() == lines
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_appended_members_read_as_one_stream(tmp_path, codec):
+    path = tmp_path / "t.bin"
+    path.write_bytes(vrf.compress_bytes(b"a\n", codec) + vrf.compress_bytes(b"b\n", codec))
+    with vrf.open_read(path) as f:
+        assert f.read() == "a\nb\n"
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_compressed_export(mock_api, export, codec):
+    api = mock_api(records=150)
+    res = export(api, "--compress", codec, "--size", "40")
+    suffix = vrf.COMPRESS_SUFFIX[codec]
+    assert str(res["jsonl"]).endswith(".jsonl" + suffix)
+    rows = read_jsonl(res["jsonl"])
+    assert len(rows) == 150
+    with vrf.open_read(res["json"]) as f:
+        assert json.load(f) == rows
+    with vrf.open_read(res["csv"]) as f:
+        assert len(list(csv.DictReader(io.StringIO(f.read())))) == 150
+
+
+def test_plain_files_are_not_sniffed_as_compressed(tmp_path):
+    path = tmp_path / "t.jsonl"
+    path.write_text("{}\n", encoding="utf-8")
+    assert vrf.sniff_codec(path) is None
+    assert vrf.compress_bytes(b"x", None) == b"x"
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+from conftest import read_jsonl
+
+TWO_WINDOWS = ["--from", "2024-01-01", "--to", "2024-08-01", "--id-field", "finding_id", "--size", "20"]
+
+
+@pytest.mark.parametrize("mode,rows,window", [("report", 60, None), ("drop", 30, "2024-01-01"),
+                                              ("keep-latest", 30, "2024-06-29")])
+def test_dedup_modes(mock_api, export, tmp_path, mode, rows, window):
+    api = mock_api(records=30, shared_ids=True)
+    res = export(api, *TWO_WINDOWS, "--dedup", mode)
+    out = read_jsonl(res["jsonl"])
+    assert len(out) == res["records"] == rows
+    if window:
+        assert {r["window_start"] for r in out} == {window}
+    audit = json.loads(next((tmp_path / "out" / "audit").glob("audit_run_*.json")).read_text(encoding="utf-8"))
+    assert audit["duplicate_id_count"] == 30
+    assert audit["duplicates_dropped"] == (0 if mode == "report" else 30)
+
+
+def test_dedup_index_spills_to_disk(tmp_path):
+    idx = vrf.DedupIndex(tmp_path / "ids.sqlite", max_memory_ids=3)
+    results = []
+    for v in ["a", "b", "c", "d", "a", "e", "d"]:
+        results.append(idx.add(vrf.id_digest(v)))
+        idx.advance()
+    assert idx.db is not None
+    assert results == [True, True, True, True, False, True, False]
+    assert idx.latest(vrf.id_digest("a")) == 4
+    assert idx.total_duplicates == 2
+    idx.close()
+    assert not (tmp_path / "ids.sqlite").exists()
+
+
+def test_id_digest_treats_empty_as_no_id():
+    assert vrf.id_digest(None) == vrf.id_digest("") == 0
+    assert vrf.id_digest("F1") == vrf.id_digest("F1") != vrf.id_digest("F2")
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import VERACODE_REPORT_FETCH as vrf
+
+
+def test_aimd_limit_grows_on_success_and_halves_on_throttling():
+    gov = vrf.RateGovernor(max_concurrency=8, initial_concurrency=4)
+    for _ in range(4):
+        gov.acquire()
+        gov.release("ok")
+    assert 4.9 < gov.limit < 5.0
+    gov.acquire()
+    gov.release("throttled")
+    assert gov.limit < 2.5
+    gov.acquire()
+    gov.release("error")  # within the cooldown: no second halving
+    assert gov.limit > 2.4
+    assert gov.stats["throttled"] == 1 and gov.stats["errors"] == 1
+
+
+def test_rate_limit_spaces_requests():
+    gov = vrf.RateGovernor(rate=20.0, max_concurrency=4)
+    t0 = time.monotonic()
+    for _ in range(21):  # burst of 20, then one token every 50 ms
+        gov.acquire()
+        gov.release("ok")
+    assert 0.03 < time.monotonic() - t0 < 1.0
+
+
+def test_pause_holds_every_caller():
+    gov = vrf.RateGovernor()
+    gov.pause(0.2)
+    t0 = time.monotonic()
+    threads = [threading.Thread(target=lambda: (gov.acquire(), gov.release("ok"))) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.monotonic() - t0 >= 0.19
+    assert gov.stats["paused_s"] >= 0.19
+
+
+def test_report_slots():
+    gov = vrf.RateGovernor()
+    gov.configure(None, 4, max_reports=1)
+    assert gov.take_report_slot()
+    assert not gov.take_report_slot()
+    gov.give_report_slot()
+    assert gov.take_report_slot()
+
+
+def test_429_retry_after_pauses_all_workers(mock_api, monkeypatch):
+    api = mock_api(fault_429=0.5, retry_after=3, seed=2)
+    pauses, metrics = [], vrf.Metrics()
+    monkeypatch.setattr(vrf.GOVERNOR, "pause", pauses.append)
+    monkeypatch.setattr(vrf._JOB, "metrics", metrics, raising=False)
+    for _ in range(6):
+        vrf.call_api("POST", vrf.POST_URL, {"report_type": "FINDINGS"})
+    assert api.stats["post"] == 6
+    assert api.stats["429"] > 0
+    assert pauses == [3.0] * api.stats["429"]
+    assert metrics.retries["429"] == api.stats["429"]
+
+
+def test_parse_retry_after():
+    assert vrf.parse_retry_after("7") == 7.0
+    assert vrf.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert vrf.parse_retry_after("soon") is None
+    assert vrf.parse_retry_after(None) is None
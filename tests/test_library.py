@@ -0,0 +1,59 @@
+import asyncio
+import csv
+
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+from conftest import read_jsonl
+
+
+def test_iter_findings_stamps_every_finding(mock_api):
+    api = mock_api(records=120, processing_s=0)
+    rows = list(vrf.iter_findings("2024-01-01", "2024-03-01", size=50, poll_strategy="fixed", poll_interval=0.05))
+    assert len(rows) == 120
+    assert {r["source_report_id"] for r in rows} == set(api.reports)
+    assert rows[0]["window_start"] == "2024-01-01" and rows[0]["window_end"] == "2024-03-01"
+    raw = list(vrf.iter_findings("2024-01-01", "2024-03-01", size=50, stamp=False, poll_strategy="fixed",
+                                 poll_interval=0.05))
+    assert "source_report_id" not in raw[0]
+
+
+def test_export_findings_feeds_and_closes_every_sink(mock_api, tmp_path):
+    mock_api(records=80, processing_s=0)
+    seen, closed = [], []
+    sinks = [vrf.JsonlSink(tmp_path / "f.jsonl"), vrf.CsvSink(tmp_path / "f.csv", headers=["finding_id"]),
+             vrf.CallbackSink(seen.append, on_close=lambda: closed.append(True))]
+    n = vrf.export_findings("2024-01-01", "2024-03-01", sinks, size=30, poll_strategy="fixed", poll_interval=0.05)
+    assert n == len(seen) == len(read_jsonl(tmp_path / "f.jsonl")) == 80
+    with open(tmp_path / "f.csv", newline="", encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == 80
+    assert closed == [True]
+
+
+def test_aexport_findings_awaits_async_sinks(mock_api):
+    mock_api(records=60, processing_s=0)
+    seen = []
+
+    async def write(obj):
+        seen.append(obj)
+
+    n = asyncio.run(vrf.aexport_findings("2024-01-01", "2024-03-01", [vrf.CallbackSink(write)], batch=25, size=20,
+                                         poll_strategy="fixed", poll_interval=0.05))
+    assert n == len(seen) == 60
+
+
+@pytest.mark.parametrize("date_from, date_to", [("2024-13-01", "2024-03-01"), ("2024-01-01", "yesterday"),
+                                                ("2024/01/01", "2024-03-01"), (None, "2024-03-01")])
+def test_malformed_dates_raise_config_error(mock_api, export, tmp_path, date_from, date_to):
+    api = mock_api()
+    with pytest.raises(vrf.ConfigError):
+        vrf.iter_findings(date_from, date_to)
+    sink = vrf.CallbackSink(lambda obj: None)
+    with pytest.raises(vrf.ConfigError):
+        vrf.export_findings(date_from, date_to, [sink])
+    with pytest.raises(vrf.ConfigError):
+        asyncio.run(vrf.aexport_findings(date_from, date_to, [sink]))
+    if date_from:
+        with pytest.raises(vrf.ConfigError, match="YYYY-MM-DD"):
+            export(api, "--from", date_from, "--to", date_to)
+    assert api.stats["post"] == 0
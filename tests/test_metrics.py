@@ -0,0 +1,38 @@
+import json
+
+import VERACODE_REPORT_FETCH as vrf
+
+
+def test_run_report_and_prometheus_textfile(mock_api, export, tmp_path):
+    api = mock_api(records=300)
+    prom = tmp_path / "vrf.prom"
+    res = export(api, "--size", "auto", "--prometheus-textfile", str(prom))
+    report = json.loads(res["run_report"].read_text(encoding="utf-8"))
+    calls = report["api"]["calls"]
+    assert calls["post"]["attempts"] == 1
+    assert calls["status"]["attempts"] >= 1
+    assert calls["page"]["attempts"] == api.stats["page"] > 1
+    assert calls["page"]["failed_attempts"] == 0 and calls["page"]["bytes"] > 0
+    assert report["items_paged"] == report["records"] == 300
+    assert report["report_generation"]["reports"] == 1
+    assert {"fetch", "outputs"} <= set(report["stages"])
+    text = prom.read_text(encoding="utf-8")
+    assert f'veracode_report_fetch_api_request_duration_seconds_count{{call="page"}} {api.stats["page"]}' in text
+    assert "veracode_report_fetch_records 300" in text
+
+
+def test_retries_are_counted_by_reason(mock_api, export, fast_retries):
+    api = mock_api(records=200, fault_5xx=0.2, seed=4)
+    res = export(api, "--size", "auto")
+    report = json.loads(res["run_report"].read_text(encoding="utf-8"))
+    assert report["api"]["retries"].get("5xx", 0) == api.stats["5xx"] > 0
+    failed = sum(c["failed_attempts"] for c in report["api"]["calls"].values())
+    assert failed == api.stats["5xx"]
+
+
+def test_progress_estimates_remaining_time():
+    m = vrf.Metrics()
+    m.windows = 2
+    m.add_items("r1", 100, total_elements=400)
+    p = m.progress()
+    assert p["expected"] == 800 and p["reports_sized"] == 1 and p["items"] == 100
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+import requests
+
+from mock_reporting_api import REPORT_PATH, make_record
+
+
+def _post(api, **body):
+    r = requests.post(api.url + REPORT_PATH, json={"report_type": "FINDINGS", **body}, timeout=5)
+    r.raise_for_status()
+    return r.json()["_embedded"]["id"]
+
+
+def _get(api, rid, **params):
+    return requests.get(f"{api.url}{REPORT_PATH}/{rid}", params=params, timeout=5)
+
+
+def test_report_lifecycle_and_paging(mock_api):
+    api = mock_api(records=25, processing_s=0.2, meta="camel")
+    rid = _post(api)
+    assert _get(api, rid).json()["_embedded"]["status"] in ("SUBMITTED", "PROCESSING")
+    time.sleep(0.25)
+    assert _get(api, rid).json()["_embedded"]["status"] == "COMPLETED"
+    page = _get(api, rid, page=2, size=10).json()
+    assert page["page"] == {"number": 2, "size": 10, "totalElements": 25, "totalPages": 3}
+    assert len(page["_embedded"]["findings"]) == 5
+    assert "next" not in page["_links"]
+    assert _get(api, "missing").status_code == 404
+
+
+def test_page_size_cap_and_snake_meta(mock_api):
+    api = mock_api(records=25, max_page_size=10, processing_s=0)
+    rid = _post(api)
+    page = _get(api, rid, page=1, size=20).json()
+    assert page["page_metadata"]["size"] == 10
+    assert [f["finding_id"] for f in page["_embedded"]["findings"]] == [f"R0-F{i}" for i in range(10, 20)]
+    assert page["_links"]["next"]["href"].endswith("page=2&size=10")
+
+
+def test_injected_faults_are_counted(mock_api):
+    api = mock_api(fault_429=0.5, retry_after=2, seed=1)
+    codes = [requests.post(api.url + REPORT_PATH, json={}, timeout=5) for _ in range(20)]
+    throttled = [r for r in codes if r.status_code == 429]
+    assert throttled and all(r.headers["Retry-After"] == "2" for r in throttled)
+    stats = requests.get(api.url + "/__stats", timeout=5).json()
+    assert stats["429"] == len(throttled) and stats["post"] == 20 - len(throttled)
+
+
+def test_truncated_and_short_pages(mock_api):
+    api = mock_api(records=40, processing_s=0, fault_truncate=1.0)
+    api.faults["truncate"] = 0.0
+    rid = _post(api)
+    api.faults["truncate"] = 1.0
+    r = _get(api, rid, page=0, size=20)
+    assert r.status_code == 200 and api.stats["truncate"] == 1
+    with pytest.raises(ValueError):
+        r.json()
+    api.faults.update(truncate=0.0, short=1.0)
+    assert len(_get(api, rid, page=0, size=20).json()["_embedded"]["findings"]) == 10
+
+
+def test_per_day_sizes_reports_by_date_range(mock_api):
+    api = mock_api(per_day=10, hot_from="2024-01-06", hot_factor=3)
+    rid = _post(api, last_updated_start_date="2024-01-01", last_updated_end_date="2024-01-10")
+    assert api.reports[rid]["records"] == 5 * 10 + 5 * 30
+
+
+def test_records_are_deterministic():
+    assert make_record("nested", 1, 5, "2024-01-01") == make_record("nested", 1, 5, "2024-01-01")
+    assert make_record("flat", 0, 3, "2024-01-01", shared_ids=True)["finding_id"] == "F3"
+    assert len(make_record("wide", 0, 1, "2024-01-01")) > 40
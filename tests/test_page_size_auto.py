@@ -0,0 +1,73 @@
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+from conftest import read_jsonl
+
+
+def _ready_report():
+    rid = vrf.post_report("FINDINGS", "2024-01-01", "2024-03-01", {})
+    vrf.poll_ready(rid, 10, 0.05, icons=False)
+    return rid
+
+
+def _ids(rows):
+    return [int(r["finding_id"].split("-F")[1]) for r in rows if "__PAGE_META__" not in r]
+
+
+def test_tuner_climbs_while_throughput_improves():
+    t = vrf.PageSizeTuner(125)
+    t.observe(125, 125, 1.0, 125_000, False)
+    assert t.size == 250
+    t.observe(250, 250, 1.0, 250_000, False)
+    assert t.size == 500
+    t.observe(500, 500, 1.9, 500_000, False)  # < 10% better than 250: step back and stay
+    assert t.size == 250 and t.settled
+
+
+def test_tuner_steps_down_after_a_degraded_page():
+    t = vrf.PageSizeTuner(500)
+    t.observe(500, 500, 1.0, 1000, True)
+    assert t.size == 250 and t.max_idx == 1 and t.settled
+
+
+def test_capped_tuner_never_asks_above_the_cap():
+    t = vrf.PageSizeTuner(1000)
+    t.capped(300)
+    assert t.size == 300 and t.settled
+    assert t.size_for(0) == 300
+    assert t.size_for(600) == 300
+    assert t.size_for(750) == 250
+    assert t.size_for(50) == 50  # no ladder size or the cap divides it: still page-aligned
+    t.observe(300, 300, 0.1, 300, False)
+    assert t.size == 300
+
+
+@pytest.mark.parametrize("page_workers", [1, 4])
+@pytest.mark.parametrize("max_page_size", [300, 120, 1000])
+def test_auto_size_follows_a_server_cap(mock_api, page_workers, max_page_size):
+    mock_api(records=3000, max_page_size=max_page_size)
+    rid = _ready_report()
+    rows = list(vrf.stream_report_items(rid, "auto", page_workers=page_workers))
+    assert _ids(rows) == list(range(3000))
+    markers = [r["__PAGE_META__"] for r in rows if "__PAGE_META__" in r]
+    offset = 0
+    for m in markers:
+        assert m["offset"] == offset and m["count"] <= m["size"]
+        offset += m["count"]
+
+
+def test_auto_size_goes_on_from_the_end_of_a_short_page(mock_api):
+    api = mock_api(records=2000, fault_short=0.3, seed=3)
+    rid = _ready_report()
+    ids = _ids(vrf.stream_report_items(rid, "auto", page_workers=3))
+    assert api.stats["short"] > 1
+    assert ids == list(range(len(ids)))  # items a short page left out are asked for next, never skipped
+    assert len(ids) >= 1000
+
+
+def test_export_with_auto_size_and_capped_server(mock_api, export):
+    api = mock_api(records=3000, max_page_size=300)
+    res = export(api, "--size", "auto", "--id-field", "finding_id", "--verify", "--strict")
+    rows = read_jsonl(res["jsonl"])
+    assert len(rows) == 3000
+    assert len({r["finding_id"] for r in rows}) == 3000
@@ -0,0 +1,32 @@
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+
+
+def _ready_report():
+    rid = vrf.post_report("FINDINGS", "2024-01-01", "2024-03-01", {})
+    vrf.poll_ready(rid, 10, 0.05, icons=False)
+    return rid
+
+
+def _ids(rows):
+    return [int(r["finding_id"].split("-F")[1]) for r in rows if "__PAGE_META__" not in r]
+
+
+@pytest.mark.parametrize("meta", ["snake", "camel"])
+def test_concurrent_pages_arrive_in_order(mock_api, meta):
+    mock_api(records=1050, meta=meta, latency_ms=5, jitter_ms=10)
+    rid = _ready_report()
+    rows = list(vrf.stream_report_items(rid, 100, page_workers=4))
+    markers = [r["__PAGE_META__"] for r in rows if "__PAGE_META__" in r]
+    assert [m["page_no"] for m in markers] == list(range(11))
+    assert sum(m["count"] for m in markers) == 1050
+    assert _ids(rows) == list(range(1050))
+
+
+def test_single_page_report_needs_no_workers(mock_api):
+    api = mock_api(records=30)
+    rid = _ready_report()
+    rows = list(vrf.stream_report_items(rid, 100, page_workers=4))
+    assert _ids(rows) == list(range(30))
+    assert api.stats["page"] == 1
@@ -0,0 +1,43 @@
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_export_writes_typed_parquet(mock_api, export):
+    api = mock_api(records=120)
+    res = export(api, "--parquet", "--no-csv", "--no-json")
+    table = pq.read_table(res["parquet"])
+    assert table.num_rows == 120
+    types = {f.name: str(f.type) for f in table.schema}
+    assert types["severity"] == "int64"
+    assert types["score"] == "double"
+    assert types["resolved"] == "bool"
+    assert types["last_updated"].startswith("timestamp")
+    assert types["app.business_unit.name"] == "string"
+
+
+def test_row_writer_nulls_values_off_their_column_type(tmp_path):
+    path = tmp_path / "t.parquet"
+    w = vrf.ParquetRowWriter(path, {"n": "int", "t": "timestamp", "j": "json"}, row_group_size=2,
+                             headers=["n", "t", "j"])
+    for row in ([1, "2024-01-01T00:00:00Z", "[1]"], [2, "not a time", None], [None, None, "[]"]):
+        w.write(row)
+    w.close()
+    assert w.bad_values == 1
+    rows = pq.read_table(path).to_pylist()
+    assert [r["n"] for r in rows] == [1, 2, None]
+    assert rows[1]["t"] is None and rows[0]["t"].year == 2024
+
+
+def test_row_writer_nulls_ints_outside_int64(tmp_path):
+    path = tmp_path / "big.parquet"
+    w = vrf.ParquetRowWriter(path, {"a": "int", "b": "bool"}, headers=["a", "b"])
+    for row in ([2 ** 70, True], [-(2 ** 63), "yes"], [2 ** 63 - 1, False], ["12", None]):
+        w.write(row)
+    w.close()
+    assert w.bad_values == 3
+    rows = pq.read_table(path).to_pylist()
+    assert [r["a"] for r in rows] == [None, -(2 ** 63), 2 ** 63 - 1, None]
+    assert [r["b"] for r in rows] == [True, None, False, None]
@@ -0,0 +1,47 @@
+import VERACODE_REPORT_FETCH as vrf
+
+YEAR = ["--from", "2024-01-01", "--to", "2024-12-31", "--size", "1000", "--no-csv", "--no-json"]
+FIXED = vrf.windows_180("2024-01-01", "2024-12-31")
+
+
+def test_plan_windows_splits_busy_periods():
+    density = {f"2024-01-{d:02d}": (100.0 if d >= 20 else 10.0) for d in range(1, 32)}
+    windows = vrf.plan_windows("2024-01-01", "2024-01-31", density, target=250)
+    assert windows[0] == ("2024-01-01", "2024-01-19")
+    assert all(s >= "2024-01-20" for s, _ in windows[1:]) and len(windows) == 7
+    assert vrf.estimate_window("2024-01-20", "2024-01-31", density) == 1200
+    assert vrf.estimate_window("2024-02-01", "2024-02-29", density) is None
+    assert vrf.plan_windows("2024-01-01", "2024-12-31", {}, target=1) == FIXED
+
+
+def _posts(api, export, tmp_path, name, *argv):
+    before = api.stats["post"]
+    res = export(api, *YEAR, "--volume-history", str(tmp_path / "vol.json"), *argv, out=tmp_path / name)
+    return res, api.stats["post"] - before
+
+
+def test_fixed_plan_is_the_default_and_stable(mock_api, export, tmp_path):
+    assert vrf.build_parser().parse_args([]).plan == "fixed"
+    api = mock_api(per_day=2, hot_from="2024-11-01", hot_factor=20)
+    first, posts1 = _posts(api, export, tmp_path, "a", "--window-target", "1000")
+    second, posts2 = _posts(api, export, tmp_path, "b", "--window-target", "1000")
+    assert posts1 == posts2 == len(FIXED)  # history recorded, windows unchanged
+    assert first["records"] == second["records"]
+
+
+def test_adaptive_plan_uses_recorded_volumes(mock_api, export, tmp_path):
+    api = mock_api(per_day=2, hot_from="2024-11-01", hot_factor=20)
+    opts = ["--plan", "adaptive", "--window-target", "1000"]
+    first, posts1 = _posts(api, export, tmp_path, "a", *opts)
+    assert posts1 == len(FIXED)  # nothing recorded yet
+    second, posts2 = _posts(api, export, tmp_path, "b", *opts)
+    assert posts2 > len(FIXED)
+    assert first["records"] == second["records"]
+
+
+def test_probe_plan_asks_for_counts_first(mock_api, export, tmp_path):
+    api = mock_api(per_day=2, hot_from="2024-11-01", hot_factor=20)
+    res, posts = _posts(api, export, tmp_path, "a", "--plan", "probe", "--window-target", "1000")
+    # one probe per fixed window, then the split windows (a probe report is reused where a window is kept)
+    assert posts > len(FIXED)
+    assert res["records"] == export(api, *YEAR, out=tmp_path / "b")["records"]
@@ -0,0 +1,34 @@
+import json
+
+import VERACODE_REPORT_FETCH as vrf
+
+
+def test_fixed_strategy_uses_the_interval():
+    assert vrf.next_poll_delay("fixed", 100.0, 5.0, 2.0, 30.0) == 2.0
+
+
+def test_adaptive_waits_for_the_expected_time_then_backs_off():
+    assert vrf.next_poll_delay("adaptive", 0.0, 20.0, 2.0, 30.0) == 18.0
+    assert vrf.next_poll_delay("adaptive", 0.0, 100.0, 2.0, 30.0) == 30.0  # capped
+    assert vrf.next_poll_delay("adaptive", 40.0, 20.0, 2.0, 30.0) == 10.0
+    assert vrf.next_poll_delay("adaptive", 0.1, None, 2.0, 30.0) == vrf.POLL_MIN_INTERVAL
+
+
+def test_poll_history_keeps_recent_times_per_shape(tmp_path):
+    path = tmp_path / "poll_history.json"
+    hist = vrf.PollHistory(path)
+    key = vrf.PollHistory.key("FINDINGS", "2024-01-01", "2024-06-28")
+    assert key == "FINDINGS|180d"
+    for s in range(30):
+        hist.record(key, float(s))
+    assert len(json.loads(path.read_text(encoding="utf-8"))[key]) == vrf.PollHistory.KEEP
+    assert vrf.PollHistory(path).expected(key) == 19.5
+
+
+def test_export_records_generation_times(mock_api, export, tmp_path):
+    api = mock_api(records=10, processing_s=0.3)
+    export(api, "--poll-strategy", "adaptive")
+    hist = vrf.PollHistory(tmp_path / "out" / "poll_history.json")
+    (times,) = hist.data.values()
+    assert len(times) == 1 and times[0] >= 0.3
+    assert api.stats["status"] >= 2
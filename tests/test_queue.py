@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+from conftest import read_jsonl
+
+SPEC = {"rid": "r1", "size": 10}
+
+
+def _queue(tmp_path, ranges=((1, 4), (5, 9))):
+    queue = vrf.WorkQueue(tmp_path / "queue.sqlite")
+    queue.enqueue("run", 0, SPEC, list(ranges))
+    return queue
+
+
+def test_claim_complete_and_fail(tmp_path):
+    queue = _queue(tmp_path)
+    a, b = queue.claim("w1", 60), queue.claim("w2", 60)
+    assert (a["first_page"], b["first_page"]) == (1, 5) and a["spec"] == SPEC and a["attempts"] == 1
+    assert queue.claim("w3", 60) is None
+    assert not queue.complete(a["id"], "w2", [], 0, {})  # not the lease holder
+    assert queue.complete(a["id"], "w1", [{"page_no": 1}], 10, {"x": "str"})
+    queue.fail(b["id"], "w2", "boom")
+    again = queue.claim("w3", 60)
+    assert again["id"] == b["id"] and again["attempts"] == 2
+    assert queue.counts("run", 0) == {"done": 1, "leased": 1}
+
+
+def test_unit_fails_after_max_attempts_and_can_be_retried(tmp_path):
+    queue = _queue(tmp_path, [(1, 4)])
+    for n in range(vrf.WorkQueue.MAX_ATTEMPTS):
+        unit = queue.claim(f"w{n}", 60)
+        queue.fail(unit["id"], f"w{n}", f"error {n}")
+    assert queue.claim("w", 60) is None
+    assert queue.counts("run", 0) == {"failed": 1}
+    assert queue.retry_failed("run", 0) == 1 and queue.claim("w", 60)["attempts"] == 1
+
+
+def test_expired_leases_are_reclaimed_then_failed(tmp_path):
+    queue = _queue(tmp_path, [(1, 4)])
+    for n in range(vrf.WorkQueue.MAX_ATTEMPTS):
+        unit = queue.claim(f"dead{n}", 0.01)  # the worker dies: neither complete() nor fail()
+        assert unit["attempts"] == n + 1
+        time.sleep(0.02)
+        assert not queue.renew(unit["id"], "other", 60)
+    assert queue.claim("w", 60) is None
+    assert queue.counts("run", 0) == {"failed": 1}
+    (unit,) = queue.window_units("run", 0)
+    assert unit["owner"] is None and "lease expired" in unit["error"]
+
+
+def test_coordinator_fails_window_whose_workers_keep_dying(mock_api, tmp_path, monkeypatch):
+    mock_api(records=60, processing_s=0)
+    monkeypatch.setattr(vrf.WorkQueue, "POLL_S", 0.01)
+    rid = vrf.extract_report_id(vrf.call_api("POST", vrf.POST_URL, {"report_type": "FINDINGS"}))
+    vrf.poll_ready(rid, 10, 0.05, icons=False)
+    queue = vrf.WorkQueue(tmp_path / "queue.sqlite")
+
+    def dying_worker():  # claims units and vanishes; its leases expire at once
+        for _ in range(500):
+            queue.claim("dead", 0.0)
+            time.sleep(0.005)
+
+    worker = threading.Thread(target=dying_worker, daemon=True)
+    worker.start()
+    with pytest.raises(vrf.ApiError, match="lease expired"):
+        vrf.distribute_window(queue, "run", 0, rid, "2024-01-01", "2024-03-01", 20, tmp_path / "w", True, None, 1)
+    worker.join()
+
+
+def test_export_over_the_queue_with_local_workers(mock_api, export, tmp_path):
+    api = mock_api(records=230)
+    res = export(api, "--size", "20", "--queue", str(tmp_path / "queue.sqlite"), "--local-workers", "2",
+                 "--unit-pages", "3", "--lease-seconds", "30")
+    assert res["records"] == 230
+    rows = read_jsonl(res["jsonl"])
+    assert len({r["finding_id"] for r in rows}) == 230
+    assert api.stats["page"] >= 12
@@ -0,0 +1,52 @@
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+from conftest import read_jsonl
+
+
+class Interrupted(Exception):
+    pass
+
+
+def _interrupt_after(monkeypatch, pages):
+    real, calls = vrf.stream_page, [0]
+
+    def stream_page(url):
+        calls[0] += 1
+        if calls[0] > pages:
+            raise Interrupted()
+        return (yield from real(url))
+
+    monkeypatch.setattr(vrf, "stream_page", stream_page)
+    return lambda: monkeypatch.setattr(vrf, "stream_page", real)
+
+
+def test_resume_fetches_only_missing_pages(mock_api, export, monkeypatch):
+    api = mock_api(records=300)
+    restore = _interrupt_after(monkeypatch, 3)
+    with pytest.raises(Interrupted):
+        export(api, "--size", "50")
+    restore()
+    fetched = api.stats["page"]
+    assert fetched == 3
+    res = export(api, "--size", "50", "--resume")
+    assert api.stats["post"] == 1  # the interrupted run's report is reused
+    assert api.stats["page"] - fetched == 3
+    rows = read_jsonl(res["jsonl"])
+    assert [r["finding_id"] for r in rows] == [f"R0-F{i}" for i in range(300)]
+
+
+def test_resume_refuses_changed_parameters(mock_api, export, monkeypatch):
+    api = mock_api(records=100)
+    restore = _interrupt_after(monkeypatch, 1)
+    with pytest.raises(Interrupted):
+        export(api, "--size", "50")
+    restore()
+    with pytest.raises(vrf.ConfigError, match="size"):
+        export(api, "--size", "25", "--resume")
+
+
+def test_resume_after_completed_run_is_a_no_op(mock_api, export):
+    api = mock_api(records=20)
+    export(api)
+    assert export(api, "--resume") is None
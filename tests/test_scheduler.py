@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+from conftest import read_jsonl
+
+
+def test_run_windows_yields_in_window_order(mock_api):
+    mock_api(processing_s=0.05)
+    windows = vrf.windows_180("2023-01-01", "2024-12-31")
+    assert len(windows) == 5
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def page_fn(idx, rid):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        try:
+            return len(list(vrf.stream_report_items(rid, 200)))
+        finally:
+            with lock:
+                active[0] -= 1
+
+    out = list(vrf.run_windows(windows, "FINDINGS", {}, page_fn, max_inflight=3, workers=3, sleep_s=0,
+                               max_wait_s=30, interval_s=0.05, icons=False))
+    assert [(s, e) for s, e, _, _ in out] == windows
+    assert len({rid for _, _, rid, _ in out}) == len(windows)
+    assert peak[0] <= 3
+
+
+def test_export_of_several_windows_keeps_window_order(mock_api, export):
+    api = mock_api(records=40)
+    res = export(api, "--from", "2023-01-01", "--to", "2024-12-31", "--max-inflight", "3", "--size", "25")
+    rows = read_jsonl(res["jsonl"])
+    assert len(rows) == 5 * 40
+    starts = [r["window_start"] for r in rows]
+    assert starts == sorted(starts)
+    assert api.stats["post"] == 5
+
+
+def test_failing_window_stops_the_run_without_waiting_for_others(mock_api):
+    mock_api(processing_s=0)
+    windows = vrf.windows_180("2023-01-01", "2024-12-31")
+    release, started = threading.Event(), []
+
+    def page_fn(idx, rid):
+        started.append(idx)
+        if idx == 0:
+            release.wait(0.2)  # let the other windows queue up behind the slow one
+            raise vrf.ApiError("page 0 failed", 2)
+        release.wait(30)  # a long-running window
+        return idx
+
+    t0 = time.monotonic()
+    with pytest.raises(vrf.ApiError, match="page 0 failed"):
+        list(vrf.run_windows(windows, "FINDINGS", {}, page_fn, max_inflight=5, workers=2, sleep_s=0,
+                             max_wait_s=30, interval_s=0.05, icons=False))
+    elapsed = time.monotonic() - t0
+    release.set()
+    assert elapsed < 5
+    assert len(started) < len(windows)  # queued windows were cancelled, not paged
@@ -0,0 +1,34 @@
+import csv
+import json
+
+import VERACODE_REPORT_FETCH as vrf
+from conftest import read_jsonl
+
+
+def test_collect_schema_flattens_and_widens_types():
+    schema = {}
+    vrf.collect_schema({"a": 1, "b": {"c": None, "d": [1]}, "t": "2024-01-01T00:00:00Z"}, schema)
+    vrf.collect_schema({"a": 1.5, "b": {"c": "x"}, "t": "later"}, schema)
+    assert schema == {"a": "float", "b.c": "string", "b.d": "json", "t": "string"}
+
+
+def test_row_flattener_matches_flatten_for_row():
+    headers = ["app.name", "id", "missing", "tags"]
+    recs = [{"id": 1, "app": {"name": "x"}, "tags": ["a"]}, {"tags": [], "id": 2}, {"id": 3, "app": {"name": "y"}}]
+    flat = vrf.RowFlattener(headers, dumps=lambda v: json.dumps(v, ensure_ascii=False))
+    for r in recs:
+        assert flat.row(r) == list(vrf.flatten_for_row(r, headers).values())
+
+
+def test_export_records_schema_sidecar_and_csv_headers(mock_api, export):
+    api = mock_api(records=60, shape="nested")
+    res = export(api, "--size", "25")
+    sidecar = json.loads(vrf.schema_path_for(res["jsonl"]).read_text(encoding="utf-8"))
+    schema = {}
+    for r in read_jsonl(res["jsonl"]):
+        vrf.collect_schema(r, schema)
+    assert sidecar["record_count"] == 60
+    assert sidecar["headers"] == sorted(schema)
+    assert sidecar["types"]["app.business_unit.name"] == "string"
+    with res["csv"].open(newline="", encoding="utf-8") as f:
+        assert next(csv.reader(f)) == sidecar["headers"]
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+from mock_reporting_api import make_record
+
+
+@pytest.fixture
+def jsonl(tmp_path):
+    path = tmp_path / "in.jsonl"
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(1500):
+            f.write(json.dumps(make_record("wide" if i % 7 else "nested", 0, i, "2024-01-01"), ensure_ascii=False))
+            f.write("\n")
+    return path
+
+
+def _convert(jsonl, tmp_path, name, workers):
+    out = tmp_path / name
+    out.mkdir()
+    headers = vrf.build_headers_from_jsonl(jsonl, workers)
+    n = vrf.convert_jsonl(jsonl, headers, json_path=out / "a.json", csv_path=out / "a.csv", workers=workers)
+    return n, headers, (out / "a.json").read_bytes(), (out / "a.csv").read_bytes()
+
+
+def test_sharded_output_matches_the_single_pass(jsonl, tmp_path):
+    single = _convert(jsonl, tmp_path, "single", 1)
+    sharded = _convert(jsonl, tmp_path, "sharded", 3)
+    assert single[0] == sharded[0] == 1500
+    assert single[1:] == sharded[1:]
+    assert len(json.loads(sharded[2])) == 1500
+
+
+def test_shard_ranges_split_on_line_boundaries(jsonl):
+    ranges = vrf.shard_ranges(jsonl, 8)
+    data = jsonl.read_bytes()
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (a, b), (c, _) in zip(ranges, ranges[1:]):
+        assert b == c and data[b - 1:b] == b"\n"
+
+
+def test_empty_jsonl_converts_to_empty_outputs(tmp_path):
+    path = tmp_path / "in.jsonl"
+    path.write_bytes(b"")
+    n = vrf.convert_jsonl(path, ["a"], json_path=tmp_path / "a.json", csv_path=tmp_path / "a.csv", workers=2)
+    assert n == 0
+    assert json.loads((tmp_path / "a.json").read_text(encoding="utf-8")) == []
+    assert (tmp_path / "a.csv").read_text(encoding="utf-8").strip() == "a"
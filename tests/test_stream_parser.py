@@ -0,0 +1,194 @@
+import json
+import shutil
+
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+
+ITEMS = [
+    {"finding_id": 1, "title": "naïve café – 漢字 🚀", "n": 12.5e3},
+    {"finding_id": 2, "title": 'quote " and \\ backslash', "path": "{not: [an, object]}"},
+    {"finding_id": 3, "title": "braces } ] { [ and \\\"escaped\\\" quotes", "tags": [], "extra": {"a": [1, {}]}},
+    {"finding_id": 4, "title": "éè 😀", "n": -0.5},
+]
+METAS = {
+    "camel": {"page": {"number": 2, "size": 4, "totalPages": 5, "totalElements": 18}},
+    "snake": {"page_metadata": {"page_number": 2, "size": 4, "total_pages": 5, "total_elements": 18}},
+    "mixed": {"_embedded": {"page": {"number": 2, "total_pages": 5, "totalElements": 18, "size": 4}}},
+}
+
+
+def _body(meta: dict, ensure_ascii: bool = False) -> bytes:
+    doc = {"_embedded": {"findings": ITEMS, **meta.get("_embedded", {})},
+           **{k: v for k, v in meta.items() if k != "_embedded"}, "_links": {"self": {"href": "/x?page=2"}}}
+    return json.dumps(doc, ensure_ascii=ensure_ascii).encode("utf-8")
+
+
+def _parse(chunks):
+    parser = vrf.PageStreamParser(chunks)
+    return (*_drain(parser.parse()), parser)
+
+
+@pytest.mark.parametrize("style", sorted(METAS))
+def test_every_split_point(style):
+    body = _body(METAS[style])
+    expected_page = vrf.normalize_page_meta(json.loads(body))
+    for i in range(len(body) + 1):
+        items, page, parser = _parse([body[:i], body[i:]])
+        assert items == ITEMS, i
+        assert parser.items == 4 and parser.items_path == ("_embedded", "findings")
+        assert page["_embedded"]["findings"] == [] and page["_links"]["self"]["href"] == "/x?page=2"
+        assert vrf.normalize_page_meta(page) == expected_page, i
+    assert expected_page["total_pages"] == 5 and expected_page["number"] == 2
+
+
+def test_byte_at_a_time_with_multibyte_utf8():
+    body = _body(METAS["camel"])
+    assert len(body) > len(body.decode("utf-8"))  # multibyte characters are split across chunks below
+    items, _, _ = _parse(body[i:i + 1] for i in range(len(body)))
+    assert items == ITEMS
+    items, _, _ = _parse([body[:7], b"", body[7:]])  # empty chunks are not the end of the body
+    assert items == ITEMS
+    items, _, _ = _parse([_body(METAS["snake"], ensure_ascii=True)])  # \uXXXX escapes, surrogate pairs
+    assert items == ITEMS
+
+
+@pytest.mark.parametrize("doc, items", [
+    ({"content": [{"a": 1}], "page": {"totalPages": 1}}, [{"a": 1}]),
+    ({"findings": []}, []),
+    ([{"a": 1}, {"b": "]"}], [{"a": 1}, {"b": "]"}]),
+])
+def test_item_locations(doc, items):
+    body = json.dumps(doc).encode() + b"\n"
+    for i in range(len(body) + 1):
+        assert _parse([body[:i], body[i:]])[0] == items
+
+
+def test_empty_body_is_an_empty_page():
+    assert _parse([b"  \r\n"])[:2] == ([], {})
+
+
+@pytest.mark.parametrize("style", sorted(METAS))
+def test_truncated_and_trailing_input_raise(style):
+    body = _body(METAS[style])
+    for i in range(1, len(body)):
+        if body[:i].strip():
+            with pytest.raises(ValueError):
+                _parse([body[:i]])
+    for tail in (b"}", b" {}", b"x"):
+        with pytest.raises(ValueError, match="after the page"):
+            _parse([body, tail])
+    with pytest.raises(ValueError):
+        _parse([b'{"_embedded": {"findings": [{"a": 1} {"b": 2}]}}'])
+
+
+def _drain(gen):
+    items = []
+    while True:
+        try:
+            items.append(next(gen))
+        except StopIteration as stop:
+            return items, stop.value
+
+
+@pytest.fixture
+def report(mock_api, monkeypatch):
+    """
+    start(transport, **faults) -> (api, metrics, page URL, its items) for page 1 of a COMPLETED 120-finding report;
+    the faults apply from then on and metrics records only what follows.
+    """
+    def start(transport="native", **faults):
+        api = mock_api(records=120, processing_s=0, retry_after=0.05)
+        vrf.configure(base_url=api.url, transport=transport)
+        rid = vrf.extract_report_id(vrf.call_api("POST", vrf.POST_URL, {"report_type": "FINDINGS"}))
+        vrf.poll_ready(rid, 10, 0.05, icons=False)
+        url = vrf.GET_URL_T.format(rid=rid, page=1, size=50)
+        expected = vrf.extract_items(vrf.call_api("GET", url))
+        metrics = vrf.Metrics()
+        monkeypatch.setattr(vrf._JOB, "metrics", metrics, raising=False)
+        api.faults.update(faults)
+        return api, metrics, url, expected
+    return start
+
+
+def _page_calls(metrics):
+    return metrics.report()["api"]["calls"]["page"]
+
+
+TRANSPORTS = ["native", pytest.param("httpie", marks=pytest.mark.skipif(shutil.which("http") is None,
+                                                                        reason="HTTPie is not installed"))]
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_streamed_page_is_recorded_as_a_successful_call(report, transport):
+    api, metrics, url, expected = report(transport)
+    items, (page, n) = _drain(vrf.stream_page(url))
+    assert items == expected and n == 50
+    assert vrf.normalize_page_meta(page)["total_pages"] == 3
+    calls = _page_calls(metrics)
+    assert calls["attempts"] == 1 and calls["failed_attempts"] == 0
+    assert calls["bytes"] == vrf.last_call_info()["bytes"] > 0
+    assert not metrics.retries
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_throttled_streamed_page_pauses_and_retries_before_the_body(report, transport, fast_retries):
+    api, metrics, url, expected = report(transport, **{"429": 0.4, "5xx": 0.2})
+    paused = vrf.GOVERNOR.stats["paused_s"]
+    for _ in range(4):
+        assert _drain(vrf.stream_page(url))[0] == expected
+    assert api.stats["429"] > 0 and metrics.retries["429"] == api.stats["429"]
+    assert metrics.retries["5xx"] == api.stats["5xx"]
+    assert "stream" not in metrics.retries
+    assert vrf.GOVERNOR.stats["paused_s"] > paused
+    calls = _page_calls(metrics)
+    assert calls["failed_attempts"] == api.stats["429"] + api.stats["5xx"]
+    assert calls["attempts"] == 4 + calls["failed_attempts"]
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_truncated_body_is_refetched_as_a_stream_retry(report, transport):
+    api, metrics, url, expected = report(transport, truncate=1.0)
+    gen = vrf.stream_page(url)
+    first = next(gen)
+    api.faults["truncate"] = 0.0
+    items, (page, n) = _drain(gen)
+    assert [first, *items] == expected and n == 50
+    assert metrics.retries == {"stream": 1}
+
+
+def test_streamed_export_run_report(mock_api, export):
+    api = mock_api(records=300)
+    res = export(api, "--size", "100")
+    report = json.loads(res["run_report"].read_text(encoding="utf-8"))
+    calls = report["api"]["calls"]["page"]
+    assert calls["attempts"] == api.stats["page"] == 3
+    assert calls["failed_attempts"] == 0 and calls["bytes"] > 0
+    assert report["records"] == 300 and not report["api"]["retries"]
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_streamed_page_holds_its_governor_slot_until_the_body_is_read(report, transport):
+    api, metrics, url, expected = report(transport)
+    idle = vrf.GOVERNOR._inflight
+    gen = vrf.stream_page(url)
+    first = next(gen)
+    assert vrf.GOVERNOR._inflight == idle + 1  # still downloading: counts against the AIMD limit
+    items, _ = _drain(gen)
+    assert [first, *items] == expected
+    assert vrf.GOVERNOR._inflight == idle
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_broken_or_abandoned_stream_gives_its_slot_back(report, transport):
+    api, metrics, url, expected = report(transport, truncate=1.0)
+    idle = vrf.GOVERNOR._inflight
+    gen = vrf.stream_page(url)
+    next(gen)
+    api.faults["truncate"] = 0.0
+    _drain(gen)
+    assert vrf.GOVERNOR._inflight == idle
+    gen = vrf.stream_page(url)
+    next(gen)
+    gen.close()  # consumer stops mid-page
+    assert vrf.GOVERNOR._inflight == idle
@@ -0,0 +1,36 @@
+import csv
+import json
+
+import VERACODE_REPORT_FETCH as vrf
+from conftest import read_jsonl
+
+
+def test_export_writes_every_output_from_the_jsonl(mock_api, export, tmp_path):
+    api = mock_api(records=230)
+    res = export(api, "--size", "50")
+    rows = read_jsonl(res["jsonl"])
+    assert len(rows) == res["records"] == 230
+    assert json.loads(res["json"].read_text(encoding="utf-8")) == rows
+    with res["csv"].open(newline="", encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == 230
+    assert not list((tmp_path / "out").glob(".spool_*"))  # page spool removed once appended
+
+
+def test_stream_page_yields_items_before_the_page_is_complete(mock_api):
+    mock_api(records=40)
+    rid = vrf.post_report("FINDINGS", "2024-01-01", "2024-03-01", {})
+    vrf.poll_ready(rid, 10, 0.05, icons=False)
+    gen = vrf.stream_report_items(rid, 40)
+    marker = next(gen)["__PAGE_META__"]
+    first = next(gen)
+    assert first["finding_id"].endswith("-F0")
+    assert marker["count"] == 0  # filled in when the page has been read to the end
+    rest = list(gen)
+    assert marker["count"] == 40 and len(rest) == 39
+
+
+def test_no_json_skips_the_array(mock_api, export):
+    api = mock_api(records=10)
+    res = export(api, "--no-json")
+    assert res["json"] is None
+    assert len(read_jsonl(res["jsonl"])) == 10
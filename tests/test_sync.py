@@ -0,0 +1,41 @@
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+from conftest import read_jsonl
+
+
+def test_sync_upserts_into_the_snapshot(mock_api, tmp_path):
+    api = mock_api(records=50, shared_ids=True)
+    out = tmp_path / "out"
+    base = ["--base-url", api.url, "--out", str(out), "--sync", "--id-field", "finding_id", "--sleep", "0",
+            "--poll-strategy", "fixed", "--poll-interval", "0.05", "--no-xlsx", "--no-csv"]
+    first = vrf.run_export(vrf.build_parser().parse_args(base + ["--from", "2024-01-01", "--to", "2024-03-01"]))
+    assert first["jsonl"].name.startswith("snapshot_")
+    assert len(read_jsonl(first["jsonl"])) == 50
+    store = vrf.SyncStore(out / vrf.SyncStore.FILENAME)
+    try:
+        hwm = store.get_state("high_water_mark")
+    finally:
+        store.close()
+
+    api.records = 70  # 50 known ids come back updated, 20 are new
+    second = vrf.run_export(vrf.build_parser().parse_args(base))  # starts from the stored high-water mark
+    rows = read_jsonl(second["jsonl"])
+    assert len(rows) == 70
+    assert len({r["finding_id"] for r in rows}) == 70
+    assert len(read_jsonl(second["delta"])) == 70
+    assert {r["window_start"] for r in rows} == {vrf.sync_start_date(hwm, 24)}
+
+
+def test_first_sync_needs_from_and_id_field(mock_api, tmp_path):
+    api = mock_api()
+    args = ["--base-url", api.url, "--out", str(tmp_path), "--sync"]
+    with pytest.raises(vrf.ConfigError, match="--id-field"):
+        vrf.run_export(vrf.build_parser().parse_args(args))
+    with pytest.raises(vrf.ConfigError, match="--from"):
+        vrf.run_export(vrf.build_parser().parse_args(args + ["--id-field", "finding_id"]))
+
+
+def test_sync_start_date_applies_overlap():
+    assert vrf.sync_start_date("2024-05-02T03:00:00+00:00", 24) == "2024-05-01"
+    assert vrf.sync_start_date("2024-05-02T03:00:00+00:00", 2) == "2024-05-02"
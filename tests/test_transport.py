@@ -0,0 +1,97 @@
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+
+
+def test_native_post_status_and_page(mock_api):
+    api = mock_api(records=30)
+    rid = vrf.extract_report_id(vrf.call_native("POST", vrf.POST_URL, {"report_type": "FINDINGS"}))
+    vrf.poll_ready(rid, 10, 0.05, icons=False)
+    page = vrf.call_native("GET", vrf.GET_URL_T.format(rid=rid, page=0, size=20))
+    assert len(vrf.extract_items(page)) == 20
+    assert vrf.last_call_info()["attempts"] == 1
+    assert vrf.last_call_info()["bytes"] > 0
+    assert api.stats["page"] == 1
+
+
+def test_native_retries_transient_errors(mock_api, fast_retries):
+    api = mock_api(fault_5xx=0.5, seed=3)
+    for _ in range(10):
+        vrf.call_native("POST", vrf.POST_URL, {"report_type": "FINDINGS"})
+    assert api.stats["5xx"] > 0
+    assert api.stats["post"] == 10
+
+
+def test_native_missing_ok_and_errors(mock_api):
+    mock_api()
+    assert vrf.call_native("GET", vrf.GET_URL_META_T.format(rid="nope"), missing_ok=True) is None
+    with pytest.raises(vrf.ApiError) as e:
+        vrf.call_native("GET", vrf.GET_URL_META_T.format(rid="nope"))
+    assert e.value.status == 404
+
+
+def test_call_api_dispatches_on_transport(mock_api, monkeypatch):
+    mock_api()
+    seen = []
+    monkeypatch.setattr(vrf, "call_httpie", lambda *a, **k: seen.append("httpie") or {})
+    monkeypatch.setattr(vrf, "call_native", lambda *a, **k: seen.append("native") or {})
+    vrf.configure(transport="httpie")
+    vrf.call_api("GET", vrf.POST_URL)
+    vrf.configure(transport="native")
+    vrf.call_api("GET", vrf.POST_URL)
+    assert seen == ["httpie", "native"]
+
+
+def test_export_over_native_transport(mock_api, export):
+    api = mock_api(records=250)
+    res = export(api, "--size", "100", "--transport", "native")
+    assert res["records"] == 250
+
+
+@pytest.mark.skipif(shutil.which("http") is None, reason="HTTPie is not installed")
+def test_export_over_httpie_transport(mock_api, export):
+    api = mock_api(records=120)
+    res = export(api, "--size", "50", "--transport", "httpie")
+    assert res["records"] == 120
+
+
+@pytest.fixture
+def forbidden():
+    """A server answering every request with 403, as the API does for keys without the Reporting role."""
+    class Handler(BaseHTTPRequestHandler):
+        def _forbid(self):
+            body = b'{"message": "Forbidden"}'
+            self.send_response(403)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = _forbid
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    vrf.set_base_url(f"http://127.0.0.1:{server.server_address[1]}")
+    yield
+    server.shutdown()
+
+
+@pytest.mark.parametrize("transport", ["native", pytest.param("httpie", marks=pytest.mark.skipif(
+    shutil.which("http") is None, reason="HTTPie is not installed"))])
+def test_forbidden_is_an_auth_error(forbidden, transport):
+    vrf.configure(base_url=vrf.BASE_URL, transport=transport)
+    url = vrf.GET_URL_T.format(rid="r1", page=0, size=10)
+    with pytest.raises(vrf.AuthError, match="403") as e:
+        list(vrf.stream_page(url))
+    assert e.value.status == 403
+    if transport == "native":
+        with pytest.raises(vrf.AuthError) as e:
+            vrf.call_native("POST", vrf.POST_URL, {"report_type": "FINDINGS"})
+        assert e.value.status == 403
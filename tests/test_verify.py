@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+from conftest import read_jsonl
+
+
+def _page(page_no, offset, count, size, served=None):
+    return {"page_no": page_no, "offset": offset, "count": count, "size": size,
+            "meta": {"number": None, "total_pages": None, "size": served, "total_elements": 1000}}
+
+
+def test_auto_gaps_come_from_what_pages_returned():
+    pages = [_page(0, 0, 300, 300), _page(1, 300, 150, 300), _page(2, 600, 300, 300, served=300)]
+    gaps = vrf.find_page_gaps(pages, "auto")
+    assert [(g["offset"], g["take"], g["page"], g["skip"], g["reason"]) for g in gaps] == [
+        (450, 150, 1, 150, "short"), (900, 100, 3, 0, "missing")]
+    assert {g["page_no"] for g in gaps} == {3, 4}
+
+
+def test_fixed_size_gaps():
+    pages = [{"page_no": 0, "count": 100, "meta": {"number": 0, "total_pages": 4, "size": 100, "total_elements": 350}},
+             {"page_no": 1, "count": 60, "meta": {"number": 2, "total_pages": 4, "size": 100}},
+             {"page_no": 2, "count": 50, "meta": {"number": 3, "total_pages": 4, "size": 100}}]
+    gaps = vrf.find_page_gaps(pages, 100)
+    assert [(g["page"], g["reason"]) for g in gaps] == [(1, "missing"), (2, "short")]
+
+
+def test_repair_places_refetched_items_by_the_served_size(mock_api, tmp_path):
+    mock_api(records=1000, max_page_size=300)
+    rid = vrf.post_report("FINDINGS", "2024-01-01", "2024-03-01", {})
+    vrf.poll_ready(rid, 10, 0.05, icons=False)
+    window_dir = tmp_path / "w"
+    window_dir.mkdir()
+    first = vrf.extract_items(vrf.call_api("GET", vrf.GET_URL_T.format(rid=rid, page=0, size=300)))
+    vrf.write_page_file(window_dir, 0, first, rid, "a", "b", False, None, {})
+    res = {"pages": [_page(0, 0, 300, 500)], "count": 300, "schema": {}}  # a size the server never honoured
+    repair = vrf.repair_window(rid, "a", "b", res, "auto", window_dir, stamp=False, id_field=None)
+    assert repair["unresolved"] == []
+    assert res["count"] == 1000
+    offsets = [(p["offset"], p["count"]) for p in res["pages"]]
+    assert sum(c for _, c in offsets) == 1000
+    with (tmp_path / "out.jsonl").open("wb") as out:
+        vrf.append_window_pages(window_dir, res["pages"], out)
+    ids = [r["finding_id"] for r in read_jsonl(tmp_path / "out.jsonl")]
+    assert ids == [f"R0-F{i}" for i in range(1000)]
+
+
+@pytest.mark.parametrize("size,faults", [("auto", {"max_page_size": 300, "fault_short": 0.3}),
+                                         ("100", {"fault_short": 0.2, "fault_skip": 0.1})])
+def test_verify_repairs_the_window(mock_api, export, tmp_path, size, faults):
+    api = mock_api(records=3000, seed=3, **faults)
+    res = export(api, "--size", size, "--verify", "--strict", "--id-field", "finding_id")
+    rows = read_jsonl(res["jsonl"])
+    assert [r["finding_id"] for r in rows] == [f"R0-F{i}" for i in range(3000)]
+    (path,) = [p for p in (tmp_path / "out" / "audit").glob("audit_*.json") if "audit_run_" not in p.name]
+    audit = json.loads(path.read_text(encoding="utf-8"))
+    assert audit["strict_ok"] and audit["unresolved_gaps"] == []
+    assert api.stats["short"] + api.stats["skip"] > 0
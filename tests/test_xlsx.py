@@ -0,0 +1,37 @@
+import pytest
+
+import VERACODE_REPORT_FETCH as vrf
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def test_rows_roll_over_to_new_sheets(tmp_path):
+    path = tmp_path / "t.xlsx"
+    w = vrf.XlsxRowWriter(path, ["a", "b"], max_rows_per_sheet=3)
+    for i in range(7):
+        w.write([i, f"v{i}"])
+    w.close()
+    wb = openpyxl.load_workbook(path, read_only=True)
+    assert wb.sheetnames == ["findings_01", "findings_02", "findings_03"]
+    rows = [list(r) for ws in wb for r in ws.iter_rows(values_only=True)]
+    assert rows.count(["a", "b"]) == 3
+    assert [r[0] for r in rows if r != ["a", "b"]] == list(range(7))
+
+
+def test_empty_export_gets_a_header_only_sheet(tmp_path):
+    path = tmp_path / "t.xlsx"
+    vrf.XlsxRowWriter(path, ["a"]).close()
+    ws = openpyxl.load_workbook(path, read_only=True)["findings_01"]
+    assert [list(r) for r in ws.iter_rows(values_only=True)] == [["a"]]
+
+
+def test_export_writes_one_workbook(mock_api, tmp_path):
+    api = mock_api(records=40)
+    args = vrf.build_parser().parse_args(
+        ["--base-url", api.url, "--from", "2024-01-01", "--to", "2024-03-01", "--out", str(tmp_path),
+         "--sleep", "0", "--poll-strategy", "fixed", "--poll-interval", "0.05", "--no-json", "--no-csv"])
+    res = vrf.run_export(args)
+    ws = openpyxl.load_workbook(res["xlsx"], read_only=True)["findings_01"]
+    rows = list(ws.iter_rows(values_only=True))
+    assert len(rows) == 41
+    assert "app.name" in rows[0]